@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Measure how long importing the tools module takes on a cold interpreter and
+fail when it exceeds a budget.
+
+The watsonx Orchestrate ADK is imported first so only the cost added by
+salesforce_tools itself is counted; the runtime loads the ADK regardless.
+
+Usage:
+    python import_time.py
+    python import_time.py --budget-ms 50 --runs 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+
+# Imported before salesforce_tools so their cost isn't attributed to it
+PRELOADED = (
+    "ibm_watsonx_orchestrate.agent_builder.tools",
+    "ibm_watsonx_orchestrate.agent_builder.connections",
+    "ibm_watsonx_orchestrate.run",
+)
+
+# Modules the tools module should only import on first use
+DEFERRED = ("requests", "simple_salesforce", "pyarrow")
+
+_SCRIPT = """
+import json, sys
+{preload}
+before = set(sys.modules)
+import salesforce_tools
+print(json.dumps({{"deferred_loaded": [m for m in {deferred!r} if m in sys.modules and m not in before]}}))
+"""
+
+
+def measure_once() -> Tuple[float, List[Tuple[float, str]], List[str]]:
+    """
+    Import salesforce_tools in a fresh interpreter with -X importtime.
+
+    Returns:
+        (cumulative ms for salesforce_tools, [(cumulative ms, module)] for the
+        modules it pulled in, deferred modules that were imported anyway)
+    """
+    script = _SCRIPT.format(
+        preload="\n".join(f"import {module}" for module in PRELOADED), deferred=DEFERRED
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=TOOLS_DIR,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    entries: List[Tuple[int, float, str]] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, int(cumulative) / 1000.0, name.strip()))
+
+    # -X importtime prints modules after their imports finish, so the modules
+    # salesforce_tools pulled in are the entries just before its own line
+    total, children = 0.0, []
+    for index, (depth, cumulative, name) in enumerate(entries):
+        if name == "salesforce_tools":
+            total = cumulative
+            for child_depth, child_cumulative, child_name in reversed(entries[:index]):
+                if child_depth <= depth:
+                    break
+                if child_depth == depth + 1:
+                    children.append((child_cumulative, child_name))
+    deferred_loaded = json.loads(completed.stdout.strip().splitlines()[-1])["deferred_loaded"]
+    return total, sorted(children, reverse=True), deferred_loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check the import time of salesforce_tools")
+    parser.add_argument("--budget-ms", type=float, default=75.0, help="Allowed median import time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    timings: List[float] = []
+    slowest: Dict[str, float] = {}
+    deferred_loaded: List[str] = []
+    for _ in range(args.runs):
+        total, children, deferred_loaded = measure_once()
+        timings.append(total)
+        for cumulative, name in children:
+            slowest[name] = max(slowest.get(name, 0.0), cumulative)
+
+    median = statistics.median(timings)
+    print(f"salesforce_tools import: median {median:.1f} ms over {args.runs} runs "
+          f"(min {min(timings):.1f}, max {max(timings):.1f}), budget {args.budget_ms:.0f} ms")
+    for name, cumulative in sorted(slowest.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {cumulative:8.1f} ms  {name}")
+
+    failed = False
+    if deferred_loaded:
+        print(f"❌ Imported at module load but should be deferred: {', '.join(deferred_loaded)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"❌ Import time exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("✅ Import time within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,910 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Salesforce REST, SOAP login and Bulk API 2.0 endpoints
+used by the Salesforce tools, for benchmarks that should not depend on a live org.
+
+Records are generated deterministically per object; writes are kept in memory.
+Latency and payload sizes are configurable so benchmarks can model a slow
+network or wide objects.
+
+Run standalone:
+    python mock_salesforce.py --port 8787 --latency-ms 40
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import re
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Key prefixes of the standard objects the generator knows about
+KEY_PREFIXES = {
+    "Account": "001",
+    "Contact": "003",
+    "Opportunity": "006",
+    "Lead": "00Q",
+    "Case": "500",
+    "User": "005",
+    "Task": "00T",
+    "Event": "00U",
+}
+
+# Parent lookups generated on child objects: field -> (relationship, parent object)
+LOOKUPS = {
+    "Contact": {"AccountId": ("Account", "Account")},
+    "Opportunity": {"AccountId": ("Account", "Account")},
+    "Case": {"AccountId": ("Account", "Account"), "ContactId": ("Contact", "Contact")},
+}
+
+# Child relationships: parent -> [(relationship name, child object, lookup field)]
+CHILD_RELATIONSHIPS = {
+    "Account": [
+        ("Contacts", "Contact", "AccountId"),
+        ("Opportunities", "Opportunity", "AccountId"),
+        ("Cases", "Case", "AccountId"),
+    ],
+    "Contact": [("Cases", "Case", "ContactId")],
+}
+
+_LAST_MODIFIED = formatdate(0, usegmt=True)
+_FROM_RE = re.compile(r"\bFROM\s+(\w+)", re.IGNORECASE)
+_LIMIT_RE = re.compile(r"\bLIMIT\s+(\d+)", re.IGNORECASE)
+_ID_FILTER_RE = re.compile(r"\bId\s*(?:=|IN)\s*\(?\s*'([^)]*)", re.IGNORECASE)
+
+
+class MockConfig:
+    """Knobs for the generated org"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        records_per_object: int = 2000,
+        custom_fields: int = 10,
+        field_bytes: int = 24,
+        page_size: int = 2000,
+        api_limit: int = 100000,
+        bulk_page_records: int = 50000,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.records_per_object = records_per_object
+        self.custom_fields = custom_fields
+        self.field_bytes = field_bytes
+        self.page_size = page_size
+        self.api_limit = api_limit
+        self.bulk_page_records = bulk_page_records
+
+
+class MockOrg:
+    """In-memory data and request routing shared by the HTTP handler and composite requests"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.records: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.deleted: Dict[str, Dict[str, str]] = {}
+        self.counters: Dict[str, int] = {}
+        self.cursors: Dict[str, List[Dict[str, Any]]] = {}
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.api_calls = 0
+        self.requests = 0
+        # (method, path pattern, error) failing the next matching request once
+        self.faults: List[Tuple[str, "re.Pattern[str]", "MockError"]] = []
+
+    def inject_fault(
+        self, method: str, path_pattern: str, status: int, code: str, message: str = "Injected failure"
+    ) -> None:
+        """Make the next request matching method and path_pattern (a regex) fail once"""
+        with self.lock:
+            self.faults.append((method.upper(), re.compile(path_pattern), MockError(status, code, message)))
+
+    # Data
+
+    def key_prefix(self, object_name: str) -> str:
+        if object_name in KEY_PREFIXES:
+            return KEY_PREFIXES[object_name]
+        return "a0" + "ABCDEFGHJKLMNPQRSTUVWXYZ"[sum(map(ord, object_name)) % 24]
+
+    def new_id(self, object_name: str) -> str:
+        with self.lock:
+            number = self.counters.get(object_name, 0) + 1
+            self.counters[object_name] = number
+        return f"{self.key_prefix(object_name)}{number:012d}AAA"
+
+    def table(self, object_name: str) -> Dict[str, Dict[str, Any]]:
+        """Records of an object, generated on first use"""
+        name = self.canonical_name(object_name)
+        with self.lock:
+            table = self.records.get(name)
+        if table is not None:
+            return table
+        table = {}
+        for index in range(self.config.records_per_object):
+            record_id = self.new_id(name)
+            table[record_id] = self.generate_record(name, record_id, index)
+        with self.lock:
+            return self.records.setdefault(name, table)
+
+    def canonical_name(self, object_name: str) -> str:
+        for name in list(KEY_PREFIXES) + list(self.records):
+            if name.lower() == object_name.lower():
+                return name
+        return object_name
+
+    def generate_record(self, object_name: str, record_id: str, index: int) -> Dict[str, Any]:
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime(1700000000 + index * 60))
+        record = {
+            "Id": record_id,
+            "Name": f"{object_name} {index}",
+            "CreatedDate": stamp,
+            "LastModifiedDate": stamp,
+            "SystemModstamp": stamp,
+            "OwnerId": f"005{1:012d}AAA",
+            "IsDeleted": False,
+        }
+        if object_name in ("Contact", "Lead"):
+            record["LastName"] = f"Last {index}"
+            record["Email"] = f"contact{index}@example.com"
+        if object_name == "Opportunity":
+            record["StageName"] = ("Prospecting", "Negotiation", "Closed Won")[index % 3]
+            record["Amount"] = float(1000 * (index % 50))
+        for field in LOOKUPS.get(object_name, {}):
+            parent = LOOKUPS[object_name][field][1]
+            record[field] = f"{self.key_prefix(parent)}{index % 100 + 1:012d}AAA"
+        filler = ("x" * self.config.field_bytes)[: self.config.field_bytes]
+        for number in range(1, self.config.custom_fields + 1):
+            record[f"Field_{number}__c"] = filler
+        return record
+
+    def describe(self, object_name: str) -> Dict[str, Any]:
+        name = self.canonical_name(object_name)
+        sample = next(iter(self.table(name).values()), {"Id": "", "Name": ""})
+        fields = []
+        for field, value in sample.items():
+            kind = "string"
+            if field == "Id":
+                kind = "id"
+            elif field.endswith("Date") or field == "SystemModstamp":
+                kind = "datetime"
+            elif isinstance(value, bool):
+                kind = "boolean"
+            elif isinstance(value, float):
+                kind = "currency"
+            entry = {
+                "name": field,
+                "label": field.replace("__c", "").replace("_", " "),
+                "type": kind,
+                "custom": field.endswith("__c"),
+                "nillable": field not in ("Id", "Name"),
+                "createable": field not in ("Id", "CreatedDate", "LastModifiedDate", "SystemModstamp"),
+                "updateable": field not in ("Id", "CreatedDate", "LastModifiedDate", "SystemModstamp"),
+                "externalId": False,
+                "length": 255 if kind == "string" else 0,
+                "relationshipName": None,
+                "referenceTo": [],
+                "picklistValues": [],
+            }
+            if field == "OwnerId":
+                entry.update(type="reference", relationshipName="Owner", referenceTo=["User"])
+            if field in LOOKUPS.get(name, {}):
+                relationship, parent = LOOKUPS[name][field]
+                entry.update(type="reference", relationshipName=relationship, referenceTo=[parent])
+            fields.append(entry)
+        fields.append(dict(fields[1], name="External_Id__c", label="External Id", custom=True, externalId=True))
+        if name == "Account":
+            fields.append(dict(fields[1], name="BillingAddress", label="Billing Address", type="address"))
+        return {
+            "name": name,
+            "label": name,
+            "custom": name.endswith("__c"),
+            "keyPrefix": self.key_prefix(name),
+            "queryable": True,
+            "createable": True,
+            "updateable": True,
+            "deletable": True,
+            "fields": fields,
+            "childRelationships": [
+                {"relationshipName": relationship, "childSObject": child, "field": field}
+                for relationship, child, field in CHILD_RELATIONSHIPS.get(name, [])
+            ],
+            "recordTypeInfos": [],
+        }
+
+    def global_describe(self) -> Dict[str, Any]:
+        names = sorted(set(KEY_PREFIXES) | set(self.records))
+        return {
+            "encoding": "UTF-8",
+            "maxBatchSize": 200,
+            "sobjects": [
+                {
+                    "name": name,
+                    "label": name,
+                    "custom": name.endswith("__c"),
+                    "keyPrefix": self.key_prefix(name),
+                    "queryable": True,
+                    "createable": True,
+                    "updateable": True,
+                    "deletable": True,
+                }
+                for name in names
+            ],
+        }
+
+    # SOQL
+
+    def run_soql(self, query: str) -> Tuple[List[Dict[str, Any]], int]:
+        """Evaluate a SOQL query well enough for benchmarks: field lists, Id filters, LIMIT"""
+        match = _match_select(query)
+        if not match:
+            raise MockError(400, "MALFORMED_QUERY", f"unexpected token in query: {query[:60]}")
+        object_name = self.canonical_name(match["object"])
+        rest = match["rest"]
+        # Drop subqueries from the WHERE part before looking for simple filters
+        table = self.table(object_name)
+        rows = list(table.values())
+        id_filter = _ID_FILTER_RE.search(re.sub(r"\(\s*SELECT.*?\)", "", rest, flags=re.I | re.S))
+        if id_filter:
+            wanted = set(re.findall(r"[A-Za-z0-9]{15,18}", id_filter.group(1)))
+            rows = [row for row in rows if row["Id"] in wanted]
+        limit = _LIMIT_RE.findall(rest)
+        if limit:
+            rows = rows[: int(limit[-1])]
+        select = match["fields"].strip()
+        if re.match(r"^COUNT\(\s*\)$", select, re.I):
+            return [], len(rows)
+        items = _split_select(select)
+        if any(re.match(r"^(COUNT|SUM|AVG|MIN|MAX|COUNT_DISTINCT)\(", item, re.I) for item in items):
+            return [self.aggregate_row(items, rows)], 1
+        return [self.project(object_name, row, items) for row in rows], len(rows)
+
+    def aggregate_row(self, items: List[str], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"attributes": {"type": "AggregateResult"}}
+        for index, item in enumerate(items):
+            parts = item.split()
+            alias = parts[-1] if len(parts) > 1 and ")" not in parts[-1] else f"expr{index}"
+            result[alias] = len(rows) if item.upper().startswith("COUNT") else 0
+        return result
+
+    def project(self, object_name: str, row: Dict[str, Any], items: List[str]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"attributes": self.attributes(object_name, row["Id"])}
+        for item in items:
+            if item.startswith("("):
+                inner = _match_select(item.strip()[1:-1])
+                if inner:
+                    record[inner["object"]] = self.child_records(object_name, row, inner)
+                continue
+            path = item.split()[0]
+            if "." in path:
+                relationship, field = path.split(".", 1)
+                parent = record.setdefault(relationship, {"attributes": {"type": relationship}})
+                parent[field.split(".")[0]] = f"{relationship} of {row['Id']}"
+            else:
+                record[path] = row.get(path, row.get(_case_insensitive_key(row, path)))
+        return record
+
+    def child_records(self, object_name: str, row: Dict[str, Any], inner: Dict[str, str]) -> Dict[str, Any]:
+        relationship = inner["object"]
+        for name, child, field in CHILD_RELATIONSHIPS.get(object_name, []):
+            if name.lower() == relationship.lower():
+                children = [r for r in self.table(child).values() if r.get(field) == row["Id"]]
+                limit = _LIMIT_RE.findall(inner["rest"])
+                children = children[: int(limit[-1]) if limit else 5]
+                items = _split_select(inner["fields"])
+                records = [self.project(child, r, items) for r in children]
+                return self.page("v59.0", records, len(records), 0)
+        return {"totalSize": 0, "done": True, "records": []}
+
+    def attributes(self, object_name: str, record_id: str) -> Dict[str, str]:
+        return {
+            "type": object_name,
+            "url": f"/services/data/v59.0/sobjects/{object_name}/{record_id}",
+        }
+
+    def query_response(self, version: str, query: str, batch_size: int = 0) -> Dict[str, Any]:
+        records, total = self.run_soql(query)
+        return self.page(version, records, total, 0, batch_size)
+
+    def page(
+        self, version: str, records: List[Dict[str, Any]], total: int, offset: int, batch_size: int = 0
+    ) -> Dict[str, Any]:
+        size = batch_size or self.config.page_size
+        chunk = records[offset : offset + size]
+        response: Dict[str, Any] = {"totalSize": total, "done": True, "records": chunk}
+        if offset + size < len(records):
+            locator = f"01gMOCK{id(records):x}"
+            with self.lock:
+                self.cursors[locator] = records
+            response["done"] = False
+            response["nextRecordsUrl"] = f"/services/data/{version}/query/{locator}-{offset + size}"
+        return response
+
+    # Routing
+
+    def handle(
+        self, method: str, path: str, params: Dict[str, str], body: bytes, headers: Dict[str, str]
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        """
+        Route one request.
+
+        Returns:
+            (status, body, headers); body is a JSON-serializable object, bytes or None
+        """
+        with self.lock:
+            fault = next((f for f in self.faults if f[0] == method and f[1].search(path)), None)
+            if fault:
+                self.faults.remove(fault)
+        if fault:
+            raise fault[2]
+        if path.startswith("/services/Soap/u/"):
+            return self.soap_login(body)
+        if path == "/services/oauth2/token":
+            return 200, {
+                "access_token": "00DMOCK!session",
+                "instance_url": "https://mock.my.salesforce.com",
+                "id": "https://login.salesforce.com/id/00D000000000001/005000000000001",
+                "token_type": "Bearer",
+            }, {}
+        match = re.match(r"^/services/data/(v\d+\.\d+)/?(.*)$", path)
+        if not match:
+            raise MockError(404, "NOT_FOUND", f"The requested resource does not exist: {path}")
+        with self.lock:
+            self.api_calls += 1
+        version, resource = match.group(1), match.group(2).rstrip("/")
+        payload = json.loads(body) if body and headers.get("content-type", "").startswith("application/json") else None
+        return self.rest(method, version, resource, params, body, payload, headers)
+
+    def rest(
+        self,
+        method: str,
+        version: str,
+        resource: str,
+        params: Dict[str, str],
+        body: bytes,
+        payload: Any,
+        headers: Dict[str, str],
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        parts = resource.split("/") if resource else []
+        head = parts[0] if parts else ""
+
+        if head in ("query", "queryAll"):
+            # Sforce-Query-Options: batchSize=N sets the page size, as on the real API
+            options = re.search(r"batchSize=(\d+)", headers.get("sforce-query-options", ""))
+            batch_size = min(max(int(options.group(1)), 200), 2000) if options else 0
+            if len(parts) > 1:
+                locator, _, offset = parts[1].rpartition("-")
+                with self.lock:
+                    records = self.cursors.get(locator)
+                if records is None:
+                    raise MockError(400, "INVALID_QUERY_LOCATOR", "invalid query locator")
+                return 200, self.page(version, records, len(records), int(offset), batch_size), {}
+            return 200, self.query_response(version, params.get("q", ""), batch_size), {}
+
+        if head == "search":
+            term = re.sub(r"^FIND\s*\{(.*)\}.*$", r"\1", params.get("q", ""), flags=re.S).strip()
+            hits = []
+            for object_name in ("Account", "Contact"):
+                for row in list(self.table(object_name).values())[:10]:
+                    hits.append({"attributes": self.attributes(object_name, row["Id"]), "Id": row["Id"], "Name": row["Name"]})
+            return 200, {"searchRecords": hits if term else []}, {}
+
+        if head == "parameterizedSearch":
+            # GET takes query parameters, POST a JSON body with per-object fields and limits
+            search = payload or {}
+            if search.get("sobjects"):
+                targets = [(o["name"], o.get("fields") or search.get("fields") or ["Id"], int(o.get("limit", 10)))
+                           for o in search["sobjects"]]
+            elif search:
+                targets = [(o, search.get("fields") or ["Id"], int(search.get("defaultLimit", 10)))
+                           for o in ("Account", "Contact")]
+            else:
+                objects = [o.strip() for o in (params.get("sobject") or "Account").split(",") if o.strip()]
+                targets = [(o, ["Id", "Name"], int(params.get("overallLimit", 10))) for o in objects]
+            hits = []
+            for object_name, fields, limit in targets:
+                for row in list(self.table(object_name).values())[:limit]:
+                    hits.append(self.project(self.canonical_name(object_name), row, fields))
+            return 200, {"searchRecords": hits}, {}
+
+        if head == "limits":
+            if len(parts) > 1 and parts[1] == "recordCount":
+                names = [n for n in (params.get("sObjects") or "").split(",") if n]
+                return 200, {
+                    "sObjects": [
+                        {"name": self.canonical_name(name), "count": len(self.table(name))}
+                        for name in names
+                    ]
+                }, {}
+            with self.lock:
+                used = self.api_calls
+            return 200, {
+                "DailyApiRequests": {"Max": self.config.api_limit, "Remaining": self.config.api_limit - used},
+                "DailyBulkApiBatches": {"Max": 15000, "Remaining": 15000},
+                "DailyBulkV2QueryJobs": {"Max": 10000, "Remaining": 10000},
+            }, {}
+
+        if head == "sobjects":
+            return self.sobjects(method, parts[1:], params, payload, headers)
+
+        if head == "composite":
+            return self.composite(method, version, parts[1:], params, payload, headers)
+
+        if head == "jobs":
+            return self.bulk(method, parts[1:], params, body, payload)
+
+        raise MockError(404, "NOT_FOUND", f"The requested resource does not exist: {resource}")
+
+    def sobjects(
+        self, method: str, parts: List[str], params: Dict[str, str], payload: Any, headers: Dict[str, str]
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        if not parts:
+            return 200, self.global_describe(), {"Last-Modified": _LAST_MODIFIED}
+        object_name = self.canonical_name(parts[0])
+        if len(parts) == 1:
+            if method == "POST":
+                record_id = self.new_id(object_name)
+                stamp = time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime())
+                record = dict(payload or {}, Id=record_id, CreatedDate=stamp, LastModifiedDate=stamp, SystemModstamp=stamp)
+                self.table(object_name)[record_id] = record
+                return 201, {"id": record_id, "success": True, "errors": []}, {}
+            return 200, {"objectDescribe": self.describe(object_name)["name"]}, {}
+        if parts[1] == "describe":
+            if headers.get("if-modified-since") == _LAST_MODIFIED:
+                return 304, None, {}
+            return 200, self.describe(object_name), {"Last-Modified": _LAST_MODIFIED}
+        if parts[1] in ("updated", "deleted"):
+            return self.replication(object_name, parts[1], params)
+
+        table = self.table(object_name)
+        if len(parts) == 3:
+            # Upsert by external ID: sobjects/{object}/{field}/{value}
+            field, value = parts[1], unquote(parts[2])
+            existing = next((r for r in table.values() if str(r.get(field)) == value), None)
+            if existing is not None:
+                existing.update(payload or {})
+                return 204, None, {}
+            record_id = self.new_id(object_name)
+            table[record_id] = dict(payload or {}, Id=record_id, **{field: value})
+            return 201, {"id": record_id, "success": True, "errors": [], "created": True}, {}
+
+        record_id = parts[1]
+        record = table.get(record_id)
+        if record is None:
+            raise MockError(404, "NOT_FOUND", "The requested resource does not exist")
+        if method == "GET":
+            fields = params.get("fields")
+            data = {k: v for k, v in record.items() if not fields or k in fields.split(",")}
+            return 200, dict({"attributes": self.attributes(object_name, record_id)}, **data), {}
+        if method == "PATCH":
+            record.update(payload or {})
+            record["SystemModstamp"] = time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime())
+            return 204, None, {}
+        if method == "DELETE":
+            del table[record_id]
+            self.deleted.setdefault(object_name, {})[record_id] = time.strftime(
+                "%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime()
+            )
+            return 204, None, {}
+        raise MockError(405, "METHOD_NOT_ALLOWED", method)
+
+    def replication(self, object_name: str, kind: str, params: Dict[str, str]) -> Tuple[int, Any, Dict[str, str]]:
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime())
+        if kind == "updated":
+            ids = [r["Id"] for r in self.table(object_name).values() if r.get("SystemModstamp", "") >= params.get("start", "")]
+            return 200, {"ids": ids, "latestDateCovered": stamp}, {}
+        deleted = self.deleted.get(object_name, {})
+        return 200, {
+            "deletedRecords": [{"id": i, "deletedDate": d} for i, d in deleted.items()],
+            "earliestDateAvailable": "2000-01-01T00:00:00.000+0000",
+            "latestDateCovered": stamp,
+        }, {}
+
+    def composite(
+        self,
+        method: str,
+        version: str,
+        parts: List[str],
+        params: Dict[str, str],
+        payload: Any,
+        headers: Dict[str, str],
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        kind = parts[0] if parts else ""
+        if kind == "sobjects":
+            return self.collections(method, parts[1:], params, payload)
+        if kind == "batch":
+            results = []
+            for request in payload.get("batchRequests", []):
+                status, body = self.subrequest(request["method"], f"/services/data/{request['url']}", request.get("richInput"), {})
+                results.append({"statusCode": status, "result": body})
+            return 200, {"hasErrors": any(r["statusCode"] >= 400 for r in results), "results": results}, {}
+        if kind == "graph":
+            graphs = []
+            for graph in payload.get("graphs", []):
+                responses = self.run_composite(graph.get("compositeRequest", []))
+                graphs.append(
+                    {
+                        "graphId": graph.get("graphId"),
+                        "graphResponse": {"compositeResponse": responses},
+                        "isSuccessful": all(r["httpStatusCode"] < 400 for r in responses),
+                    }
+                )
+            return 200, {"graphs": graphs}, {}
+        return 200, {"compositeResponse": self.run_composite(payload.get("compositeRequest", []))}, {}
+
+    def run_composite(self, subrequests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        references: Dict[str, Any] = {}
+        responses = []
+
+        def resolve(value: Any) -> Any:
+            if isinstance(value, str):
+                return re.sub(
+                    r"@\{(\w+)\.(\w+)\}",
+                    lambda m: str((references.get(m.group(1)) or {}).get(m.group(2), "")),
+                    value,
+                )
+            if isinstance(value, dict):
+                return {k: resolve(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [resolve(v) for v in value]
+            return value
+
+        for request in subrequests:
+            status, body = self.subrequest(request["method"], resolve(request["url"]), resolve(request.get("body")), {})
+            references[request.get("referenceId")] = body if isinstance(body, dict) else {}
+            responses.append(
+                {
+                    "body": body,
+                    "httpHeaders": {},
+                    "httpStatusCode": status,
+                    "referenceId": request.get("referenceId"),
+                }
+            )
+        return responses
+
+    def subrequest(self, method: str, url: str, payload: Any, headers: Dict[str, str]) -> Tuple[int, Any]:
+        split = urlsplit(url)
+        params = {k: v[-1] for k, v in parse_qs(split.query).items()}
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        try:
+            status, result, _ = self.handle(
+                method, split.path, params, body, {"content-type": "application/json"}
+            )
+        except MockError as e:
+            return e.status, e.body()
+        return status, result
+
+    def collections(
+        self, method: str, parts: List[str], params: Dict[str, str], payload: Any
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        if method == "POST" and parts:
+            table = self.table(parts[0])
+            fields = payload.get("fields") or []
+            records = []
+            for record_id in payload.get("ids", []):
+                record = table.get(record_id)
+                if record is None:
+                    records.append(None)
+                else:
+                    data = {f: record.get(f) for f in fields} if fields else dict(record)
+                    records.append(dict({"attributes": self.attributes(self.canonical_name(parts[0]), record_id)}, **data))
+            return 200, records, {}
+        if method == "DELETE":
+            results = []
+            for record_id in (params.get("ids") or "").split(","):
+                found = next((t for t in self.records.values() if record_id in t), None)
+                if found is None:
+                    results.append({"id": record_id, "success": False, "errors": [{"statusCode": "ENTITY_IS_DELETED", "message": "entity is deleted"}]})
+                else:
+                    del found[record_id]
+                    results.append({"id": record_id, "success": True, "errors": []})
+            return 200, results, {}
+        results = []
+        for record in payload.get("records", []):
+            object_name = record.get("attributes", {}).get("type", "Account")
+            table = self.table(object_name)
+            if method == "POST":
+                record_id = self.new_id(object_name)
+                table[record_id] = dict(record, Id=record_id)
+                results.append({"id": record_id, "success": True, "errors": []})
+            elif record.get("id") in table or record.get("Id") in table:
+                record_id = record.get("id") or record.get("Id")
+                table[record_id].update({k: v for k, v in record.items() if k not in ("attributes", "id")})
+                results.append({"id": record_id, "success": True, "errors": []})
+            else:
+                results.append({"id": record.get("id"), "success": False, "errors": [{"statusCode": "ENTITY_IS_DELETED", "message": "entity is deleted"}]})
+        return 200, results, {}
+
+    # Bulk API 2.0
+
+    def bulk(
+        self, method: str, parts: List[str], params: Dict[str, str], body: bytes, payload: Any
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        kind = parts[0] if parts else ""
+        job_id = parts[1] if len(parts) > 1 else None
+        if job_id is None:
+            if method != "POST":
+                return 200, {"done": True, "records": list(self.jobs.values())}, {}
+            prefix = "750" if kind == "ingest" else "7501"
+            job_id = f"{prefix}{len(self.jobs) + 1:011d}AAA"[:18]
+            job = dict(payload or {}, id=job_id, state="Open" if kind == "ingest" else "UploadComplete", data=b"")
+            job.setdefault("numberRecordsProcessed", 0)
+            job.setdefault("numberRecordsFailed", 0)
+            with self.lock:
+                self.jobs[job_id] = job
+            if kind == "query":
+                self.finish_query_job(job)
+            return 200, self.job_info(job), {}
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise MockError(404, "NOT_FOUND", f"Job {job_id} not found")
+        action = parts[2] if len(parts) > 2 else ""
+        if action == "batches" and method == "PUT":
+            job["data"] += body
+            return 201, None, {}
+        if method == "PATCH":
+            job["state"] = payload.get("state", job["state"])
+            if job["state"] == "UploadComplete":
+                self.finish_ingest_job(job)
+            return 200, self.job_info(job), {}
+        if method == "DELETE":
+            self.jobs.pop(job_id, None)
+            return 204, None, {}
+        if action == "results":
+            return self.query_results(job, params)
+        if action in ("successfulResults", "failedResults", "unprocessedrecords"):
+            return 200, job.get(action, b""), {"Content-Type": "text/csv"}
+        return 200, self.job_info(job), {}
+
+    def job_info(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in job.items() if k not in ("data", "rows") and not isinstance(v, bytes)}
+
+    def finish_ingest_job(self, job: Dict[str, Any]) -> None:
+        rows = list(csv.DictReader(io.StringIO(job["data"].decode("utf-8"))))
+        header = list(rows[0].keys()) if rows else []
+        successes = io.StringIO()
+        writer = csv.writer(successes, lineterminator="\n")
+        writer.writerow(["sf__Id", "sf__Created"] + header)
+        table = self.table(job.get("object", "Account"))
+        for row in rows:
+            record_id = row.get("Id") or self.new_id(job.get("object", "Account"))
+            table[record_id] = dict(row, Id=record_id)
+            writer.writerow([record_id, "true"] + [row[h] for h in header])
+        job["successfulResults"] = successes.getvalue().encode("utf-8")
+        job["failedResults"] = ("sf__Id,sf__Error," + ",".join(header) + "\n").encode("utf-8")
+        job["unprocessedrecords"] = (",".join(header) + "\n").encode("utf-8")
+        job.update(state="JobComplete", numberRecordsProcessed=len(rows), numberRecordsFailed=0)
+        job["data"] = b""
+
+    def finish_query_job(self, job: Dict[str, Any]) -> None:
+        records, _ = self.run_soql(job.get("query", ""))
+        job["rows"] = [
+            {k: v for k, v in record.items() if k != "attributes" and not isinstance(v, dict)}
+            for record in records
+        ]
+        job.update(state="JobComplete", numberRecordsProcessed=len(records))
+
+    def query_results(self, job: Dict[str, Any], params: Dict[str, str]) -> Tuple[int, Any, Dict[str, str]]:
+        rows = job.get("rows", [])
+        start = int(params.get("locator") or 0)
+        size = int(params.get("maxRecords") or self.config.bulk_page_records)
+        chunk = rows[start : start + size]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        header = list(rows[0].keys()) if rows else []
+        writer.writerow(header)
+        for row in chunk:
+            writer.writerow(["" if row.get(h) is None else row.get(h) for h in header])
+        locator = str(start + size) if start + size < len(rows) else "null"
+        return 200, buffer.getvalue().encode("utf-8"), {
+            "Content-Type": "text/csv",
+            "Sforce-Locator": locator,
+            "Sforce-NumberOfRecords": str(len(chunk)),
+        }
+
+    # Login
+
+    def soap_login(self, body: bytes) -> Tuple[int, Any, Dict[str, str]]:
+        if b"<n1:password>" not in body and b"password>" not in body:
+            return 500, _soap_fault("INVALID_LOGIN", "Invalid username, password, security token; or user locked out."), {"Content-Type": "text/xml"}
+        return 200, _SOAP_LOGIN_RESPONSE, {"Content-Type": "text/xml"}
+
+
+class MockError(Exception):
+    """A Salesforce-style REST error response"""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+    def body(self) -> List[Dict[str, str]]:
+        return [{"errorCode": self.code, "message": self.message}]
+
+
+def _match_select(query: str) -> Optional[Dict[str, str]]:
+    """Split a SELECT at its top-level FROM, skipping FROMs inside subqueries"""
+    if not re.match(r"^\s*SELECT\s", query, re.IGNORECASE):
+        return None
+    depth = 0
+    for index, char in enumerate(query):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0 and char in "Ff" and query[index - 1].isspace():
+            match = _FROM_RE.match(query, index)
+            if match:
+                return {
+                    "fields": re.sub(r"^\s*SELECT\s+", "", query[:index], flags=re.IGNORECASE),
+                    "object": match.group(1),
+                    "rest": query[match.end():],
+                }
+    return None
+
+
+def _split_select(select: str) -> List[str]:
+    items, depth, current = [], 0, []
+    for char in select:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    if "".join(current).strip():
+        items.append("".join(current).strip())
+    return items
+
+
+def _case_insensitive_key(record: Dict[str, Any], key: str) -> str:
+    return next((k for k in record if k.lower() == key.lower()), key)
+
+
+def _soap_fault(code: str, message: str) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><soapenv:Envelope '
+        'xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+        'xmlns:sf="urn:fault.partner.soap.sforce.com"><soapenv:Body><soapenv:Fault>'
+        f"<faultcode>sf:{code}</faultcode><faultstring>{code}: {message}</faultstring>"
+        f"<detail><sf:LoginFault><sf:exceptionCode>{code}</sf:exceptionCode>"
+        f"<sf:exceptionMessage>{message}</sf:exceptionMessage></sf:LoginFault></detail>"
+        "</soapenv:Fault></soapenv:Body></soapenv:Envelope>"
+    ).encode("utf-8")
+
+
+_SOAP_LOGIN_RESPONSE = (
+    '<?xml version="1.0" encoding="UTF-8"?><soapenv:Envelope '
+    'xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns="urn:partner.soap.sforce.com"><soapenv:Body><loginResponse><result>'
+    "<metadataServerUrl>https://mock.my.salesforce.com/services/Soap/m/59.0/00D000000000001</metadataServerUrl>"
+    "<passwordExpired>false</passwordExpired><sandbox>false</sandbox>"
+    "<serverUrl>https://mock.my.salesforce.com/services/Soap/u/59.0/00D000000000001</serverUrl>"
+    "<sessionId>00D000000000001!MOCKSESSION</sessionId><userId>005000000000001AAA</userId>"
+    "<userInfo><organizationId>00D000000000001AAA</organizationId>"
+    "<userEmail>bench@example.com</userEmail><userFullName>Benchmark User</userFullName>"
+    "<userName>bench@example.com</userName></userInfo>"
+    "</result></loginResponse></soapenv:Body></soapenv:Envelope>"
+).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs
+    # add ~40 ms to every keep-alive request
+    disable_nagle_algorithm = True
+    org: MockOrg = None  # set by MockSalesforceServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self):
+        config = self.org.config
+        if config.latency_ms or config.jitter_ms:
+            time.sleep((config.latency_ms + random.uniform(0, config.jitter_ms)) / 1000.0)
+        split = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(split.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        headers = {k.lower(): v for k, v in self.headers.items()}
+        with self.org.lock:
+            self.org.requests += 1
+        try:
+            status, result, extra_headers = self.org.handle(self.command, split.path, params, body, headers)
+        except MockError as e:
+            status, result, extra_headers = e.status, e.body(), {}
+        except Exception as e:  # report bugs in the mock as server errors
+            status, result, extra_headers = 500, [{"errorCode": "UNKNOWN_EXCEPTION", "message": str(e)}], {}
+
+        if result is None:
+            payload, content_type = b"", None
+        elif isinstance(result, bytes):
+            payload, content_type = result, extra_headers.pop("Content-Type", "application/octet-stream")
+        else:
+            payload, content_type = json.dumps(result).encode("utf-8"), "application/json;charset=UTF-8"
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for key, value in extra_headers.items():
+            self.send_header(key, value)
+        with self.org.lock:
+            used = self.org.api_calls
+        self.send_header("Sforce-Limit-Info", f"api-usage={used}/{config.api_limit}")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = do_HEAD = _dispatch
+
+
+class MockSalesforceServer:
+    """Run a MockOrg behind a threaded HTTP server on localhost"""
+
+    def __init__(self, config: Optional[MockConfig] = None, port: int = 0):
+        self.org = MockOrg(config or MockConfig())
+        handler = type("Handler", (_Handler,), {"org": self.org})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockSalesforceServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockSalesforceServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Salesforce stand-in server")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--records", type=int, default=2000, help="Records generated per object")
+    parser.add_argument("--custom-fields", type=int, default=10)
+    parser.add_argument("--field-bytes", type=int, default=24)
+    parser.add_argument("--page-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        records_per_object=args.records,
+        custom_fields=args.custom_fields,
+        field_bytes=args.field_bytes,
+        page_size=args.page_size,
+    )
+    server = MockSalesforceServer(config, port=args.port)
+    print(f"Mock Salesforce listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Check that retries and re-logins never repeat a write that already reached
+Salesforce.
+
+Each scenario injects one failure into the mock server at a point where a
+naive retry of the whole tool call would insert the records again, runs the
+tool and compares the records and Bulk API jobs that exist afterwards with
+what the call should have created.
+
+Usage:
+    python retry_safety.py
+"""
+
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, List
+
+from mock_salesforce import MockConfig, MockSalesforceServer
+from run_benchmarks import load_tools
+
+# Keep backoff waits short; the scenarios only need the retries to happen
+os.environ.setdefault("SF_RETRY_BASE_DELAY_SECONDS", "0.01")
+
+_STATUS_POLL = r"/jobs/ingest/[^/]+/?$"
+_INSERT = r"/sobjects/Account/?$"
+
+
+def _bulk_create(tools) -> Dict[str, Any]:
+    return json.loads(
+        tools.salesforce_bulk_create.fn(
+            object_type="Account",
+            records_data=json.dumps([{"Name": f"Retry {n}"} for n in range(5)]),
+            wait_seconds=30,
+        )
+    )
+
+
+def _create_record(tools) -> Dict[str, Any]:
+    return json.loads(
+        tools.salesforce_create_record.fn(object_type="Account", record_data='{"Name": "Retry"}')
+    )
+
+
+# (name, method, path pattern, status, error code, tool call, records and jobs it should create)
+SCENARIOS: List[tuple] = [
+    ("bulk_create, 503 on a status poll", "GET", _STATUS_POLL, 503, "SERVER_UNAVAILABLE", _bulk_create, 5, 1),
+    ("bulk_create, 429 on a status poll", "GET", _STATUS_POLL, 429, "REQUEST_LIMIT_EXCEEDED", _bulk_create, 5, 1),
+    ("bulk_create, expired session on a status poll", "GET", _STATUS_POLL, 401, "INVALID_SESSION_ID", _bulk_create, 5, 1),
+    ("bulk_create, 503 when closing the job", "PATCH", _STATUS_POLL, 503, "SERVER_UNAVAILABLE", _bulk_create, 0, 1),
+    ("create_record, 503 before the insert", "POST", _INSERT, 503, "SERVER_UNAVAILABLE", _create_record, 1, 0),
+    ("create_record, expired session on the insert", "POST", _INSERT, 401, "INVALID_SESSION_ID", _create_record, 1, 0),
+]
+
+
+def run_scenario(tools, org, scenario: tuple) -> List[str]:
+    """Run one scenario and return what went wrong, if anything"""
+    name, method, pattern, status, code, call, expected_records, expected_jobs = scenario
+    records_before, jobs_before = len(org.table("Account")), len(org.jobs)
+    org.inject_fault(method, pattern, status, code)
+    result = call(tools)
+    created = len(org.table("Account")) - records_before
+    jobs = len(org.jobs) - jobs_before
+
+    problems = []
+    if org.faults:
+        problems.append("the injected failure was never hit")
+        org.faults.clear()
+    if created != expected_records:
+        problems.append(f"{created} records created, expected {expected_records}")
+    if jobs != expected_jobs:
+        problems.append(f"{jobs} Bulk API jobs created, expected {expected_jobs}")
+    if expected_records and "error" in result:
+        problems.append(f"tool failed: {result['error']}")
+    return problems
+
+
+def main() -> int:
+    failed = False
+    with MockSalesforceServer(MockConfig(records_per_object=10)) as server:
+        tools = load_tools(server.url)
+        for scenario in SCENARIOS:
+            problems = run_scenario(tools, server.org, scenario)
+            if problems:
+                failed = True
+                print(f"❌ {scenario[0]}: {'; '.join(problems)}")
+            else:
+                print(f"✅ {scenario[0]}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
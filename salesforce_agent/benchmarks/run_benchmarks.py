@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Benchmark every Salesforce tool against the local stand-in server in
+mock_salesforce.py and report latency percentiles, throughput, payload
+bytes, HTTP/API calls and allocations per call.
+
+Usage:
+    python run_benchmarks.py
+    python run_benchmarks.py --latency-ms 40 --iterations 50 --json results.json
+    python run_benchmarks.py --only query,describe_object --baseline results.json
+
+The tools module and its dependencies (requirements.txt and the watsonx
+Orchestrate ADK) must be installed; only the Salesforce org is simulated.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+from urllib.parse import urlsplit, urlunsplit
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), "tools"))
+
+from mock_salesforce import MockConfig, MockSalesforceServer  # noqa: E402
+
+# Measure the uncached cost of each call unless the caller asks otherwise
+BENCHMARK_ENV = {
+    "SF_RESULT_CACHE_TTL_QUERY": "0",
+    "SF_RESULT_CACHE_TTL_GET_RECORD": "0",
+    "SF_RESULT_CACHE_TTL_RECORD_COUNT": "0",
+    "SF_RESULT_CACHE_TTL_RECENT_RECORDS": "0",
+    "SF_RESULT_CACHE_TTL_RELATED_RECORDS": "0",
+    "SF_BULK_POLL_INTERVAL_SECONDS": "0.05",
+    "SF_RETRY_BASE_DELAY_SECONDS": "0.01",
+    "SF_ARTIFACT_DIR": os.path.join(tempfile.gettempdir(), "salesforce_agent_benchmarks"),
+    # Only Lead is mirrored and indexed so the other benchmarks still measure API calls
+    "SF_MIRROR_OBJECTS": "Lead:Name,Email",
+    "SF_SEARCH_INDEX_OBJECTS": "Lead",
+    "SF_MIRROR_DIR": tempfile.mkdtemp(prefix="salesforce_agent_mirror_"),
+}
+
+MOCK_CREDENTIALS = {
+    "SF_USERNAME": "bench@example.com",
+    "SF_PASSWORD": "password",
+    "SF_SECURITY_TOKEN": "token",
+    "SF_DOMAIN": "login",
+}
+
+
+class _MockConnections:
+    """Stands in for ibm_watsonx_orchestrate.run.connections outside the Orchestrate runtime"""
+
+    @staticmethod
+    def key_value(app_id: str) -> Dict[str, str]:
+        return dict(MOCK_CREDENTIALS)
+
+
+def load_tools(server_url: str):
+    """Import the tools module and route its HTTPS traffic to the mock server"""
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    import salesforce_tools
+
+    target = urlsplit(server_url)
+
+    class RedirectAdapter(salesforce_tools._timeout_adapter_class()):
+        """Send https://*.salesforce.com requests to the local server, keeping the original URL visible"""
+
+        def send(self, request, **kwargs):
+            original = request.url
+            parts = urlsplit(original)
+            request.url = urlunsplit(("http", target.netloc, parts.path, parts.query, ""))
+            try:
+                response = super().send(request, **kwargs)
+            finally:
+                request.url = original
+            response.url = original
+            return response
+
+    salesforce_tools.connections = _MockConnections()
+    session = salesforce_tools._get_http_session()
+    session.mount(
+        "https://",
+        RedirectAdapter(
+            timeout=(salesforce_tools.HTTP_CONNECT_TIMEOUT, salesforce_tools.HTTP_READ_TIMEOUT),
+            pool_connections=salesforce_tools.HTTP_POOL_SIZE,
+            pool_maxsize=salesforce_tools.HTTP_POOL_SIZE,
+            max_retries=0,
+        ),
+    )
+    return salesforce_tools
+
+
+def build_benchmarks(tools, org) -> List[Dict[str, Any]]:
+    """
+    Benchmark definitions. "args" is called with the iteration number and
+    returns the tool keyword arguments, so write benchmarks can create the
+    records they consume.
+    """
+    accounts = list(org.table("Account"))
+    org.table("Contact")
+    org.table("Opportunity")
+
+    def fresh_ids(count: int) -> List[str]:
+        table = org.table("Account")
+        ids = []
+        for _ in range(count):
+            record_id = org.new_id("Account")
+            table[record_id] = {"Id": record_id, "Name": "Disposable"}
+            ids.append(record_id)
+        return ids
+
+    def bulk_handle() -> str:
+        if "handle" not in bulk_state:
+            result = json.loads(
+                tools.salesforce_bulk_create.fn(
+                    object_type="Account",
+                    records_data=json.dumps([{"Name": f"Bulk {n}"} for n in range(100)]),
+                    wait_seconds=30,
+                )
+            )
+            bulk_state["handle"] = result["job_handle"]
+        return bulk_state["handle"]
+
+    bulk_state: Dict[str, str] = {}
+    records_200 = json.dumps([{"Name": f"Bench {n}"} for n in range(200)])
+    return [
+        {"name": "query", "tool": "salesforce_query",
+         "args": lambda i: {"query": "SELECT Id, Name FROM Account LIMIT 200"}},
+        {"name": "query_relationships", "tool": "salesforce_query",
+         "args": lambda i: {"query": "SELECT Id, Name, Email, Account.Name FROM Contact LIMIT 1000"}},
+        {"name": "query_paged", "tool": "salesforce_query",
+         "args": lambda i: {"query": "SELECT Id, Name FROM Opportunity", "max_records": 2000}},
+        {"name": "query_columnar", "tool": "salesforce_query",
+         "args": lambda i: {"query": "SELECT Id, Name FROM Account LIMIT 1000", "output_format": "columnar"}},
+        {"name": "query_file", "tool": "salesforce_query",
+         "args": lambda i: {"query": "SELECT Id, Name FROM Opportunity", "max_records": 2000, "output": "file"}},
+        {"name": "query_mirror", "tool": "salesforce_query",
+         "args": lambda i: {"query": "SELECT Id, Name, Email FROM Lead WHERE Email LIKE 'contact1%' "
+                                     "ORDER BY Name LIMIT 200"}},
+        {"name": "multi_query", "tool": "salesforce_multi_query",
+         "args": lambda i: {"queries": json.dumps({
+             "accounts": "SELECT Id, Name FROM Account LIMIT 100",
+             "contacts": "SELECT Id, Name FROM Contact LIMIT 100",
+             "opportunities": "SELECT Id, Name FROM Opportunity LIMIT 100",
+         })}},
+        {"name": "search", "tool": "salesforce_search",
+         "args": lambda i: {"search_term": "Account"}},
+        {"name": "search_returning", "tool": "salesforce_search",
+         "args": lambda i: {"search_term": "Acme", "returning": json.dumps(
+             {"Account": ["Name"], "Contact": {"fields": ["Name", "Email"], "limit": 10}})}},
+        {"name": "multi_search", "tool": "salesforce_multi_search",
+         "args": lambda i: {"search_terms": json.dumps([f"Acme {n}" for n in range(5)]),
+                            "object_types": "Account"}},
+        {"name": "search_index", "tool": "salesforce_search",
+         "args": lambda i: {"search_term": "contact1*", "object_types": "Lead", "limit": 50}},
+        {"name": "get_record", "tool": "salesforce_get_record",
+         "args": lambda i: {"object_type": "Account", "record_id": accounts[i % len(accounts)]}},
+        {"name": "get_records", "tool": "salesforce_get_records",
+         "args": lambda i: {"object_type": "Account", "record_ids": ",".join(accounts[:200])}},
+        {"name": "get_related_records", "tool": "salesforce_get_related_records",
+         "args": lambda i: {"object_type": "Account", "record_id": accounts[i % len(accounts)],
+                            "fields": "Name", "relationships": "Owner,Contacts,Opportunities,Cases"}},
+        {"name": "get_recent_records", "tool": "salesforce_get_recent_records",
+         "args": lambda i: {"object_type": "Account", "limit": 50}},
+        {"name": "get_record_count", "tool": "salesforce_get_record_count",
+         "args": lambda i: {"object_type": "Account,Contact,Opportunity"}},
+        {"name": "get_record_count_exact", "tool": "salesforce_get_record_count",
+         "args": lambda i: {"object_type": "Account", "where_clause": "Name != null", "exact": True}},
+        {"name": "describe_object", "tool": "salesforce_describe_object",
+         "args": lambda i: {"object_type": "Account"}},
+        {"name": "describe_object_summary", "tool": "salesforce_describe_object",
+         "args": lambda i: {"object_type": "Account", "mode": "summary"}},
+        {"name": "list_objects", "tool": "salesforce_list_objects", "args": lambda i: {}},
+        {"name": "get_user_info", "tool": "salesforce_get_user_info", "args": lambda i: {}},
+        {"name": "create_record", "tool": "salesforce_create_record",
+         "args": lambda i: {"object_type": "Account", "record_data": json.dumps({"Name": f"Bench {i}"})}},
+        {"name": "update_record", "tool": "salesforce_update_record",
+         "args": lambda i: {"object_type": "Account", "record_id": accounts[i % len(accounts)],
+                            "record_data": json.dumps({"Name": f"Updated {i}"})}},
+        {"name": "upsert_record", "tool": "salesforce_upsert_record",
+         "args": lambda i: {"object_type": "Account", "external_id_field": "External_Id__c",
+                            "external_id_value": f"EXT-{i % 10}",
+                            "record_data": json.dumps({"Name": f"Upserted {i}"})}},
+        {"name": "delete_record", "tool": "salesforce_delete_record",
+         "args": lambda i: {"object_type": "Account", "record_id": fresh_ids(1)[0]}},
+        {"name": "update_records", "tool": "salesforce_update_records",
+         "args": lambda i: {"object_type": "Account", "records_data": json.dumps(
+             [{"Id": record_id, "Name": f"Batch {i}"} for record_id in accounts[:200]])}},
+        {"name": "delete_records", "tool": "salesforce_delete_records",
+         "args": lambda i: {"object_type": "Account", "record_ids": ",".join(fresh_ids(200))}},
+        {"name": "composite", "tool": "salesforce_composite",
+         "args": lambda i: {"operations": json.dumps([
+             {"referenceId": "NewAccount", "object": "Account", "body": {"Name": f"Composite {i}"}},
+             {"referenceId": "NewContact", "object": "Contact",
+              "body": {"LastName": "Bench", "AccountId": "@{NewAccount.id}"}},
+             {"referenceId": "Check", "query": "SELECT Id FROM Account LIMIT 1"},
+         ])}},
+        {"name": "bulk_create", "tool": "salesforce_bulk_create",
+         "args": lambda i: {"object_type": "Account", "records_data": records_200, "wait_seconds": 30}},
+        {"name": "bulk_job_status", "tool": "salesforce_bulk_job_status",
+         "args": lambda i: {"job_handle": bulk_handle()}},
+        {"name": "bulk_job_results", "tool": "salesforce_bulk_job_results",
+         "args": lambda i: {"job_handle": bulk_handle(), "result_type": "successful"}},
+        {"name": "bulk_export", "tool": "salesforce_bulk_export",
+         "args": lambda i: {"query": "SELECT Id, Name FROM Contact", "wait_seconds": 30}},
+        {"name": "get_api_limits", "tool": "salesforce_get_api_limits",
+         "args": lambda i: {"refresh": True}},
+        {"name": "get_cache_stats", "tool": "salesforce_get_cache_stats", "args": lambda i: {}},
+        {"name": "get_metrics", "tool": "salesforce_get_metrics", "args": lambda i: {}},
+        {"name": "invalidate_metadata_cache", "tool": "salesforce_invalidate_metadata_cache",
+         "args": lambda i: {"object_type": "Account"}},
+    ]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_benchmark(tools, benchmark: Dict[str, Any], iterations: int, warmup: int) -> Dict[str, Any]:
+    # The tool's own function: calling the ADK tool object wraps the result in a ToolResponse
+    tool_function: Callable[..., str] = getattr(tools, benchmark["tool"]).fn
+    for i in range(warmup):
+        tool_function(**benchmark["args"](i))
+
+    tools._telemetry.reset()
+    latencies, output_bytes, errors, last_error = [], 0, 0, None
+    started = time.perf_counter()
+    for i in range(iterations):
+        kwargs = benchmark["args"](warmup + i)
+        call_started = time.perf_counter()
+        result = tool_function(**kwargs)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+        output_bytes += len(result.encode("utf-8"))
+        if result[:32].lstrip("{ \n").startswith('"error"'):
+            errors += 1
+            last_error = json.loads(result).get("error")
+    elapsed = time.perf_counter() - started
+    counters = tools._telemetry.snapshot().get(benchmark["tool"], {})
+
+    # Allocations are measured on one extra call so tracing doesn't skew latency
+    kwargs = benchmark["args"](warmup + iterations)
+    tracemalloc.start()
+    tool_function(**kwargs)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "name": benchmark["name"],
+        "tool": benchmark["tool"],
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "throughput_per_s": round(iterations / elapsed, 2) if elapsed else 0.0,
+        "output_bytes": output_bytes // iterations,
+        "response_bytes": counters.get("response_bytes", 0) // iterations,
+        "request_bytes": counters.get("request_bytes", 0) // iterations,
+        "http_requests": round(counters.get("http_requests", 0) / iterations, 2),
+        "api_calls": round(counters.get("api_calls", 0) / iterations, 2),
+        "alloc_peak_kb": round(peak / 1024, 1),
+        "alloc_retained_kb": round(retained / 1024, 1),
+        "errors": errors,
+    }
+    if last_error:
+        result["last_error"] = last_error
+    return result
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    columns = [
+        ("name", "benchmark", 26),
+        ("p50_ms", "p50 ms", 9),
+        ("p95_ms", "p95 ms", 9),
+        ("throughput_per_s", "calls/s", 9),
+        ("output_bytes", "out B", 9),
+        ("response_bytes", "resp B", 9),
+        ("http_requests", "http", 6),
+        ("api_calls", "api", 6),
+        ("alloc_peak_kb", "peak KB", 9),
+        ("errors", "err", 4),
+    ]
+    print(" ".join(title.rjust(width) if key != "name" else title.ljust(width) for key, title, width in columns))
+    for result in results:
+        cells = []
+        for key, _, width in columns:
+            value = str(result.get(key, ""))
+            cells.append(value.ljust(width) if key == "name" else value.rjust(width))
+        print(" ".join(cells))
+    for result in results:
+        if result.get("last_error"):
+            print(f"❌ {result['name']}: {result['last_error']}")
+
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """Return the benchmarks whose p50 regressed by more than the threshold ratio"""
+    with open(baseline_path) as f:
+        baseline = {entry["name"]: entry for entry in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["name"])
+        if not previous or not previous["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / previous["p50_ms"]
+        marker = "❌" if ratio > threshold else "✅"
+        print(f"{marker} {result['name']}: p50 {previous['p50_ms']} -> {result['p50_ms']} ms ({ratio:.2f}x)")
+        if ratio > threshold:
+            regressions.append(result["name"])
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Salesforce tools against a local mock org")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", default="", help="Comma-separated benchmark names to run")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency per request")
+    parser.add_argument("--records", type=int, default=2000, help="Records generated per object")
+    parser.add_argument("--custom-fields", type=int, default=10, help="Custom fields per record")
+    parser.add_argument("--field-bytes", type=int, default=24, help="Size of each custom field value")
+    parser.add_argument("--page-size", type=int, default=2000, help="Records per query page")
+    parser.add_argument("--json", dest="json_path", default="", help="Write results to this file")
+    parser.add_argument("--baseline", default="", help="Compare against a previous --json file")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Allowed p50 ratio against the baseline")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        records_per_object=args.records,
+        custom_fields=args.custom_fields,
+        field_bytes=args.field_bytes,
+        page_size=args.page_size,
+    )
+    with MockSalesforceServer(config) as server:
+        tools = load_tools(server.url)
+        benchmarks = build_benchmarks(tools, server.org)
+        if args.only:
+            wanted = {name.strip() for name in args.only.split(",")}
+            benchmarks = [b for b in benchmarks if b["name"] in wanted]
+
+        print(f"Mock Salesforce at {server.url}, {args.iterations} iterations per benchmark")
+        results = [run_benchmark(tools, b, args.iterations, args.warmup) for b in benchmarks]
+
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.json_path}")
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,28 @@ Uses simple-salesforce library for Salesforce operations
 """
 
 import os
+import io
+import bisect
+import contextlib
+import contextvars
+import copy
+import csv
+import re
 import json
-from typing import Dict, List, Any, Optional
-from simple_salesforce import Salesforce, SalesforceLogin
+import functools
+import base64
+import hashlib
+import hmac
+import tempfile
+import threading
+import time
+import queue
+import random
+import sys
+import weakref
+from collections import OrderedDict
+from urllib.parse import quote, urlsplit
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Callable, Iterator, Tuple
 from ibm_watsonx_orchestrate.agent_builder.tools import tool, ToolPermission
 from ibm_watsonx_orchestrate.agent_builder.connections import (
     ConnectionType,
@@ -14,70 +33,4342 @@ from ibm_watsonx_orchestrate.agent_builder.connections import (
 )
 from ibm_watsonx_orchestrate.run import connections
 
-import datetime
-import pytz
+try:
+    import orjson
+except ImportError:  # optional fast serializer
+    orjson = None
 
+# requests and simple_salesforce are imported on first use rather than at
+# import time, which keeps cold starts of scaled-to-zero workers fast
+if TYPE_CHECKING:
+    import requests
+    from simple_salesforce import Salesforce
 
+
+# Authenticated sessions are reused across tool calls for this many seconds
+SESSION_TTL_SECONDS = int(os.environ.get("SF_SESSION_TTL_SECONDS", "3600"))
+
+_CREDENTIAL_KEYS = (
+    "SF_USERNAME",
+    "SF_PASSWORD",
+    "SF_SECURITY_TOKEN",
+    "SF_DOMAIN",
+    "SF_SESSION_ID",
+    "SF_INSTANCE",
+    "SF_CONSUMER_KEY",
+    "SF_CONSUMER_SECRET",
+)
+
+# Shared HTTP transport settings
+HTTP_POOL_SIZE = int(os.environ.get("SF_HTTP_POOL_SIZE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("SF_HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.environ.get("SF_HTTP_READ_TIMEOUT", "120"))
+
+_http_session: Optional["requests.Session"] = None
+_http_session_lock = threading.Lock()
+
+# Process-wide session cache keyed by a hash of the salesforce_creds values
+_session_cache: Dict[str, Dict[str, Any]] = {}
+_session_cache_lock = threading.Lock()
+# Logins for the same credentials share a lock; a fixed set of stripes keeps
+# the number of locks bounded however many credential sets are seen
+_LOGIN_LOCK_STRIPES = 16
+_login_locks = [threading.Lock() for _ in range(_LOGIN_LOCK_STRIPES)]
+_session_org_keys: "weakref.WeakKeyDictionary[Salesforce, str]" = (
+    weakref.WeakKeyDictionary()
+)
+# Connections built from a fixed SF_SESSION_ID, which logging in again can't renew
+_static_sessions: "weakref.WeakSet[Salesforce]" = weakref.WeakSet()
+
+# sObject Collections settings
+COLLECTIONS_PARALLELISM = int(os.environ.get("SF_COLLECTIONS_PARALLELISM", "4"))
+COLLECTIONS_MAX_RECORDS = int(os.environ.get("SF_COLLECTIONS_MAX_RECORDS", "10000"))
+_COLLECTIONS_RETRIEVE_MAX_IDS = 2000
+_COLLECTIONS_WRITE_MAX_RECORDS = 200
+
+# Composite API limits
+_COMPOSITE_MAX_SUBREQUESTS = 25
+_COMPOSITE_GRAPH_MAX_NODES = 500
+
+# Default cap on records returned by one salesforce_query call
+QUERY_MAX_RECORDS = int(os.environ.get("SF_QUERY_MAX_RECORDS", "2000"))
+
+# Key that signs query cursors, together with the org; set the same value on
+# every worker when calls may land on different processes (default: random per process)
+_CURSOR_SECRET = os.environ.get("SF_CURSOR_SECRET", "").encode("utf-8") or os.urandom(32)
+
+# SOQL limits per query on child subqueries, parent relationships and length
+_SOQL_MAX_CHILD_SUBQUERIES = 20
+_SOQL_MAX_PARENT_RELATIONSHIPS = 55
+_SOQL_MAX_LENGTH = 100000
+
+# Default cap on child records per relationship in salesforce_get_related_records
+RELATED_RECORDS_LIMIT = int(os.environ.get("SF_RELATED_RECORDS_LIMIT", "50"))
+
+# Queries run at once by salesforce_multi_query
+MULTI_QUERY_PARALLELISM = int(os.environ.get("SF_MULTI_QUERY_PARALLELISM", "8"))
+
+# Response encoding: compact JSON bounded by a byte (or approximate token) budget
+RESPONSE_INDENT = int(os.environ.get("SF_RESPONSE_INDENT", "0"))
+RESPONSE_MAX_BYTES = int(os.environ.get("SF_RESPONSE_MAX_BYTES", "200000"))
+RESPONSE_MAX_TOKENS = int(os.environ.get("SF_RESPONSE_MAX_TOKENS", "0"))
+_BYTES_PER_TOKEN = 4
+
+# Bulk API 2.0 ingest settings
+BULK_PARALLEL_JOBS = int(os.environ.get("SF_BULK_PARALLEL_JOBS", "4"))
+BULK_MAX_UPLOAD_BYTES = int(
+    os.environ.get("SF_BULK_MAX_UPLOAD_BYTES", str(100 * 1024 * 1024))
+)
+BULK_POLL_INTERVAL_SECONDS = float(os.environ.get("SF_BULK_POLL_INTERVAL_SECONDS", "2"))
+BULK_EXPORT_PAGE_RECORDS = int(os.environ.get("SF_BULK_EXPORT_PAGE_RECORDS", "50000"))
+
+# Local files written by tools (bulk result files, exports)
+ARTIFACT_DIR = os.environ.get(
+    "SF_ARTIFACT_DIR",
+    os.path.join(tempfile.gettempdir(), "salesforce_agent", "artifacts"),
+)
+# Results whose records encode to more than this many bytes are streamed to a
+# JSON Lines artifact file, and the tool returns its path and a summary (0 disables)
+RESULT_ARTIFACT_THRESHOLD_BYTES = int(
+    os.environ.get("SF_RESULT_ARTIFACT_THRESHOLD_BYTES", str(1024 * 1024))
+)
+# "jsonl" or "jsonl.gz"
+RESULT_ARTIFACT_FORMAT = os.environ.get("SF_RESULT_ARTIFACT_FORMAT", "jsonl")
+
+# Read-only tool result cache: per-tool TTLs (0 disables) and a memory bound
+RESULT_CACHE_TTLS = {
+    "salesforce_query": int(os.environ.get("SF_RESULT_CACHE_TTL_QUERY", "60")),
+    "salesforce_get_record": int(os.environ.get("SF_RESULT_CACHE_TTL_GET_RECORD", "120")),
+    "salesforce_get_record_count": int(
+        os.environ.get("SF_RESULT_CACHE_TTL_RECORD_COUNT", "60")
+    ),
+    "salesforce_get_recent_records": int(
+        os.environ.get("SF_RESULT_CACHE_TTL_RECENT_RECORDS", "30")
+    ),
+    "salesforce_get_related_records": int(
+        os.environ.get("SF_RESULT_CACHE_TTL_RELATED_RECORDS", "60")
+    ),
+}
+RESULT_CACHE_MAX_BYTES = int(
+    os.environ.get("SF_RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+)
+
+# Describe metadata cache settings
+DESCRIBE_CACHE_DIR = os.environ.get(
+    "SF_DESCRIBE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "salesforce_agent", "describe"),
+)
+DESCRIBE_CACHE_MAX_BYTES = int(
+    os.environ.get("SF_DESCRIBE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+DESCRIBE_CACHE_DISK_MAX_BYTES = int(
+    os.environ.get("SF_DESCRIBE_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024))
+)
+DESCRIBE_CACHE_REVALIDATE_SECONDS = int(
+    os.environ.get("SF_DESCRIBE_CACHE_REVALIDATE_SECONDS", "300")
+)
+
+# Local SQLite mirror of frequently read sObjects, e.g. "Account:Name,Industry;Contact"
+# (no field list mirrors every non-formula field). Eligible read-only queries are
+# answered from the mirror, which is refreshed incrementally once it is older than
+# SF_MIRROR_MAX_STALENESS_SECONDS. Empty disables the mirror.
+MIRROR_OBJECTS = os.environ.get("SF_MIRROR_OBJECTS", "")
+MIRROR_DIR = os.environ.get(
+    "SF_MIRROR_DIR", os.path.join(tempfile.gettempdir(), "salesforce_agent", "mirror")
+)
+MIRROR_MAX_STALENESS_SECONDS = float(os.environ.get("SF_MIRROR_MAX_STALENESS_SECONDS", "60"))
+MIRROR_MAX_RECORDS = int(os.environ.get("SF_MIRROR_MAX_RECORDS", "200000"))
+# Full-text index over mirrored text fields, e.g. "Account:Name,Website;Contact"
+# (no field list indexes every text field). Listed objects are mirrored as well.
+# salesforce_search answers searches scoped to indexed objects from it.
+SEARCH_INDEX_OBJECTS = os.environ.get("SF_SEARCH_INDEX_OBJECTS", "")
+
+# Tool call telemetry export: "stdout", a file path, or empty to only keep
+# in-memory metrics (see salesforce_get_metrics)
+TELEMETRY_EXPORT = os.environ.get("SF_TELEMETRY_EXPORT", "")
+TELEMETRY_METRICS_INTERVAL_SECONDS = float(
+    os.environ.get("SF_TELEMETRY_METRICS_INTERVAL_SECONDS", "60")
+)
+
+# Retries of transient failures (connection errors, 5xx, row locks, concurrency limits)
+RETRY_MAX_ATTEMPTS = int(os.environ.get("SF_RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY_SECONDS = float(os.environ.get("SF_RETRY_BASE_DELAY_SECONDS", "0.5"))
+RETRY_MAX_DELAY_SECONDS = float(os.environ.get("SF_RETRY_MAX_DELAY_SECONDS", "10"))
+
+# Per-org circuit breaker: after this many consecutive transient failures, calls
+# fail fast for SF_CIRCUIT_RESET_SECONDS instead of adding load to a struggling org
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("SF_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("SF_CIRCUIT_RESET_SECONDS", "30"))
+
+# Daily API usage (percent of the org's limit) at which non-essential calls are
+# cut back: at the throttle level cached metadata is no longer revalidated and
+# batchable reads go through composite; at the shed level uncached describes are refused
+API_USAGE_THROTTLE_PERCENT = float(os.environ.get("SF_API_USAGE_THROTTLE_PERCENT", "80"))
+API_USAGE_SHED_PERCENT = float(os.environ.get("SF_API_USAGE_SHED_PERCENT", "95"))
+_COMPOSITE_BATCH_MAX_SUBREQUESTS = 25
+
+
+_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 75, 100, 250, 500, 750, 1000, 2500, 5000, 7500, 10000, 30000)
+_TELEMETRY_PHASES = ("total", "auth", "network", "serialization")
+_TELEMETRY_COUNTERS = (
+    "api_calls",
+    "http_requests",
+    "request_bytes",
+    "response_bytes",
+    "output_bytes",
+    "cache_hits",
+    "cache_misses",
+)
+_SPAN_MAX_CHILDREN = 50
+
+
+class _Span:
+    """One tool call: timings per phase, counters and child spans for auth and HTTP"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.values: Dict[str, float] = {}
+        self.children: List[Dict[str, Any]] = []
+        self.dropped_children = 0
+        self.error_code: Optional[str] = None
+        self._phases = threading.local()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + value
+
+    def in_phase(self, phase: str) -> bool:
+        return phase in getattr(self._phases, "active", ())
+
+    def enter_phase(self, phase: str) -> None:
+        self._phases.active = getattr(self._phases, "active", ()) + (phase,)
+
+    def exit_phase(self) -> None:
+        self._phases.active = self._phases.active[:-1]
+
+    def child(self, name: str, start_ns: int, end_ns: int, attributes: Dict[str, Any]) -> None:
+        with self._lock:
+            if len(self.children) >= _SPAN_MAX_CHILDREN:
+                self.dropped_children += 1
+                return
+            self.children.append(
+                {
+                    "name": name,
+                    "span_id": os.urandom(8).hex(),
+                    "start_ns": start_ns,
+                    "end_ns": end_ns,
+                    "attributes": attributes,
+                }
+            )
+
+
+# Span of the tool call running in the current context (copied into worker threads)
+_current_span: "contextvars.ContextVar[Optional[_Span]]" = contextvars.ContextVar(
+    "salesforce_tool_span", default=None
+)
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Encode attributes the way OTLP/JSON does"""
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": typed})
+    return encoded
+
+
+class _Telemetry:
+    """
+    Per-tool latency histograms and counters, plus span export.
+
+    Metrics are always collected in memory. When SF_TELEMETRY_EXPORT is set,
+    every finished tool call is written as an OTLP/JSON span batch (one JSON
+    object per line) and cumulative metrics follow at most every
+    SF_TELEMETRY_METRICS_INTERVAL_SECONDS, so any OpenTelemetry collector or
+    plain log shipper can pick them up.
+    """
+
+    def __init__(self, export_target: str, metrics_interval: float):
+        self.export_target = export_target
+        self.metrics_interval = metrics_interval
+        self._histograms: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._calls: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._start_ns = time.time_ns()
+        self._last_metrics_export = time.monotonic()
+
+    def add(self, name: str, value: float = 1) -> None:
+        """Add to a counter of the tool call in progress, if any"""
+        span = _current_span.get()
+        if span is not None:
+            span.add(name, value)
+
+    def phase(self, name: str) -> "_TelemetryPhase":
+        return _TelemetryPhase(name)
+
+    def record_http(
+        self,
+        request: "requests.PreparedRequest",
+        response: "requests.Response",
+        seconds: float,
+        response_bytes: int,
+    ) -> None:
+        span = _current_span.get()
+        if span is None:
+            return
+        path = urlsplit(request.url).path
+        body = request.body or b""
+        request_bytes = len(body.encode("utf-8") if isinstance(body, str) else body)
+        span.add("http_requests")
+        span.add("request_bytes", request_bytes)
+        span.add("response_bytes", response_bytes)
+        if path.startswith(("/services/data/", "/services/async/")):
+            span.add("api_calls")
+        # Login traffic is part of the auth phase, not the tool's network time
+        if not span.in_phase("auth"):
+            span.add("network_ms", seconds * 1000)
+        end_ns = time.time_ns()
+        span.child(
+            f"HTTP {request.method}",
+            end_ns - int(seconds * 1e9),
+            end_ns,
+            {
+                "http.request.method": request.method,
+                "url.path": path,
+                "http.response.status_code": response.status_code,
+                "http.request.body.size": request_bytes,
+                "http.response.body.size": response_bytes,
+            },
+        )
+
+    def finish(self, span: _Span) -> None:
+        span.end_ns = time.time_ns()
+        values = dict(span.values)
+        values["total_ms"] = (span.end_ns - span.start_ns) / 1e6
+        with self._lock:
+            calls = self._calls.setdefault(span.name, {"calls": 0, "errors": 0})
+            calls["calls"] += 1
+            if span.error_code:
+                calls["errors"] += 1
+            for phase in _TELEMETRY_PHASES:
+                self._observe(span.name, phase, values.get(f"{phase}_ms", 0.0))
+            for counter in _TELEMETRY_COUNTERS:
+                key = (span.name, counter)
+                self._counters[key] = self._counters.get(key, 0) + values.get(counter, 0)
+        if self.export_target:
+            self._export(
+                {"resourceSpans": [self._resource(scopeSpans=[self._span_batch(span)])]}
+            )
+            if time.monotonic() - self._last_metrics_export >= self.metrics_interval:
+                self._last_metrics_export = time.monotonic()
+                self._export(self.otlp_metrics())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-tool call counts, counters and latency percentiles per phase"""
+        with self._lock:
+            tools: Dict[str, Any] = {}
+            for name, calls in self._calls.items():
+                entry = dict(calls)
+                for counter in _TELEMETRY_COUNTERS:
+                    entry[counter] = int(self._counters.get((name, counter), 0))
+                entry["latency_ms"] = {
+                    phase: self._summary(self._histograms[(name, phase)])
+                    for phase in _TELEMETRY_PHASES
+                    if (name, phase) in self._histograms
+                }
+                tools[name] = entry
+        return tools
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._calls.clear()
+            self._start_ns = time.time_ns()
+
+    def otlp_metrics(self) -> Dict[str, Any]:
+        """Cumulative metrics in OTLP/JSON form"""
+        now = str(time.time_ns())
+        start = str(self._start_ns)
+        with self._lock:
+            histogram_points = [
+                {
+                    "attributes": _otlp_attributes({"tool": tool, "phase": phase}),
+                    "startTimeUnixNano": start,
+                    "timeUnixNano": now,
+                    "count": str(histogram["count"]),
+                    "sum": histogram["sum"],
+                    "bucketCounts": [str(count) for count in histogram["buckets"]],
+                    "explicitBounds": list(_LATENCY_BUCKETS_MS),
+                }
+                for (tool, phase), histogram in self._histograms.items()
+            ]
+            metrics = [
+                {
+                    "name": "salesforce.tool.duration",
+                    "unit": "ms",
+                    "histogram": {
+                        "aggregationTemporality": "AGGREGATION_TEMPORALITY_CUMULATIVE",
+                        "dataPoints": histogram_points,
+                    },
+                }
+            ]
+            for counter in _TELEMETRY_COUNTERS:
+                metrics.append(
+                    {
+                        "name": f"salesforce.tool.{counter}",
+                        "unit": "By" if counter.endswith("bytes") else "1",
+                        "sum": {
+                            "aggregationTemporality": "AGGREGATION_TEMPORALITY_CUMULATIVE",
+                            "isMonotonic": True,
+                            "dataPoints": [
+                                {
+                                    "attributes": _otlp_attributes({"tool": tool}),
+                                    "startTimeUnixNano": start,
+                                    "timeUnixNano": now,
+                                    "asInt": str(int(value)),
+                                }
+                                for (tool, name), value in self._counters.items()
+                                if name == counter
+                            ],
+                        },
+                    }
+                )
+        scope_metrics = [{"scope": self._scope(), "metrics": metrics}]
+        return {"resourceMetrics": [self._resource(scopeMetrics=scope_metrics)]}
+
+    def _observe(self, tool: str, phase: str, value_ms: float) -> None:
+        histogram = self._histograms.get((tool, phase))
+        if histogram is None:
+            histogram = self._histograms[(tool, phase)] = {
+                "count": 0,
+                "sum": 0.0,
+                "max": 0.0,
+                "buckets": [0] * (len(_LATENCY_BUCKETS_MS) + 1),
+            }
+        histogram["count"] += 1
+        histogram["sum"] += value_ms
+        histogram["max"] = max(histogram["max"], value_ms)
+        histogram["buckets"][bisect.bisect_left(_LATENCY_BUCKETS_MS, value_ms)] += 1
+
+    def _summary(self, histogram: Dict[str, Any]) -> Dict[str, Any]:
+        def percentile(fraction: float) -> float:
+            # Upper bound of the bucket holding the percentile
+            target = fraction * histogram["count"]
+            seen = 0
+            for index, count in enumerate(histogram["buckets"]):
+                seen += count
+                if seen >= target and count:
+                    if index < len(_LATENCY_BUCKETS_MS):
+                        return round(min(_LATENCY_BUCKETS_MS[index], histogram["max"]), 1)
+                    break
+            return round(histogram["max"], 1)
+
+        return {
+            "count": histogram["count"],
+            "mean": round(histogram["sum"] / histogram["count"], 1) if histogram["count"] else 0.0,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": round(histogram["max"], 1),
+        }
+
+    def _scope(self) -> Dict[str, Any]:
+        return {"name": "salesforce_agent.tools"}
+
+    def _resource(self, **scopes) -> Dict[str, Any]:
+        return dict(
+            {"resource": {"attributes": _otlp_attributes({"service.name": "salesforce_agent"})}},
+            **scopes,
+        )
+
+    def _span_batch(self, span: _Span) -> Dict[str, Any]:
+        attributes: Dict[str, Any] = {"tool.name": span.name}
+        for name, value in sorted(span.values.items()):
+            if isinstance(value, float):
+                value = round(value, 3)
+            attributes[f"salesforce.{name}"] = value
+        if span.dropped_children:
+            attributes["salesforce.dropped_child_spans"] = span.dropped_children
+        status = {"code": "STATUS_CODE_OK"}
+        if span.error_code:
+            status = {"code": "STATUS_CODE_ERROR", "message": span.error_code}
+        spans = [
+            {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": "SPAN_KIND_INTERNAL",
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": _otlp_attributes(attributes),
+                "status": status,
+            }
+        ]
+        for child in span.children:
+            spans.append(
+                {
+                    "traceId": span.trace_id,
+                    "spanId": child["span_id"],
+                    "parentSpanId": span.span_id,
+                    "name": child["name"],
+                    "kind": (
+                        "SPAN_KIND_CLIENT"
+                        if child["name"].startswith("HTTP")
+                        else "SPAN_KIND_INTERNAL"
+                    ),
+                    "startTimeUnixNano": str(child["start_ns"]),
+                    "endTimeUnixNano": str(child["end_ns"]),
+                    "attributes": _otlp_attributes(child["attributes"]),
+                }
+            )
+        return {"scope": self._scope(), "spans": spans}
+
+    def _export(self, payload: Dict[str, Any]) -> None:
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+        try:
+            with self._export_lock:
+                if self.export_target == "stdout":
+                    sys.stdout.write(line)
+                    sys.stdout.flush()
+                else:
+                    with open(self.export_target, "a", encoding="utf-8") as handle:
+                        handle.write(line)
+        except OSError:
+            # Telemetry must never break a tool call
+            pass
+
+
+class _TelemetryPhase:
+    """Context manager timing a phase (auth, serialization) of the current tool call"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.span: Optional[_Span] = None
+
+    def __enter__(self) -> "_TelemetryPhase":
+        self.span = _current_span.get()
+        if self.span is not None:
+            self.started_ns = time.time_ns()
+            self.started = time.perf_counter()
+            self.span.enter_phase(self.name)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        span = self.span
+        if span is None:
+            return
+        span.exit_phase()
+        # Only the outermost occurrence of a phase counts (login inside a retry, etc.)
+        if not span.in_phase(self.name):
+            span.add(f"{self.name}_ms", (time.perf_counter() - self.started) * 1000)
+            if self.name == "auth":
+                span.child("auth", self.started_ns, time.time_ns(), {})
+
+
+_telemetry = _Telemetry(TELEMETRY_EXPORT, TELEMETRY_METRICS_INTERVAL_SECONDS)
+
+
+def _phase(name: str) -> Callable:
+    """Decorator timing a function as a phase of the current tool call"""
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with _telemetry.phase(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _instrumented(function: Callable) -> Callable:
+    """
+    Record a tool call as a span: latency per phase, HTTP and API call counts,
+    payload bytes and cache hits. Goes directly under @tool.
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        span = _Span(function.__name__)
+        token = _current_span.set(span)
+        try:
+            result = function(*args, **kwargs)
+            if isinstance(result, str):
+                span.add("output_bytes", len(result.encode("utf-8")))
+                if result[:32].lstrip("{ \n").startswith('"error"'):
+                    span.error_code = json.loads(result).get("error_code", "ERROR")
+            return result
+        except Exception as e:
+            span.error_code = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            _telemetry.finish(span)
+
+    return wrapper
+
+
+@functools.lru_cache(maxsize=None)
+def _timeout_adapter_class() -> type:
+    """
+    Build the HTTPAdapter subclass used by the shared session. Defined on
+    first use so importing this module doesn't import requests.
+    """
+    from requests.adapters import HTTPAdapter
+
+    class _TimeoutHTTPAdapter(HTTPAdapter):
+        """HTTPAdapter that applies a default timeout to requests that don't set one"""
+
+        def __init__(self, timeout, **kwargs):
+            self.timeout = timeout
+            super().__init__(**kwargs)
+
+        def send(self, request, **kwargs):
+            if kwargs.get("timeout") is None:
+                kwargs["timeout"] = self.timeout
+            started = time.perf_counter()
+            response = super().send(request, **kwargs)
+            if kwargs.get("stream"):
+                response_bytes = int(response.headers.get("Content-Length") or 0)
+            else:
+                # Read the body here so download time counts as network time
+                response_bytes = len(response.content)
+            _telemetry.record_http(
+                request, response, time.perf_counter() - started, response_bytes
+            )
+            return response
+
+    return _TimeoutHTTPAdapter
+
+
+class _ApiQuotaExceeded(Exception):
+    """Raised instead of spending API calls on non-essential work near the daily limit"""
+
+
+_API_USAGE_RE = re.compile(r"(?:^|[\s,;])api-usage=(\d+)/(\d+)")
+
+
+class _ApiUsageTracker:
+    """
+    Daily API consumption per instance host, read from the Sforce-Limit-Info
+    header that Salesforce adds to every REST response.
+    """
+
+    def __init__(self):
+        self._usage: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, response: "requests.Response", *args, **kwargs) -> None:
+        """requests response hook"""
+        header = response.headers.get("Sforce-Limit-Info")
+        if not header:
+            return
+        match = _API_USAGE_RE.search(header)
+        if match:
+            host = urlsplit(response.url).hostname or ""
+            self.update(host, int(match.group(1)), int(match.group(2)))
+
+    def update(self, host: str, used: int, limit: int) -> None:
+        with self._lock:
+            entry = self._usage.setdefault(host.lower(), {"responses": 0})
+            entry.update(used=used, limit=limit, updated_at=time.time())
+            entry["responses"] += 1
+
+    def usage(self, sf: "Salesforce") -> Optional[Dict[str, Any]]:
+        """Latest known usage for a connection's instance, or None before any response"""
+        return self._host_usage(sf.sf_instance or "")
+
+    def level(self, sf: "Salesforce") -> str:
+        """Return "normal", "throttle" or "shed" for a connection's org"""
+        usage = self.usage(sf)
+        return usage["level"] if usage else "normal"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = list(self._usage)
+        return {host: self._host_usage(host) for host in hosts}
+
+    def _host_usage(self, host: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._usage.get(host.lower())
+            entry = dict(entry) if entry is not None else None
+        if entry is None:
+            return None
+        entry["remaining"] = entry["limit"] - entry["used"]
+        entry["percent_used"] = (
+            round(100.0 * entry["used"] / entry["limit"], 2) if entry["limit"] else 0.0
+        )
+        entry["level"] = self._level(entry["percent_used"])
+        return entry
+
+    def _level(self, percent_used: float) -> str:
+        if percent_used >= API_USAGE_SHED_PERCENT:
+            return "shed"
+        if percent_used >= API_USAGE_THROTTLE_PERCENT:
+            return "throttle"
+        return "normal"
+
+
+_api_usage = _ApiUsageTracker()
+
+
+def _get_http_session() -> "requests.Session":
+    """
+    Return the pooled requests session shared by every Salesforce connection.
+
+    Reusing one session keeps TCP/TLS connections to the instance warm between
+    tool calls instead of paying a new handshake for every request.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+
+                session = requests.Session()
+                adapter = _timeout_adapter_class()(
+                    timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                    pool_connections=HTTP_POOL_SIZE,
+                    pool_maxsize=HTTP_POOL_SIZE,
+                    max_retries=0,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(
+                    {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+                )
+                session.hooks["response"].append(_api_usage.record)
+                session.hooks["response"].append(_note_retry_after)
+                session.hooks["response"].append(_note_applied_write)
+                _http_session = session
+    return _http_session
+
+
+def _read_salesforce_credentials() -> Dict[str, Optional[str]]:
+    """Read and validate the salesforce_creds connection values"""
+    # Get credentials from orchestrate connection (required)
+    try:
+        conn = connections.key_value("salesforce_creds")
+        creds = {key: conn.get(key) for key in _CREDENTIAL_KEYS}
+        creds["SF_DOMAIN"] = conn.get("SF_DOMAIN", "login")
+    except Exception as e:
+        raise Exception(
+            f"Failed to access Salesforce connection 'salesforce_creds': {str(e)}. Please ensure the connection is properly configured."
+        )
+
+    # Validate that we have required credentials
+    if not creds["SF_USERNAME"]:
+        raise Exception(
+            "SF_USERNAME not found in connection 'salesforce_creds'. Please set credentials using setup_connection.sh"
+        )
+
+    if not creds["SF_PASSWORD"]:
+        raise Exception(
+            "SF_PASSWORD not found in connection 'salesforce_creds'. Please set credentials using setup_connection.sh"
+        )
+
+    return creds
+
+
+def _credentials_key(creds: Dict[str, Optional[str]]) -> str:
+    """Hash the credential values so secrets are never used as cache keys directly"""
+    digest = hashlib.sha256()
+    for key in _CREDENTIAL_KEYS:
+        digest.update(key.encode("utf-8") + b"=")
+        digest.update((creds.get(key) or "").encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def _login(creds: Dict[str, Optional[str]]) -> "Salesforce":
+    """Authenticate against Salesforce using the best available credential set"""
+    from simple_salesforce import Salesforce
+
+    sf_username = creds["SF_USERNAME"]
+    sf_password = creds["SF_PASSWORD"]
+    sf_security_token = creds["SF_SECURITY_TOKEN"]
+    sf_domain = creds["SF_DOMAIN"]
+    sf_session_id = creds["SF_SESSION_ID"]
+    sf_instance = creds["SF_INSTANCE"]
+    sf_consumer_key = creds["SF_CONSUMER_KEY"]
+    sf_consumer_secret = creds["SF_CONSUMER_SECRET"]
+    session = _get_http_session()
+
+    # Try different authentication methods based on available credentials
+    if sf_session_id and sf_instance:
+        # Session ID method
+        sf = Salesforce(instance=sf_instance, session_id=sf_session_id, session=session)
+        _static_sessions.add(sf)
+    elif sf_username and sf_password and sf_security_token:
+        # Username/Password/Security Token method
+        sf = Salesforce(
+            username=sf_username,
+            password=sf_password,
+            security_token=sf_security_token,
+            domain=sf_domain,  # 'test' for sandbox, 'login' for production
+            session=session,
+        )
+    elif sf_username and sf_password and sf_consumer_key and sf_consumer_secret:
+        # Connected App method
+        sf = Salesforce(
+            username=sf_username,
+            password=sf_password,
+            consumer_key=sf_consumer_key,
+            consumer_secret=sf_consumer_secret,
+            domain=sf_domain,
+            session=session,
+        )
+    else:
+        raise ValueError(
+            "Missing required Salesforce credentials. Please configure the salesforce_creds connection or set appropriate environment variables."
+        )
+
+    # Pretty-printed JSON only inflates response bodies
+    sf.headers.pop("X-PrettyPrint", None)
+    return sf
+
+
+def _cached_session(key: str) -> Optional["Salesforce"]:
+    """Return the cached connection for a credentials key if it has not expired"""
+    with _session_cache_lock:
+        entry = _session_cache.get(key)
+        if entry and entry["expires_at"] > time.monotonic():
+            return entry["sf"]
+        return None
+
+
+@_phase("auth")
 def get_salesforce_connection():
-    """Create and return a Salesforce connection using credentials from orchestrate connections"""
+    """Return a Salesforce connection, reusing a cached authenticated session when possible"""
+    try:
+        creds = _read_salesforce_credentials()
+        key = _credentials_key(creds)
+
+        sf = _cached_session(key)
+        if sf is not None:
+            return sf
+
+        # Single-flight login: concurrent callers for the same credentials wait
+        # for one login instead of all authenticating at once
+        with _login_locks[int(key[:8], 16) % _LOGIN_LOCK_STRIPES]:
+            sf = _cached_session(key)
+            if sf is not None:
+                return sf
+
+            sf = _login(creds)
+            with _session_cache_lock:
+                _session_org_keys[sf] = key
+                _session_cache[key] = {
+                    "sf": sf,
+                    "expires_at": time.monotonic() + SESSION_TTL_SECONDS,
+                }
+            return sf
+    except Exception as e:
+        raise Exception(f"Failed to connect to Salesforce: {str(e)}")
+
+
+def _invalidate_session(sf: "Salesforce") -> None:
+    """Drop a cached session, unless another caller already replaced it"""
+    with _session_cache_lock:
+        for key, entry in list(_session_cache.items()):
+            if entry["sf"] is sf:
+                del _session_cache[key]
+
+
+def _is_invalid_session(error: Exception) -> bool:
+    """Check whether an API error means the session id expired or was revoked"""
+    from simple_salesforce.exceptions import SalesforceExpiredSession
+
+    return isinstance(error, SalesforceExpiredSession) or "INVALID_SESSION_ID" in str(
+        error
+    )
+
+
+class _CircuitOpen(Exception):
+    """Raised without calling Salesforce while an org's circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            "Salesforce has failed repeatedly for this org; calls are paused for "
+            f"{max(1, round(retry_after))}s to let it recover"
+        )
+
+
+class _CircuitBreaker:
+    """
+    Consecutive transient-failure counter per org. Once it reaches the
+    threshold the circuit opens and calls fail fast; after reset_seconds the
+    next call is let through as a probe and its outcome closes or reopens it.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.trips = 0
+
+    def check(self, key: str) -> None:
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or state["opened_at"] is None:
+                return
+            remaining = state["opened_at"] + self.reset_seconds - time.monotonic()
+            if remaining > 0:
+                raise _CircuitOpen(remaining)
+            # Half-open: let this call probe, keep the others out meanwhile
+            state["opened_at"] = time.monotonic()
+
+    def success(self, key: str) -> None:
+        with self._lock:
+            self._state.pop(key, None)
+
+    def failure(self, key: str) -> bool:
+        """Count a transient failure; returns True when the circuit is now open"""
+        if self.threshold <= 0:
+            return False
+        with self._lock:
+            state = self._state.setdefault(key, {"failures": 0, "opened_at": None})
+            state["failures"] += 1
+            if state["failures"] < self.threshold:
+                return False
+            if state["opened_at"] is None:
+                self.trips += 1
+            state["opened_at"] = time.monotonic()
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            open_circuits = sum(1 for state in self._state.values() if state["opened_at"])
+        return {"open": open_circuits, "trips": self.trips}
+
+
+_circuit_breaker = _CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+_retry_hints = threading.local()
+
+# Writes Salesforce accepted during the running operation attempt. A failed
+# non-idempotent operation is only run again when none of its writes took effect,
+# whatever the request that finally failed says about itself.
+_applied_writes: "contextvars.ContextVar[Optional[List[int]]]" = contextvars.ContextVar(
+    "salesforce_applied_writes", default=None
+)
+
+
+# Set while a request that changes data is in flight; read-only POSTs such as
+# Collections retrieve, composite/batch queries or parameterizedSearch leave it unset
+_sending_write: "contextvars.ContextVar[bool]" = contextvars.ContextVar(
+    "salesforce_sending_write", default=False
+)
+
+
+@contextlib.contextmanager
+def _sending_writes() -> Iterator[None]:
+    """Mark requests sent inside the block as data-changing"""
+    token = _sending_write.set(True)
+    try:
+        yield
+    finally:
+        _sending_write.reset(token)
+
+
+def _note_applied_write(response: "requests.Response", *args, **kwargs) -> None:
+    """requests response hook counting accepted writes for the running attempt"""
+    writes = _applied_writes.get()
+    if writes is not None and _sending_write.get() and response.status_code < 300:
+        writes[0] += 1
+
+
+@contextlib.contextmanager
+def _tracking_writes() -> Iterator[List[int]]:
+    """Count writes accepted inside the block, adding them to any enclosing count"""
+    writes = [0]
+    token = _applied_writes.set(writes)
     try:
-        # Get credentials from orchestrate connection (required)
+        yield writes
+    finally:
+        _applied_writes.reset(token)
+        outer = _applied_writes.get()
+        if outer is not None:
+            outer[0] += writes[0]
+
+
+def _note_retry_after(response: "requests.Response", *args, **kwargs) -> None:
+    """requests response hook remembering Retry-After for the calling thread"""
+    value = response.headers.get("Retry-After") if response.status_code in (429, 503) else None
+    delay = None
+    if value:
+        if value.strip().isdigit():
+            delay = float(value)
+        else:
+            from email.utils import mktime_tz, parsedate_tz
+
+            parsed = parsedate_tz(value)
+            delay = max(0.0, mktime_tz(parsed) - time.time()) if parsed else None
+    _retry_hints.retry_after = delay
+
+
+_RETRYABLE_ERROR_CODES = {"UNABLE_TO_LOCK_ROW", "REQUEST_LIMIT_EXCEEDED", "SERVER_UNAVAILABLE"}
+
+
+def _classify_error(error: Exception) -> Dict[str, Any]:
+    """
+    Describe an error for retries and for the tool response.
+
+    Returns:
+        Dict with error_code, retryable (a later attempt may succeed) and
+        not_applied (Salesforce certainly did not carry out the request, so
+        repeating even a non-idempotent write is safe)
+    """
+    import requests
+    from simple_salesforce.exceptions import SalesforceError
+
+    # Connection setup wraps the original exception
+    cause = error
+    while not isinstance(cause, (SalesforceError, requests.RequestException)):
+        if cause.__cause__ is None and cause.__context__ is None:
+            cause = error
+            break
+        cause = cause.__cause__ or cause.__context__
+
+    info = {"error_code": "ERROR", "retryable": False, "not_applied": False}
+    if isinstance(error, _CircuitOpen):
+        info.update(
+            error_code="CIRCUIT_OPEN",
+            retryable=True,
+            not_applied=True,
+            retry_after=error.retry_after,
+        )
+    elif isinstance(error, _ApiQuotaExceeded):
+        info.update(error_code="API_USAGE_NEAR_LIMIT", not_applied=True)
+    elif isinstance(cause, requests.exceptions.ConnectTimeout):
+        info.update(error_code="CONNECTION_ERROR", retryable=True, not_applied=True)
+    elif isinstance(cause, requests.exceptions.Timeout):
+        info.update(error_code="TIMEOUT", retryable=True)
+    elif isinstance(cause, requests.ConnectionError):
+        info.update(error_code="CONNECTION_ERROR", retryable=True)
+    elif isinstance(cause, SalesforceError):
+        # SalesforceAuthenticationFailed has neither status nor content
+        status = getattr(cause, "status", None)
+        content = getattr(cause, "content", None)
+        detail = content[0] if isinstance(content, list) and content else {}
+        detail = detail if isinstance(detail, dict) else {}
+        code = detail.get("errorCode") or (f"HTTP_{status}" if status else type(cause).__name__)
+        info["error_code"] = code
+        if code == "REQUEST_LIMIT_EXCEEDED" and "TotalRequests" in str(detail.get("message")):
+            # The daily cap, not the concurrent request limit: retrying won't help today
+            pass
+        elif code in _RETRYABLE_ERROR_CODES or status in (429, 503):
+            info.update(retryable=True, not_applied=True)
+        elif status in (502, 504):
+            info["retryable"] = True
+    elif isinstance(error, (ValueError, KeyError)):
+        info["error_code"] = "INVALID_INPUT"
+    retry_after = getattr(_retry_hints, "retry_after", None)
+    if info["retryable"] and retry_after is not None and "retry_after" not in info:
+        info["retry_after"] = retry_after
+    return info
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After when given"""
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2**attempt))
+
+
+def _with_retries(
+    call: Callable[[], Any], org_key: Optional[str] = None, idempotent: bool = True
+) -> Any:
+    """
+    Call with bounded retries of transient failures, tracked by the org's
+    circuit breaker. Non-idempotent calls are only repeated when the failure
+    shows Salesforce did not carry out the request and no earlier write of
+    the same attempt was accepted.
+    """
+    attempt = 0
+    while True:
+        if org_key is not None:
+            _circuit_breaker.check(org_key)
+        _retry_hints.retry_after = None
         try:
-            conn = connections.key_value("salesforce_creds")
-            sf_username = conn.get("SF_USERNAME")
-            sf_password = conn.get("SF_PASSWORD")
-            sf_security_token = conn.get("SF_SECURITY_TOKEN")
-            sf_domain = conn.get("SF_DOMAIN", "login")
-            sf_session_id = conn.get("SF_SESSION_ID")
-            sf_instance = conn.get("SF_INSTANCE")
-            sf_consumer_key = conn.get("SF_CONSUMER_KEY")
-            sf_consumer_secret = conn.get("SF_CONSUMER_SECRET")
+            with _tracking_writes() as writes:
+                result = call()
         except Exception as e:
-            raise Exception(
-                f"Failed to access Salesforce connection 'salesforce_creds': {str(e)}. Please ensure the connection is properly configured."
+            if _is_invalid_session(e):
+                raise
+            info = _classify_error(e)
+            tripped = (
+                info["retryable"] and org_key is not None and _circuit_breaker.failure(org_key)
             )
+            delay = _backoff_delay(attempt, info.get("retry_after"))
+            attempt += 1
+            if (
+                tripped
+                or not info["retryable"]
+                or not (idempotent or (info["not_applied"] and not writes[0]))
+                or attempt >= RETRY_MAX_ATTEMPTS
+                or delay > RETRY_MAX_DELAY_SECONDS
+            ):
+                raise
+            time.sleep(delay)
+            continue
+        if org_key is not None:
+            _circuit_breaker.success(org_key)
+        return result
+
+
+def _with_salesforce(operation: Callable[["Salesforce"], Any], idempotent: bool = True) -> Any:
+    """
+    Run an operation with a cached connection, retrying transient failures
+    and re-authenticating once if the session turns out to be expired.
+
+    Args:
+        operation: Function of the connection doing the tool's work
+        idempotent: Whether repeating the operation is harmless. Creates and
+            deletes pass False so they are only retried when they certainly
+            did not reach Salesforce.
+    """
+    sf = _with_retries(get_salesforce_connection)
+    try:
+        with _tracking_writes() as writes:
+            return _with_retries(lambda: operation(sf), _org_key(sf), idempotent)
+    except Exception as e:
+        if not _is_invalid_session(e):
+            raise
+        _invalidate_session(sf)
+        if sf in _static_sessions:
+            # A new connection would carry the same expired session id
+            raise Exception(
+                "Salesforce session expired. The salesforce_creds connection uses a fixed "
+                "SF_SESSION_ID; update SF_SESSION_ID with a new session id, or configure "
+                "username/password credentials so the tools can log in again."
+            ) from e
+        if not idempotent and writes[0]:
+            # Part of the operation already took effect; running it again would repeat it
+            raise
+        sf = _with_retries(get_salesforce_connection)
+        return _with_retries(lambda: operation(sf), _org_key(sf), idempotent)
+
+
+def _org_key(sf: "Salesforce") -> str:
+    """Return the cache namespace for a connection (the hash of its credentials)"""
+    with _session_cache_lock:
+        key = _session_org_keys.get(sf)
+    if key is None:
+        key = hashlib.sha256(sf.sf_instance.encode("utf-8")).hexdigest()
+    return key
+
+
+def _sf_request(
+    sf: "Salesforce", method: str, path: str, allowed_statuses=(), write: bool = False, **kwargs
+) -> "requests.Response":
+    """
+    Send a raw REST request with the connection's auth headers.
+
+    Args:
+        sf: Authenticated Salesforce connection
+        method: HTTP method
+        path: Absolute URL, instance-relative path ("/services/...") or a path
+            relative to the versioned REST base URL ("sobjects/Account/describe")
+        allowed_statuses: Non-2xx status codes to return instead of raising
+        write: The request changes data, so retries must not repeat it once accepted
+
+    Returns:
+        The requests response
+    """
+    from simple_salesforce.util import exception_handler
+
+    if path.startswith(("https://", "http://")):
+        url = path
+    elif path.startswith("/"):
+        url = f"https://{sf.sf_instance}{path}"
+    else:
+        url = sf.base_url + path
+
+    headers = dict(sf.headers)
+    headers.update(kwargs.pop("headers", None) or {})
+    with _sending_writes() if write else contextlib.nullcontext():
+        response = sf.session.request(method, url, headers=headers, **kwargs)
+    if response.status_code >= 300 and response.status_code not in allowed_statuses:
+        exception_handler(response, path)
+    return response
+
+
+def _dumps(value: Any, indent: int = RESPONSE_INDENT) -> str:
+    """Serialize to JSON, using orjson when it is installed"""
+    if orjson is not None and not indent:
+        try:
+            return orjson.dumps(value, default=str).decode("utf-8")
+        except TypeError:
+            # e.g. non-string keys or integers orjson can't represent
+            pass
+    if indent:
+        return json.dumps(value, indent=indent, default=str, ensure_ascii=False)
+    return json.dumps(value, separators=(",", ":"), default=str, ensure_ascii=False)
+
+
+def _response_budget() -> int:
+    """Return the maximum response size in bytes (0 means unlimited)"""
+    budget = RESPONSE_MAX_BYTES
+    if RESPONSE_MAX_TOKENS > 0:
+        token_bytes = RESPONSE_MAX_TOKENS * _BYTES_PER_TOKEN
+        budget = min(budget, token_bytes) if budget > 0 else token_bytes
+    return budget
+
+
+def _clean_value(value: Any, flatten: bool) -> Any:
+    if isinstance(value, dict):
+        if isinstance(value.get("records"), list) and "totalSize" in value:
+            # Child relationship subquery result
+            nested = {key: val for key, val in value.items() if key != "records"}
+            nested["records"] = [_clean_record(r, flatten) for r in value["records"]]
+            return nested
+        return _clean_record(value, flatten)
+    if isinstance(value, list):
+        return [_clean_value(item, flatten) for item in value]
+    return value
+
+
+def _clean_record(record: Dict[str, Any], flatten: bool = False) -> Dict[str, Any]:
+    """
+    Drop the per-record "attributes" blob and convert to plain dicts.
+
+    With flatten=True, parent relationship fields are lifted into dotted keys,
+    e.g. {"Account": {"Name": "Acme"}} becomes {"Account.Name": "Acme"}.
+    """
+    cleaned: Dict[str, Any] = {}
+    for key, value in record.items():
+        if key == "attributes":
+            continue
+        if flatten and isinstance(value, dict) and "records" not in value:
+            for sub_key, sub_value in _clean_record(value, flatten).items():
+                cleaned[f"{key}.{sub_key}"] = sub_value
+        else:
+            cleaned[key] = _clean_value(value, flatten)
+    return cleaned
+
+
+def _shape_records(
+    records: List[Dict[str, Any]], output_format: str = "records"
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Convert raw records into one of the response layouts.
+
+    Args:
+        records: Records as returned by simple-salesforce
+        output_format: "records" (objects without attributes), "flat" (parent
+            relationship fields as dotted keys) or "columnar" (a single field
+            header plus one value row per record)
+
+    Returns:
+        The layout as a dict and the key holding its list of items
+    """
+    if output_format == "records":
+        return {"records": [_clean_record(r) for r in records]}, "records"
+    if output_format == "flat":
+        return {"records": [_clean_record(r, flatten=True) for r in records]}, "records"
+    if output_format == "columnar":
+        flat = [_clean_record(r, flatten=True) for r in records]
+        fields: Dict[str, None] = {}
+        for record in flat:
+            for key in record:
+                fields.setdefault(key, None)
+        columns = list(fields)
+        rows = [[record.get(column) for column in columns] for record in flat]
+        return {"fields": columns, "rows": rows}, "rows"
+    raise ValueError(
+        f"Unknown output_format '{output_format}'. Use 'records', 'flat' or 'columnar'."
+    )
+
+
+@_phase("serialization")
+def _encode_response(
+    payload: Any,
+    list_key: Optional[str] = None,
+    continuation: Optional[Callable[[int], Optional[str]]] = None,
+    budget: Optional[int] = None,
+) -> str:
+    """
+    Encode a tool response as compact JSON within the response budget.
+
+    If the encoded payload is over budget and payload[list_key] is a list (or a
+    dict keyed by ID), it is cut to what fits and a "truncated" marker is added. When a
+    continuation callback is given it is called with the number of items kept
+    and its token is returned as next_cursor so the agent can resume. budget
+    overrides the configured byte budget, e.g. for one part of a combined response.
+    """
+    text = _dumps(payload)
+    if budget is None:
+        budget = _response_budget()
+    if (
+        budget <= 0
+        or not list_key
+        or not isinstance(payload, dict)
+        or not isinstance(payload.get(list_key), (list, dict))
+        or len(text.encode("utf-8")) <= budget
+    ):
+        return text
+
+    items = payload[list_key]
+    keyed = isinstance(items, dict)
+    entries = list(items.items()) if keyed else items
+    trimmed = dict(payload)
+    trimmed[list_key] = {} if keyed else []
+    trimmed["truncated"] = {"omitted": len(items)}
+    # Leave room for the counters and a continuation token
+    used = len(_dumps(trimmed).encode("utf-8")) + 512
+    keep = 0
+    for entry in entries:
+        size = len(_dumps(entry).encode("utf-8")) + 1
+        if used + size > budget:
+            break
+        used += size
+        keep += 1
+
+    trimmed[list_key] = dict(entries[:keep]) if keyed else items[:keep]
+    trimmed["truncated"] = {"omitted": len(items) - keep, "reason": "response size budget"}
+    if "returned" in trimmed:
+        trimmed["returned"] = keep
+    token = continuation(keep) if continuation else None
+    if token:
+        trimmed["next_cursor"] = token
+        trimmed["done"] = False
+    else:
+        trimmed["truncated"][
+            "hint"
+        ] = "Narrow the request (fewer fields, a filter or a lower limit) to see the omitted items"
+    return _dumps(trimmed)
+
+
+def _error_payload(error: Exception) -> Dict[str, Any]:
+    """Structured error: message plus a stable error_code and whether retrying may help"""
+    info = _classify_error(error)
+    payload = {"error": str(error), "error_code": info["error_code"], "retryable": info["retryable"]}
+    if info.get("retry_after") is not None:
+        payload["retry_after_seconds"] = round(info["retry_after"], 1)
+    return payload
+
+
+def _error_response(error: Exception) -> str:
+    """Encode a tool error"""
+    return _encode_response(_error_payload(error))
+
+
+def _map_concurrently(
+    function: Callable[[Any], Any], items: List[Any], max_workers: int
+) -> List[Tuple[Any, Optional[Exception]]]:
+    """
+    Call function on every item using a bounded thread pool.
+
+    Returns:
+        (result, error) per item, in input order; error is None on success
+    """
+
+    def call(item):
+        try:
+            return function(item), None
+        except Exception as e:
+            return None, e
+
+    if len(items) <= 1 or max_workers <= 1:
+        return [call(item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Each worker runs in a copy of the caller's context so telemetry follows it
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(lambda context, item: context.run(call, item), contexts, items))
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _parse_id_list(record_ids: str) -> List[str]:
+    """Accept a JSON array or a comma-separated string of record IDs, without duplicates"""
+    text = record_ids.strip()
+    if text.startswith("["):
+        ids = json.loads(text)
+    else:
+        ids = text.split(",")
+    return list(dict.fromkeys(str(record_id).strip() for record_id in ids if str(record_id).strip()))
+
+
+def _parse_field_list(fields: str) -> List[str]:
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def _retrieve_records(
+    sf: "Salesforce", object_type: str, record_ids: List[str], fields: List[str]
+) -> Dict[str, Any]:
+    """
+    Fetch many records by ID with the sObject Collections retrieve endpoint.
+
+    IDs are sent in chunks of up to 2000, and the chunks run concurrently.
+    Missing records come back as {"not_found": true}. If a chunk fails, each
+    of its IDs gets an "error" entry.
+    """
+    if not fields:
+        # The retrieve endpoint needs an explicit field list; compound address
+        # and location fields are covered by their component fields
+        fields = [
+            field["name"]
+            for field in _describe_cache.get(sf, object_type)["fields"]
+            if field.get("type") not in ("address", "location")
+        ]
+
+    def retrieve(chunk):
+        return _sf_request(
+            sf,
+            "POST",
+            f"composite/sobjects/{object_type}",
+            json={"ids": chunk, "fields": fields},
+        ).json()
+
+    chunks = _chunks(record_ids, _COLLECTIONS_RETRIEVE_MAX_IDS)
+    records: Dict[str, Any] = {}
+    found = 0
+    for chunk, (result, error) in zip(
+        chunks, _map_concurrently(retrieve, chunks, COLLECTIONS_PARALLELISM)
+    ):
+        for index, record_id in enumerate(chunk):
+            if error is not None:
+                records[record_id] = _error_payload(error)
+            elif index < len(result) and result[index]:
+                records[record_id] = _clean_record(result[index])
+                found += 1
+            else:
+                records[record_id] = {"not_found": True}
+
+    return {
+        "object_type": object_type,
+        "requested": len(record_ids),
+        "found": found,
+        "records": records,
+    }
+
+
+def _write_collection(
+    sf: "Salesforce",
+    object_type: str,
+    operation: str,
+    items: List[Any],
+    all_or_none: bool,
+    parallelism: int,
+) -> Dict[str, Any]:
+    """
+    Update or delete records through sObject Collections, 200 per request.
+
+    Chunks run concurrently. all_or_none is applied per 200-record request;
+    a rollback in one chunk does not undo the others.
+
+    Args:
+        operation: "update" (items are records with an Id) or "delete" (items are IDs)
+
+    Returns:
+        Per-record results in input order plus success/failure totals
+    """
+    if len(items) > COLLECTIONS_MAX_RECORDS:
+        raise ValueError(
+            f"Too many records ({len(items)}). At most {COLLECTIONS_MAX_RECORDS} are allowed per call; "
+            "use the Bulk API for larger loads."
+        )
+
+    def write(chunk):
+        if operation == "update":
+            body = {
+                "allOrNone": all_or_none,
+                "records": [
+                    dict(record, attributes={"type": object_type}) for record in chunk
+                ],
+            }
+            return _sf_request(sf, "PATCH", "composite/sobjects", json=body, write=True).json()
+        params = {"ids": ",".join(chunk), "allOrNone": str(all_or_none).lower()}
+        return _sf_request(sf, "DELETE", "composite/sobjects", params=params, write=True).json()
+
+    chunks = _chunks(items, _COLLECTIONS_WRITE_MAX_RECORDS)
+    workers = parallelism if parallelism > 0 else COLLECTIONS_PARALLELISM
+    results: List[Dict[str, Any]] = []
+    for chunk, (response, error) in zip(chunks, _map_concurrently(write, chunks, workers)):
+        for index, item in enumerate(chunk):
+            record_id = item.get("Id") if operation == "update" else item
+            if error is not None:
+                results.append({"id": record_id, "success": False, "errors": [str(error)]})
+                continue
+            outcome = response[index] if index < len(response) else {}
+            results.append(
+                {
+                    "id": outcome.get("id") or record_id,
+                    "success": bool(outcome.get("success")),
+                    "errors": [
+                        f"{err.get('statusCode')}: {err.get('message')}"
+                        for err in outcome.get("errors", [])
+                    ],
+                }
+            )
+
+    succeeded = sum(1 for result in results if result["success"])
+    return {
+        "object_type": object_type,
+        "operation": operation,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
+
+
+def _composite_subrequest(sf: "Salesforce", index: int, operation: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build one Composite API subrequest from a tool operation.
+
+    Operations either give a raw "url", a "query", or an "object" plus
+    optional "id" (which may be a reference such as "@{NewAccount.id}").
+    """
+    if not isinstance(operation, dict):
+        raise ValueError(f"Operation {index} must be a JSON object")
+
+    base = f"/services/data/v{sf.sf_version}"
+    reference_id = operation.get("referenceId") or f"ref{index}"
+    method = (operation.get("method") or "").upper()
+    if operation.get("url"):
+        url = operation["url"]
+        if not url.startswith("/"):
+            url = f"{base}/{url}"
+    elif operation.get("query"):
+        url = f"{base}/query/?q={quote(operation['query'])}"
+        method = method or "GET"
+    elif operation.get("object"):
+        url = f"{base}/sobjects/{operation['object']}"
+        if operation.get("id"):
+            url += f"/{operation['id']}"
+        method = method or ("PATCH" if operation.get("id") else "POST")
+    else:
+        raise ValueError(f"Operation {index} needs a 'url', 'query' or 'object'")
+
+    subrequest = {"method": method or "GET", "url": url, "referenceId": reference_id}
+    if operation.get("body") is not None:
+        subrequest["body"] = operation["body"]
+    return subrequest
+
+
+def _composite_objects(operations: List[Any]) -> Optional[List[str]]:
+    """
+    sObjects touched by composite operations, or None when any operation uses a
+    raw URL whose target can't be determined
+    """
+    objects = []
+    for operation in operations:
+        if isinstance(operation, dict) and operation.get("object"):
+            objects.append(operation["object"])
+        elif isinstance(operation, dict) and operation.get("query"):
+            continue
+        else:
+            return None
+    return objects
+
+
+def _composite_results(responses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "referenceId": response.get("referenceId"),
+            "httpStatusCode": response.get("httpStatusCode"),
+            "body": _clean_value(response.get("body"), flatten=False),
+        }
+        for response in responses
+    ]
+
+
+def _run_composite(
+    sf: "Salesforce", operations: List[Any], all_or_none: bool, use_graph: bool
+) -> Dict[str, Any]:
+    """
+    Execute dependent operations in one round trip.
+
+    Up to 25 operations go through the Composite resource. Larger sets, or
+    use_graph=True, go through Composite Graph (up to 500 nodes), which is
+    always all-or-none.
+    """
+    if not operations:
+        raise ValueError("operations must contain at least one operation")
+    subrequests = [
+        _composite_subrequest(sf, index, operation)
+        for index, operation in enumerate(operations)
+    ]
+    # Only subrequests that read (queries, retrieves) leave data unchanged
+    write = any(subrequest["method"] != "GET" for subrequest in subrequests)
+
+    if len(subrequests) > _COMPOSITE_MAX_SUBREQUESTS:
+        use_graph = True
+    if use_graph:
+        if not all_or_none:
+            raise ValueError(
+                f"More than {_COMPOSITE_MAX_SUBREQUESTS} operations run as a composite graph, "
+                "which is always all-or-none. Set all_or_none=true or split the operations."
+            )
+        if len(subrequests) > _COMPOSITE_GRAPH_MAX_NODES:
+            raise ValueError(
+                f"At most {_COMPOSITE_GRAPH_MAX_NODES} operations are allowed in one call"
+            )
+        body = {"graphs": [{"graphId": "graph1", "compositeRequest": subrequests}]}
+        result = _sf_request(sf, "POST", "composite/graph", json=body, write=write).json()
+        graph = (result.get("graphs") or [{}])[0]
+        responses = graph.get("graphResponse", {}).get("compositeResponse", [])
+        return {
+            "mode": "graph",
+            "success": bool(graph.get("isSuccessful")),
+            "results": _composite_results(responses),
+        }
+
+    body = {"allOrNone": all_or_none, "compositeRequest": subrequests}
+    result = _sf_request(sf, "POST", "composite", json=body, write=write).json()
+    responses = result.get("compositeResponse", [])
+    return {
+        "mode": "composite",
+        "success": all(
+            200 <= (response.get("httpStatusCode") or 0) < 300 for response in responses
+        ),
+        "results": _composite_results(responses),
+    }
+
+
+def _cursor_signature(sf: "Salesforce", payload: str) -> str:
+    """Sign a cursor payload for the connection's org"""
+    key = _CURSOR_SECRET + _org_key(sf).encode("utf-8")
+    digest = hmac.new(key, payload.encode("ascii"), hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def _encode_cursor(sf: "Salesforce", state: Dict[str, Any]) -> str:
+    """Pack resume state into an opaque, signed token the agent can pass back"""
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    payload = base64.urlsafe_b64encode(raw).decode("ascii")
+    return f"{payload}.{_cursor_signature(sf, payload)}"
+
+
+def _decode_cursor(sf: "Salesforce", cursor: str) -> Dict[str, Any]:
+    """
+    Unpack a token produced by _encode_cursor for the same org, rejecting any
+    token that was altered or doesn't hold a query locator or kept page
+    """
+    payload, _, signature = cursor.strip().rpartition(".")
+    state = None
+    try:
+        if payload and hmac.compare_digest(signature, _cursor_signature(sf, payload)):
+            state = json.loads(base64.urlsafe_b64decode(payload.encode("ascii")))
+    except Exception:
+        state = None
+    if isinstance(state, dict) and set(state) == {"url"}:
+        valid = isinstance(state["url"], str) and state["url"].startswith("/services/data/")
+    elif isinstance(state, dict) and set(state) == {"tail", "skip"}:
+        valid = (
+            isinstance(state["tail"], str)
+            and isinstance(state["skip"], int)
+            and state["skip"] >= 0
+        )
+    else:
+        valid = False
+    if not valid:
+        raise ValueError("Invalid cursor. Pass the next_cursor value from a previous result.")
+    return state
+
+
+# Salesforce keeps a query locator for 15 minutes after its last use
+_QUERY_LOCATOR_TTL_SECONDS = 900
+# Query pages kept for cursors into results that have no locator
+_QUERY_TAIL_ENTRIES = 32
+# Page sizes accepted by the Sforce-Query-Options batchSize header
+_QUERY_MIN_BATCH = 200
+_QUERY_MAX_BATCH = 2000
+# nextRecordsUrl: query locator followed by the offset of the next record
+_QUERY_LOCATOR_RE = re.compile(r"^(/services/data/[^?#]+/query(?:All)?/[^/?#]+)-(\d+)$")
+
+
+class _QueryTails:
+    """
+    Recently returned query pages that can't be fetched again through a query
+    locator (results that fit in one batch have none), so a cursor into the
+    middle of one resumes from memory instead of running the query again.
+    Bounded by entry count with LRU eviction; entries expire like locators.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, sf: "Salesforce", page: Dict[str, Any]) -> str:
+        token = base64.urlsafe_b64encode(os.urandom(12)).decode("ascii")
+        with self._lock:
+            self._entries[(_org_key(sf), token)] = (time.monotonic() + self.ttl, page)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return token
+
+    def get(self, sf: "Salesforce", token: str) -> Optional[Dict[str, Any]]:
+        key = (_org_key(sf), token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            self._entries[key] = (time.monotonic() + self.ttl, entry[1])
+            self._entries.move_to_end(key)
+            return entry[1]
+
+
+_query_tails = _QueryTails(_QUERY_TAIL_ENTRIES, _QUERY_LOCATOR_TTL_SECONDS)
+
+
+def _page_position(page: Dict[str, Any], fetched_from: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Return (query locator, offset of the first record) for a page, if it has a locator"""
+    if fetched_from:
+        match = _QUERY_LOCATOR_RE.match(fetched_from)
+        if match:
+            return match.group(1), int(match.group(2))
+    next_url = page.get("nextRecordsUrl")
+    match = _QUERY_LOCATOR_RE.match(next_url or "") if not page.get("done", True) else None
+    if match:
+        return match.group(1), int(match.group(2)) - len(page.get("records", []))
+    return None
+
+
+def _iter_query_pages(
+    sf: "Salesforce",
+    query: Optional[str] = None,
+    next_url: Optional[str] = None,
+    first_page: Optional[Dict[str, Any]] = None,
+    batch_size: int = 0,
+) -> Iterator[Tuple[Dict[str, Any], Optional[Tuple[str, int]]]]:
+    """
+    Lazily yield result pages of a SOQL query, following nextRecordsUrl.
+
+    Only one page is held in memory at a time. Each item is the page plus the
+    query locator and offset of its first record, or None when the page has
+    no locator; cursors are built from these positions.
+
+    Args:
+        sf: Authenticated Salesforce connection
+        query: SOQL query to start from
+        next_url: nextRecordsUrl (or any locator offset) to resume from instead of running the query
+        first_page: Already fetched first page (e.g. from a composite batch)
+        batch_size: Records per page to ask for, 200-2000 (0 keeps the org default)
+    """
+    headers = {"Sforce-Query-Options": f"batchSize={batch_size}"} if batch_size else {}
+    url = next_url
+    while True:
+        if first_page is not None:
+            page, first_page = first_page, None
+        elif url:
+            page = sf.query_more(url, identifier_is_url=True, headers=headers)
+        else:
+            page = sf.query(query, headers=headers)
+        yield page, _page_position(page, url)
+        if page.get("done", True) or not page.get("nextRecordsUrl"):
+            return
+        url = page["nextRecordsUrl"]
+
+
+def _iter_query_batches(sf: "Salesforce", query: str) -> Iterator[List[Dict[str, Any]]]:
+    """Stream the records of a SOQL query one API batch at a time"""
+    for page, _ in _iter_query_pages(sf, query):
+        yield page.get("records", [])
+
+
+def _page_cursors(
+    sf: "Salesforce",
+    page: Dict[str, Any],
+    position: Optional[Tuple[str, int]],
+    tail: Optional[Tuple[str, int]] = None,
+) -> Callable[[int], Dict[str, Any]]:
+    """
+    Return a function giving the cursor state that resumes at a record index
+    of page: its query locator at that offset, or else the page kept in
+    _query_tails. tail is (token, records skipped) for a page already kept there.
+    """
+    if position is not None:
+        locator, start = position
+        return lambda index: {"url": f"{locator}-{start + index}"}
+
+    def tail_state(index: int) -> Dict[str, Any]:
+        nonlocal tail
+        if tail is None:
+            tail = (_query_tails.put(sf, page), 0)
+        token, skipped = tail
+        return {"tail": token, "skip": skipped + index}
+
+    return tail_state
+
+
+def _query_page(
+    sf: "Salesforce",
+    query: str,
+    max_records: int,
+    cursor: str = "",
+    first_page: Optional[Dict[str, Any]] = None,
+    sink: Optional["_ResultSink"] = None,
+) -> Tuple[Dict[str, Any], Callable[[int], str]]:
+    """
+    Collect up to max_records records, following nextRecordsUrl as needed.
+    Pages go to sink one at a time, so a spilling sink holds at most one page.
+
+    Batches are requested at max_records (within the API's 200-2000), so a
+    call usually ends on a batch boundary. Cursors resume from the query
+    locator at the exact record offset and never run the query again.
+
+    Returns:
+        Dict with totalSize, done, records (or the sink's artifact) and, when
+        more records remain, an opaque next_cursor that resumes exactly after
+        the last returned record; plus a function returning a cursor that
+        resumes at any record index
+    """
+    batch_size = min(max(max_records, _QUERY_MIN_BATCH), _QUERY_MAX_BATCH)
+    tail = None
+    if cursor:
+        state = _decode_cursor(sf, cursor)
+        if "tail" in state:
+            page = _query_tails.get(sf, state["tail"])
+            if page is None:
+                raise ValueError("This cursor has expired. Run the query again without a cursor.")
+            tail = (state["tail"], state["skip"])
+            first_page = dict(page, records=page.get("records", [])[state["skip"]:])
+            pages = _iter_query_pages(sf, first_page=first_page, batch_size=batch_size)
+        else:
+            pages = _iter_query_pages(sf, next_url=state["url"], batch_size=batch_size)
+    else:
+        pages = _iter_query_pages(sf, query=query, first_page=first_page, batch_size=batch_size)
+
+    sink = sink or _ResultSink("query", "inline")
+    # (index of the page's first record, cursor states into that page)
+    spans: List[Tuple[int, Callable[[int], Dict[str, Any]]]] = []
+    total_size = 0
+    next_cursor = None
+    for page, position in pages:
+        total_size = page.get("totalSize", total_size)
+        page_records = page.get("records", [])
+        page_cursor = _page_cursors(sf, page, position, tail)
+        tail = None
+        spans.append((sink.count, page_cursor))
+        room = max_records - sink.count
+        if len(page_records) > room:
+            sink.extend(page_records[:room])
+            next_cursor = _encode_cursor(sf, page_cursor(room))
+            break
+        sink.extend(page_records)
+        if sink.count >= max_records and not page.get("done", True):
+            next_cursor = _encode_cursor(sf, {"url": page["nextRecordsUrl"]})
+            break
+
+    def cursor_at(index: int) -> str:
+        for start, page_cursor in reversed(spans):
+            if start <= index:
+                return _encode_cursor(sf, page_cursor(index - start))
+        raise ValueError("Record index is outside the collected pages")
+
+    response: Dict[str, Any] = {
+        "totalSize": total_size,
+        "done": next_cursor is None,
+        "returned": sink.count,
+    }
+    sink.attach(response, "records")
+    if next_cursor:
+        response["next_cursor"] = next_cursor
+    return response, cursor_at
+
+
+def _artifact_path(prefix: str, extension: str) -> str:
+    """Return a new unique file path in the artifact directory"""
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    token = base64.urlsafe_b64encode(os.urandom(6)).decode("ascii")
+    return os.path.join(ARTIFACT_DIR, f"{prefix}-{stamp}-{token}.{extension}")
+
+
+_OUTPUT_MODES = ("auto", "inline", "file")
+
+
+class _ResultSink:
+    """
+    Collect the records of a tool result, switching to a JSON Lines artifact
+    file once they encode to more than RESULT_ARTIFACT_THRESHOLD_BYTES (or from
+    the start with output="file"). After the switch every record is written
+    as it arrives, so memory stays flat however large the result grows.
+
+    Records in memory are kept as given; lines in the file are to_line(record).
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        output: str = "auto",
+        to_line: Callable[[Dict[str, Any]], Dict[str, Any]] = _clean_record,
+        artifact_format: str = "",
+        sample_size: int = 5,
+    ):
+        artifact_format = artifact_format or RESULT_ARTIFACT_FORMAT
+        if output not in _OUTPUT_MODES:
+            raise ValueError(f"Unknown output '{output}'. Use 'auto', 'inline' or 'file'.")
+        if artifact_format not in ("jsonl", "jsonl.gz"):
+            raise ValueError(
+                f"Unknown artifact format '{artifact_format}'. Use 'jsonl' or 'jsonl.gz'."
+            )
+        self.prefix = prefix
+        self.output = output
+        self.to_line = to_line
+        self.artifact_format = artifact_format
+        self.sample_size = sample_size
+        self.records: List[Dict[str, Any]] = []
+        self.count = 0
+        self.path: Optional[str] = None
+        self.sample: List[Dict[str, Any]] = []
+        self._encoded_bytes = 0
+        self._file: Any = None
+        if output == "file":
+            self._open()
+
+    @property
+    def spilled(self) -> bool:
+        return self.path is not None
+
+    def extend(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        self.count += len(records)
+        if self._file is not None:
+            self._write(records)
+            return
+        self.records.extend(records)
+        if self.output == "auto" and RESULT_ARTIFACT_THRESHOLD_BYTES > 0:
+            self._encoded_bytes += len(_dumps(records, indent=0))
+            if self._encoded_bytes > RESULT_ARTIFACT_THRESHOLD_BYTES:
+                self._open()
+                held, self.records = self.records, []
+                self._write(held)
+
+    def attach(self, response: Dict[str, Any], list_key: str) -> Dict[str, Any]:
+        """Put the records (or the artifact summary once spilled) into a response"""
+        if self.spilled:
+            response.pop(list_key, None)
+            response["artifact"] = self.artifact()
+        else:
+            response[list_key] = self.records
+        return response
+
+    def artifact(self) -> Dict[str, Any]:
+        self.close()
+        return {
+            "file_path": self.path,
+            "format": self.artifact_format,
+            "records": self.count,
+            "bytes": os.path.getsize(self.path),
+            "sample": self.sample,
+        }
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self) -> None:
+        self.path = _artifact_path(self.prefix, self.artifact_format)
+        if self.artifact_format == "jsonl.gz":
+            import gzip
+
+            self._file = gzip.open(self.path, "wb", compresslevel=6)
+        else:
+            self._file = open(self.path, "wb")
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        lines = []
+        for record in records:
+            line = self.to_line(record)
+            if len(self.sample) < self.sample_size:
+                self.sample.append(line)
+            lines.append(_dumps(line, indent=0))
+        self._file.write(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def _csv_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _iter_csv_chunks(
+    records: List[Dict[str, Any]], max_records: int, max_bytes: int
+) -> Iterator[bytes]:
+    """
+    Encode records as Bulk API 2.0 CSV uploads, one chunk at a time.
+
+    Each chunk has its own header (the union of its records' fields, with
+    relationship values flattened to "Account.External_Id__c" columns) and
+    stays within max_records rows and roughly max_bytes of data.
+    """
+    start = 0
+    while start < len(records):
+        rows = [_clean_record(r, flatten=True) for r in records[start : start + max_records]]
+        fields: Dict[str, None] = {}
+        for row in rows:
+            for key in row:
+                fields.setdefault(key, None)
+        columns = list(fields)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(columns)
+        written = 0
+        for row in rows:
+            writer.writerow([_csv_value(row.get(column)) for column in columns])
+            written += 1
+            if buffer.tell() >= max_bytes and written < len(rows):
+                # Body is full; the remaining rows start the next chunk
+                break
+        start += written
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _bulk_upload_job(
+    sf: "Salesforce",
+    object_type: str,
+    operation: str,
+    data: bytes,
+    external_id_field: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Create a Bulk API 2.0 ingest job, upload its CSV and mark it ready"""
+    job_request = {
+        "object": object_type,
+        "operation": operation,
+        "contentType": "CSV",
+        "lineEnding": "LF",
+        "columnDelimiter": "COMMA",
+    }
+    if external_id_field:
+        job_request["externalIdFieldName"] = external_id_field
+    # Every step counts as a write: the job exists in the org as soon as it is created
+    job = _sf_request(sf, "POST", "jobs/ingest/", json=job_request, write=True).json()
+    try:
+        _sf_request(
+            sf,
+            "PUT",
+            f"jobs/ingest/{job['id']}/batches",
+            data=data,
+            headers={"Content-Type": "text/csv"},
+            write=True,
+        )
+        _sf_request(
+            sf,
+            "PATCH",
+            f"jobs/ingest/{job['id']}/",
+            json={"state": "UploadComplete"},
+            write=True,
+        )
+    except Exception:
+        # Don't leave an open job holding the org's concurrent job slots
+        try:
+            _sf_request(sf, "PATCH", f"jobs/ingest/{job['id']}/", json={"state": "Aborted"})
+        except Exception:
+            pass
+        raise
+    return {"id": job["id"], "state": "UploadComplete"}
+
+
+def _bulk_ingest(
+    sf: "Salesforce",
+    object_type: str,
+    records: List[Dict[str, Any]],
+    operation: str = "insert",
+    job_size: int = 10000,
+    external_id_field: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Load records with Bulk API 2.0, uploading up to BULK_PARALLEL_JOBS jobs at once.
+
+    Returns as soon as every job is uploaded. Jobs are processed asynchronously
+    by Salesforce; pass the returned job_handle to _bulk_job_status to follow them.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    chunks = _iter_csv_chunks(records, max(1, job_size), BULK_MAX_UPLOAD_BYTES)
+    jobs: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=max(1, BULK_PARALLEL_JOBS)) as executor:
+        pending = []
+        for data in chunks:
+            # Keep at most BULK_PARALLEL_JOBS encoded chunks in memory
+            if len(pending) >= BULK_PARALLEL_JOBS:
+                jobs.append(_bulk_job_outcome(pending.pop(0)))
+            # Each upload runs in a copy of the caller's context so its writes are counted
+            pending.append(
+                executor.submit(
+                    contextvars.copy_context().run,
+                    _bulk_upload_job,
+                    sf,
+                    object_type,
+                    operation,
+                    data,
+                    external_id_field,
+                )
+            )
+        for future in pending:
+            jobs.append(_bulk_job_outcome(future))
+
+    job_ids = [job["id"] for job in jobs if "id" in job]
+    return {
+        "object_type": object_type,
+        "operation": operation,
+        "records_submitted": len(records),
+        "job_handle": ",".join(job_ids),
+        "jobs": jobs,
+    }
+
+
+def _bulk_job_outcome(future) -> Dict[str, Any]:
+    try:
+        return future.result()
+    except Exception as e:
+        return {"state": "UploadFailed", "error": str(e)}
+
+
+def _bulk_job_status(sf: "Salesforce", job_handle: str) -> Dict[str, Any]:
+    """Summarize the state of every ingest job in a job handle"""
+    job_ids = [job_id.strip() for job_id in job_handle.split(",") if job_id.strip()]
+    if not job_ids:
+        raise ValueError("job_handle must contain at least one Bulk API job ID")
+
+    jobs = []
+    for job_id in job_ids:
+        info = _sf_request(sf, "GET", f"jobs/ingest/{job_id}/").json()
+        jobs.append(
+            {
+                "id": job_id,
+                "object": info.get("object"),
+                "operation": info.get("operation"),
+                "state": info.get("state"),
+                "records_processed": info.get("numberRecordsProcessed", 0),
+                "records_failed": info.get("numberRecordsFailed", 0),
+                "error_message": info.get("errorMessage"),
+            }
+        )
+
+    finished_states = ("JobComplete", "Failed", "Aborted")
+    # Jobs are processed after salesforce_bulk_create returns, so cached reads
+    # can only be dropped once the data has actually landed
+    finished_objects = [
+        job["object"] for job in jobs if job["state"] in finished_states and job["object"]
+    ]
+    if finished_objects:
+        _result_cache.invalidate(sf, finished_objects)
+        _mirror.mark_stale(sf, finished_objects)
+    return {
+        "job_handle": ",".join(job_ids),
+        "complete": all(job["state"] in finished_states for job in jobs),
+        "records_processed": sum(job["records_processed"] or 0 for job in jobs),
+        "records_failed": sum(job["records_failed"] or 0 for job in jobs),
+        "jobs": jobs,
+    }
+
+
+def _wait_for_bulk_jobs(
+    sf: "Salesforce", job_handle: str, wait_seconds: float
+) -> Dict[str, Any]:
+    """Poll job status until every job finishes or wait_seconds elapses"""
+    deadline = time.monotonic() + wait_seconds
+    interval = BULK_POLL_INTERVAL_SECONDS
+    status = _bulk_job_status(sf, job_handle)
+    while not status["complete"] and time.monotonic() < deadline:
+        time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        interval = min(interval * 1.5, 30.0)
+        status = _bulk_job_status(sf, job_handle)
+    return status
+
+
+def _download_bulk_results(
+    sf: "Salesforce", job_handle: str, result_type: str, sample_size: int
+) -> Dict[str, Any]:
+    """
+    Stream a result file of every job in a handle into one local CSV file.
+
+    Returns:
+        Dict with the file path, the number of rows and the first sample_size rows
+    """
+    endpoints = {
+        "successful": "successfulResults/",
+        "failed": "failedResults/",
+        "unprocessed": "unprocessedrecords/",
+    }
+    if result_type not in endpoints:
+        raise ValueError(
+            f"Unknown result_type '{result_type}'. Use 'successful', 'failed' or 'unprocessed'."
+        )
+
+    job_ids = [job_id.strip() for job_id in job_handle.split(",") if job_id.strip()]
+    path = _artifact_path(f"bulk-{result_type}", "csv")
+    header_written = False
+    with open(path, "wb") as out:
+        for job_id in job_ids:
+            response = _sf_request(
+                sf, "GET", f"jobs/ingest/{job_id}/{endpoints[result_type]}", stream=True
+            )
+            try:
+                first_line = True
+                for line in response.iter_lines(delimiter=b"\n"):
+                    if first_line:
+                        first_line = False
+                        # Every job's file starts with its own header; keep the first only
+                        if header_written:
+                            continue
+                        header_written = True
+                    out.write(line + b"\n")
+            finally:
+                response.close()
+
+    rows = 0
+    sample: List[Dict[str, str]] = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            rows += 1
+            if len(sample) < sample_size:
+                sample.append(row)
+
+    return {
+        "job_handle": ",".join(job_ids),
+        "result_type": result_type,
+        "rows": rows,
+        "file_path": path,
+        "sample": sample,
+    }
+
+
+def _submit_bulk_query(sf: "Salesforce", query: str, include_deleted: bool) -> str:
+    """Create a Bulk API 2.0 query job and return its ID"""
+    job = _sf_request(
+        sf,
+        "POST",
+        "jobs/query",
+        json={
+            "operation": "queryAll" if include_deleted else "query",
+            "query": query,
+            "contentType": "CSV",
+            "lineEnding": "LF",
+            "columnDelimiter": "COMMA",
+        },
+    ).json()
+    return job["id"]
+
+
+def _wait_for_bulk_query(sf: "Salesforce", job_id: str, wait_seconds: float) -> Dict[str, Any]:
+    """Poll a query job until it finishes or wait_seconds elapses"""
+    deadline = time.monotonic() + wait_seconds
+    interval = BULK_POLL_INTERVAL_SECONDS
+    while True:
+        info = _sf_request(sf, "GET", f"jobs/query/{job_id}").json()
+        if info.get("state") in ("JobComplete", "Failed", "Aborted"):
+            return info
+        if time.monotonic() >= deadline:
+            return info
+        time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        interval = min(interval * 1.5, 30.0)
+
+
+def _iter_bulk_query_pages(sf: "Salesforce", job_id: str) -> Iterator[bytes]:
+    """
+    Download the CSV result pages of a finished query job.
+
+    Pages are fetched by a background thread following Sforce-Locator, so the
+    next page downloads while the caller writes the current one. At most two
+    pages are buffered, which keeps memory flat regardless of result size.
+    """
+    pages: "queue.Queue[Any]" = queue.Queue(maxsize=2)
+    done = object()
+    stop = threading.Event()
+
+    def download():
+        locator = None
+        try:
+            while not stop.is_set():
+                params = {"maxRecords": BULK_EXPORT_PAGE_RECORDS}
+                if locator:
+                    params["locator"] = locator
+                response = _sf_request(
+                    sf, "GET", f"jobs/query/{job_id}/results", params=params
+                )
+                pages.put(response.content)
+                locator = response.headers.get("Sforce-Locator")
+                if not locator or locator == "null":
+                    break
+            pages.put(done)
+        except Exception as e:
+            pages.put(e)
+
+    worker = threading.Thread(
+        target=contextvars.copy_context().run, args=(download,), daemon=True
+    )
+    worker.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Unblock the downloader if it is waiting on a full queue
+        while worker.is_alive():
+            try:
+                pages.get_nowait()
+            except queue.Empty:
+                worker.join(timeout=0.1)
+
+
+class _ExportWriter:
+    """Write CSV pages from a bulk query to a CSV, JSON Lines or Parquet file"""
+
+    def __init__(self, output_format: str, sample_size: int):
+        self.output_format = output_format
+        self.sample_size = sample_size
+        self.columns: Optional[List[str]] = None
+        self.rows = 0
+        self.sample: List[Dict[str, Any]] = []
+        self._parquet_writer = None
+        self._header_written = False
+        self._file = None
+        self._sink: Optional[_ResultSink] = None
+        if output_format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ValueError("output_format 'parquet' requires the pyarrow package")
+            self.path = _artifact_path("export", "parquet")
+        elif output_format == "csv":
+            self.path = _artifact_path("export", "csv")
+            self._file = open(self.path, "wb")
+        else:
+            self._sink = _ResultSink(
+                "export",
+                "file",
+                to_line=lambda record: record,
+                artifact_format=output_format,
+                sample_size=0,
+            )
+            self.path = self._sink.path
+
+    def write_page(self, data: bytes) -> None:
+        reader = csv.reader(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", newline=""))
+        header = next(reader, None)
+        if header is None:
+            return
+        if self.columns is None:
+            self.columns = header
+
+        if self.output_format == "csv":
+            self._write_csv_page(data, reader)
+            return
+
+        batch = []
+        for row in reader:
+            record = {
+                column: (value if value != "" else None)
+                for column, value in zip(self.columns, row)
+            }
+            self._count(record)
+            batch.append(record)
+        if self._sink is not None:
+            self._sink.extend(batch)
+        elif batch:
+            self._write_parquet_batch(batch)
+
+    def _write_csv_page(self, data: bytes, reader) -> None:
+        # Copy the bytes verbatim; later pages repeat the header line
+        body = data if not self._header_written else data[data.find(b"\n") + 1 :]
+        self._header_written = True
+        self._file.write(body)
+        for row in reader:
+            self._count(dict(zip(self.columns, row)))
+
+    def _write_parquet_batch(self, batch: List[Dict[str, Any]]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(column, pa.string()) for column in self.columns])
+        table = pa.Table.from_pylist(batch, schema=schema)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.path, schema)
+        self._parquet_writer.write_table(table)
+
+    def _count(self, record: Dict[str, Any]) -> None:
+        self.rows += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append(record)
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._file is not None:
+            self._file.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def _bulk_export(
+    sf: "Salesforce",
+    query: str,
+    job_id: str,
+    output_format: str,
+    include_deleted: bool,
+    wait_seconds: float,
+    sample_size: int,
+) -> Dict[str, Any]:
+    """Run (or resume) a Bulk API 2.0 query job and export its results to a local file"""
+    if output_format not in ("csv", "jsonl", "jsonl.gz", "parquet"):
+        raise ValueError(
+            f"Unknown output_format '{output_format}'. Use 'csv', 'jsonl', 'jsonl.gz' or 'parquet'."
+        )
+
+    if not job_id:
+        job_id = _submit_bulk_query(sf, query, include_deleted)
+    info = _wait_for_bulk_query(sf, job_id, wait_seconds)
+    state = info.get("state")
+    if state != "JobComplete":
+        response = {"job_id": job_id, "state": state}
+        if state in ("Failed", "Aborted"):
+            response["error_message"] = info.get("errorMessage")
+        else:
+            response[
+                "message"
+            ] = "The export is still running. Call salesforce_bulk_export again with this job_id to download the results."
+        return response
+
+    writer = _ExportWriter(output_format, sample_size)
+    path = writer.path
+    try:
+        for page in _iter_bulk_query_pages(sf, job_id):
+            writer.write_page(page)
+    finally:
+        writer.close()
+
+    return {
+        "job_id": job_id,
+        "state": state,
+        "rows": writer.rows,
+        "file_path": path,
+        "format": output_format,
+        "bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+        "columns": writer.columns or [],
+        "sample": writer.sample,
+    }
+
+
+class _DescribeCache:
+    """
+    Two-level (memory + disk) cache of describe payloads per org and sObject.
+
+    Entries younger than DESCRIBE_CACHE_REVALIDATE_SECONDS are served as-is;
+    older ones are revalidated with If-Modified-Since so unchanged metadata
+    costs a 304 instead of a full download. The in-memory level is an LRU
+    bounded by payload bytes.
+    """
+
+    def __init__(self, max_bytes: int, cache_dir: str, disk_max_bytes: int):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.stale_served = 0
+
+    def get(self, sf: "Salesforce", object_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return the describe payload for an sObject, or the global describe
+        when object_name is None.
+        """
+        org_key = _org_key(sf)
+        key = (org_key, (object_name or "").lower())
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._store(key, entry, persist=False)
+
+        if entry is not None and self._is_fresh(entry):
+            with self._lock:
+                self.hits += 1
+            _telemetry.add("cache_hits")
+            return entry["payload"]
+
+        level = _api_usage.level(sf)
+        if entry is not None and level != "normal":
+            # Near the daily API limit: metadata rarely changes, skip revalidation
+            with self._lock:
+                self.hits += 1
+                self.stale_served += 1
+            _telemetry.add("cache_hits")
+            return entry["payload"]
+        if level == "shed":
+            raise _ApiQuotaExceeded(
+                f"Org is above {API_USAGE_SHED_PERCENT:g}% of its daily API limit; "
+                f"describe of {object_name or 'all objects'} is not cached and was skipped. "
+                "Name the fields explicitly or retry once usage drops."
+            )
+
+        path = f"sobjects/{object_name}/describe/" if object_name else "sobjects/"
+        headers = {}
+        if entry is not None:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        response = _sf_request(
+            sf, "GET", path, allowed_statuses=(304,), headers=headers
+        )
+
+        if response.status_code == 304 and entry is not None:
+            entry["validated_at"] = time.time()
+            self._touch_disk(key)
+            with self._lock:
+                self.hits += 1
+                self.not_modified += 1
+            _telemetry.add("cache_hits")
+            return entry["payload"]
+
+        from email.utils import formatdate
+
+        payload = response.json()
+        entry = {
+            "payload": payload,
+            "size": len(response.content),
+            "last_modified": response.headers.get("Last-Modified")
+            or formatdate(usegmt=True),
+            "validated_at": time.time(),
+        }
+        with self._lock:
+            self.misses += 1
+        _telemetry.add("cache_misses")
+        self._store(key, entry, persist=True)
+        return payload
+
+    def peek(
+        self, sf: "Salesforce", object_name: Optional[str] = None, fresh_only: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return a describe payload already held in memory, without any API call.
+        With fresh_only, entries due for revalidation are treated as missing.
+        """
+        with self._lock:
+            entry = self._entries.get((_org_key(sf), (object_name or "").lower()))
+        if entry is None or (fresh_only and not self._is_fresh(entry)):
+            return None
+        return entry["payload"]
+
+    def invalidate(self, sf: "Salesforce", object_name: Optional[str] = None) -> int:
+        """
+        Drop cached describes for a connection's org. With no object_name every
+        entry for the org (including the global describe) is removed.
+
+        Returns:
+            Number of entries removed
+        """
+        org_key = _org_key(sf)
+        removed = 0
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == org_key and (
+                    object_name is None or key[1] == object_name.lower()
+                ):
+                    self._bytes -= self._entries.pop(key)["size"]
+                    removed += 1
+
+        org_dir = self._org_dir(org_key)
+        if org_dir and os.path.isdir(org_dir):
+            for file_name in os.listdir(org_dir):
+                if object_name is None or file_name == self._file_name(
+                    object_name.lower()
+                ):
+                    try:
+                        os.remove(os.path.join(org_dir, file_name))
+                    except OSError:
+                        pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "stale_served": self.stale_served,
+            }
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["validated_at"] < DESCRIBE_CACHE_REVALIDATE_SECONDS
+
+    def _store(self, key: tuple, entry: Dict[str, Any], persist: bool) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous["size"]
+            self._entries[key] = entry
+            self._bytes += entry["size"]
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["size"]
+                self.evictions += 1
+        if persist:
+            self._save_to_disk(key, entry)
+
+    def _org_dir(self, org_key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, org_key[:32])
+
+    def _file_name(self, object_key: str) -> str:
+        return f"{object_key or '_global'}.json"
+
+    def _file_path(self, key: tuple) -> Optional[str]:
+        org_dir = self._org_dir(key[0])
+        return os.path.join(org_dir, self._file_name(key[1])) if org_dir else None
+
+    def _load_from_disk(self, key: tuple) -> Optional[Dict[str, Any]]:
+        path = self._file_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            return {
+                "payload": stored["payload"],
+                "size": os.path.getsize(path),
+                "last_modified": stored["last_modified"],
+                "validated_at": os.path.getmtime(path),
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_to_disk(self, key: tuple, entry: Dict[str, Any]) -> None:
+        path = self._file_path(key)
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"last_modified": entry["last_modified"], "payload": entry["payload"]},
+                    f,
+                )
+            os.replace(tmp_path, path)
+            self._enforce_disk_budget()
+        except OSError:
+            # The disk level is best-effort; the in-memory entry still works
+            pass
+
+    def _touch_disk(self, key: tuple) -> None:
+        path = self._file_path(key)
+        if path and os.path.exists(path):
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+
+    def _enforce_disk_budget(self) -> None:
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+_describe_cache = _DescribeCache(
+    DESCRIBE_CACHE_MAX_BYTES, DESCRIBE_CACHE_DIR, DESCRIBE_CACHE_DISK_MAX_BYTES
+)
+
+
+class _ResultCache:
+    """
+    In-memory cache of read-only tool responses keyed by org and normalized request.
+
+    Each entry records the sObjects its result depends on, so write tools can
+    drop exactly the entries they may have made stale. Bounded by encoded
+    response bytes with LRU eviction.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, sf: "Salesforce", tool_name: str, request: tuple) -> Optional[str]:
+        key = (_org_key(sf), tool_name, request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                _telemetry.add("cache_misses")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            _telemetry.add("cache_hits")
+            return entry["value"]
+
+    def put(
+        self,
+        sf: "Salesforce",
+        tool_name: str,
+        request: tuple,
+        object_types: List[str],
+        value: str,
+    ) -> None:
+        ttl = RESULT_CACHE_TTLS.get(tool_name, 0)
+        size = len(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        key = (_org_key(sf), tool_name, request)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                "value": value,
+                "size": size,
+                "expires_at": time.monotonic() + ttl,
+                "objects": {object_type.lower() for object_type in object_types},
+            }
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, sf: "Salesforce", object_types: Optional[List[str]] = None) -> int:
+        """
+        Drop entries of the connection's org that depend on any of object_types,
+        or every entry of the org when object_types is None.
+        """
+        org_key = _org_key(sf)
+        targets = {t.lower() for t in object_types} if object_types is not None else None
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if key[0] == org_key and (targets is None or entry["objects"] & targets)
+            ]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "ttl_seconds": dict(RESULT_CACHE_TTLS),
+            }
+
+    def _remove(self, key: tuple) -> None:
+        self._bytes -= self._entries.pop(key)["size"]
+
+
+_result_cache = _ResultCache(RESULT_CACHE_MAX_BYTES)
+
+
+def _cached_read(
+    sf: "Salesforce",
+    tool_name: str,
+    request: tuple,
+    object_types: List[str],
+    produce: Callable[[], str],
+) -> str:
+    """Serve a read-only tool response from the result cache, producing it on a miss"""
+    cached = _result_cache.get(sf, tool_name, request)
+    if cached is not None:
+        return cached
+    value = produce()
+    _result_cache.put(sf, tool_name, request, object_types, value)
+    return value
+
+
+def _writing(
+    object_types: Optional[List[str]], operation: Callable[["Salesforce"], Any]
+) -> Callable[["Salesforce"], Any]:
+    """
+    Wrap a write operation so cached reads of the sObjects it touches are
+    dropped afterwards (also when it fails part-way). None drops every cached
+    read of the org.
+    """
+
+    def run(sf: "Salesforce") -> Any:
+        try:
+            return operation(sf)
+        finally:
+            _result_cache.invalidate(sf, object_types)
+            _mirror.mark_stale(sf, object_types)
+
+    return run
+
+
+_SOQL_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+  | (?P<string>'(?:[^'\\]|\\.)*')
+  | (?P<dqstring>"(?:[^"\\]|\\.)*")
+  | (?P<datetime>\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2}))?(?![\w.:-]))
+  | (?P<number>-?\d+(?:\.\d+)?(?![\w.]))
+  | (?P<currency>[A-Z]{3}-?\d+(?:\.\d+)?(?![\w.]))
+  | (?P<bind>:[A-Za-z_]\w*)
+  | (?P<name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*(?::\d+)?)
+  | (?P<op><=|>=|!=|<>|=|<|>)
+  | (?P<punct>[(),*])
+    """,
+    re.VERBOSE,
+)
+
+_SOQL_KEYWORDS = frozenset(
+    """
+    SELECT FROM WHERE AND OR NOT IN LIKE INCLUDES EXCLUDES NULL TRUE FALSE ASC DESC
+    NULLS FIRST LAST GROUP BY HAVING ORDER LIMIT OFFSET WITH FOR VIEW REFERENCE
+    UPDATE TRACKING VIEWSTAT USING SCOPE TYPEOF WHEN THEN ELSE END ROLLUP CUBE DATA
+    CATEGORY AT ABOVE BELOW ABOVE_OR_BELOW SECURITY_ENFORCED USER_MODE SYSTEM_MODE
+    """.split()
+)
+_SOQL_CLAUSE_KEYWORDS = frozenset(
+    ["WHERE", "WITH", "GROUP", "HAVING", "ORDER", "LIMIT", "OFFSET", "FOR", "UPDATE", "USING"]
+)
+_SOQL_COMPARISONS = frozenset(["IN", "NOT", "LIKE", "INCLUDES", "EXCLUDES"])
+
+
+def _soql_quote(text: str) -> str:
+    """Turn a double-quoted literal into an equivalent single-quoted SOQL string"""
+    inner = text[1:-1]
+    out = []
+    i = 0
+    while i < len(inner):
+        char = inner[i]
+        if char == "\\" and i + 1 < len(inner):
+            following = inner[i + 1]
+            out.append(following if following == '"' else char + following)
+            i += 2
+            continue
+        out.append("\\'" if char == "'" else char)
+        i += 1
+    return "'" + "".join(out) + "'"
+
+
+def _tokenize_soql(query: str) -> List[Tuple[str, str]]:
+    """Split SOQL into (kind, text) tokens, failing on anything that can't be SOQL"""
+    tokens = []
+    pos = 0
+    while pos < len(query):
+        match = _SOQL_TOKEN_RE.match(query, pos)
+        if match is None:
+            if query[pos] in "'\"":
+                raise ValueError(f"Invalid SOQL: unterminated string literal at position {pos}")
+            raise ValueError(
+                f"Invalid SOQL: unexpected character {query[pos]!r} at position {pos}"
+            )
+        kind, text = match.lastgroup, match.group()
+        pos = match.end()
+        if kind == "ws":
+            continue
+        if kind == "dqstring":
+            # A common LLM mistake: SOQL string literals use single quotes
+            kind, text = "string", _soql_quote(text)
+        elif kind == "name" and text.upper() in _SOQL_KEYWORDS:
+            kind, text = "keyword", text.upper()
+        tokens.append((kind, text))
+    return tokens
+
+
+def _render_soql_tokens(tokens: List[Tuple[str, str]]) -> str:
+    """Join tokens with canonical spacing"""
+    out: List[str] = []
+    previous: Optional[Tuple[str, str]] = None
+    for kind, text in tokens:
+        if previous is not None:
+            glued = (
+                previous[1] == "("
+                or text in (")", ",")
+                # Function calls: COUNT(Id), toLabel(Status)
+                or (text == "(" and (previous[0] == "name" or previous[1] in ("ROLLUP", "CUBE")))
+            )
+            if not glued:
+                out.append(" ")
+        out.append(text)
+        previous = (kind, text)
+    return "".join(out)
+
+
+def _split_top_level(
+    tokens: List[Tuple[str, str]], separator: Tuple[str, str]
+) -> List[List[Tuple[str, str]]]:
+    parts: List[List[Tuple[str, str]]] = [[]]
+    depth = 0
+    for token in tokens:
+        # TYPEOF ... END is one select item even though its THEN lists have commas
+        if token in (("punct", "("), ("keyword", "TYPEOF")):
+            depth += 1
+        elif token in (("punct", ")"), ("keyword", "END")):
+            depth -= 1
+        if depth == 0 and token == separator:
+            parts.append([])
+        else:
+            parts[-1].append(token)
+    return parts
+
+
+def _without_semi_joins(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Drop "(SELECT ...)" semi-join bodies, which reference another object's fields"""
+    out: List[Tuple[str, str]] = []
+    skip_depth = 0
+    for index, token in enumerate(tokens):
+        if skip_depth:
+            if token == ("punct", "("):
+                skip_depth += 1
+            elif token == ("punct", ")"):
+                skip_depth -= 1
+            continue
+        following = tokens[index + 1] if index + 1 < len(tokens) else None
+        if token == ("punct", "(") and following == ("keyword", "SELECT"):
+            skip_depth = 1
+            continue
+        out.append(token)
+    return out
+
+
+class _SoqlQuery:
+    """
+    A parsed SOQL statement.
+
+    The select list is split into items: ("field", path), ("star", None),
+    ("subquery", _SoqlQuery) or ("expr", tokens) for functions and TYPEOF.
+    Everything after the FROM object is kept as a list of clauses, each a
+    token list starting with its keyword, so unknown syntax passes through
+    unchanged.
+    """
+
+    def __init__(
+        self,
+        items: List[Tuple[str, Any]],
+        object_name: str,
+        alias: Optional[str],
+        clauses: List[List[Tuple[str, str]]],
+    ):
+        self.items = items
+        self.object_name = object_name
+        self.alias = alias
+        self.clauses = clauses
+
+    def clause(self, keyword: str) -> Optional[List[Tuple[str, str]]]:
+        for clause in self.clauses:
+            if clause[0][1] == keyword:
+                return clause
+        return None
+
+    @property
+    def subqueries(self) -> List["_SoqlQuery"]:
+        return [value for kind, value in self.items if kind == "subquery"]
+
+    def field_paths(self) -> List[str]:
+        """Field references that can be checked against describe metadata"""
+        paths = [value for kind, value in self.items if kind == "field"]
+        aliases = set()
+        for kind, value in self.items:
+            if kind != "expr" or value[0][1].upper() == "TYPEOF":
+                continue
+            if value[-1][0] == "name" and len(value) > 1:
+                # "COUNT(Id) total" or "Industry ind" in aggregate queries
+                aliases.add(value[-1][1].lower())
+                value = value[:-1]
+            for index, (token_kind, text) in enumerate(value):
+                following = value[index + 1] if index + 1 < len(value) else None
+                if token_kind == "name" and following != ("punct", "("):
+                    paths.append(text)
+        for keyword in ("WHERE", "HAVING"):
+            clause = _without_semi_joins(self.clause(keyword) or [])
+            for index, (token_kind, text) in enumerate(clause[:-1]):
+                following = clause[index + 1]
+                if token_kind == "name" and (
+                    following[0] == "op"
+                    or (following[0] == "keyword" and following[1] in _SOQL_COMPARISONS)
+                ):
+                    paths.append(text)
+        for keyword in ("ORDER", "GROUP"):
+            clause = self.clause(keyword) or []
+            for index, (token_kind, text) in enumerate(clause):
+                following = clause[index + 1] if index + 1 < len(clause) else None
+                if token_kind == "name" and following != ("punct", "("):
+                    paths.append(text)
+        paths = [path for path in paths if path.lower() not in aliases]
+        if self.alias:
+            prefix = self.alias.lower() + "."
+            paths = [
+                path[len(prefix):] if path.lower().startswith(prefix) else path for path in paths
+            ]
+        return paths
+
+    def semi_join_objects(self) -> List[str]:
+        """Objects read by IN (SELECT ... FROM X) filters"""
+        objects = []
+        for clause in self.clauses:
+            for index, token in enumerate(clause[:-1]):
+                if token == ("keyword", "FROM") and clause[index + 1][0] == "name":
+                    objects.append(clause[index + 1][1])
+        return objects
+
+    def render(self) -> str:
+        """Canonical SOQL text: keywords upper-cased, single spaces, single-quoted strings"""
+        rendered_items = []
+        for kind, value in self.items:
+            if kind == "field":
+                rendered_items.append(value)
+            elif kind == "star":
+                rendered_items.append("*")
+            elif kind == "subquery":
+                rendered_items.append(f"({value.render()})")
+            else:
+                rendered_items.append(_render_soql_tokens(value))
+        text = f"SELECT {', '.join(rendered_items)} FROM {self.object_name}"
+        if self.alias:
+            text += f" {self.alias}"
+        for clause in self.clauses:
+            text += " " + _render_soql_tokens(clause)
+        return text
+
+
+def _parse_soql_tokens(tokens: List[Tuple[str, str]]) -> _SoqlQuery:
+    if not tokens or tokens[0] != ("keyword", "SELECT"):
+        raise ValueError("Invalid SOQL: a query must start with SELECT")
+
+    depth = 0
+    from_index = None
+    for index, token in enumerate(tokens):
+        if token == ("punct", "("):
+            depth += 1
+        elif token == ("punct", ")"):
+            depth -= 1
+            if depth < 0:
+                raise ValueError("Invalid SOQL: unbalanced parentheses")
+        elif depth == 0 and token == ("keyword", "FROM") and from_index is None:
+            from_index = index
+    if depth != 0:
+        raise ValueError("Invalid SOQL: unbalanced parentheses")
+    if from_index is None:
+        raise ValueError("Invalid SOQL: missing FROM clause")
+    if from_index == 1:
+        raise ValueError("Invalid SOQL: no fields selected")
+    if from_index + 1 >= len(tokens) or tokens[from_index + 1][0] != "name":
+        raise ValueError("Invalid SOQL: missing object name after FROM")
+
+    items: List[Tuple[str, Any]] = []
+    for item in _split_top_level(tokens[1:from_index], ("punct", ",")):
+        if not item:
+            raise ValueError("Invalid SOQL: empty field in select list")
+        if item == [("punct", "*")]:
+            items.append(("star", None))
+        elif item[0] == ("punct", "(") and len(item) > 2 and item[1] == ("keyword", "SELECT"):
+            if item[-1] != ("punct", ")"):
+                raise ValueError("Invalid SOQL: malformed subquery")
+            items.append(("subquery", _parse_soql_tokens(item[1:-1])))
+        elif len(item) == 1 and item[0][0] == "name":
+            items.append(("field", item[0][1]))
+        else:
+            items.append(("expr", item))
+
+    object_name = tokens[from_index + 1][1]
+    rest = tokens[from_index + 2 :]
+    alias = None
+    if rest and rest[0][0] == "name":
+        alias = rest[0][1]
+        rest = rest[1:]
+
+    clauses: List[List[Tuple[str, str]]] = []
+    depth = 0
+    for token in rest:
+        if token == ("punct", "("):
+            depth += 1
+        elif token == ("punct", ")"):
+            depth -= 1
+        starts_clause = (
+            depth == 0
+            and token[0] == "keyword"
+            and token[1] in _SOQL_CLAUSE_KEYWORDS
+            # "GROUP BY ... WITH ROLLUP" style modifiers and "FOR UPDATE" stay attached
+            and not (
+                clauses
+                and clauses[-1][0][1] in ("FOR", "GROUP")
+                and token[1] in ("UPDATE", "WITH")
+            )
+        )
+        if starts_clause:
+            clauses.append([token])
+        elif clauses:
+            clauses[-1].append(token)
+        else:
+            raise ValueError(f"Invalid SOQL: unexpected '{token[1]}' after FROM {object_name}")
+    return _SoqlQuery(items, object_name, alias, clauses)
+
+
+def _parse_soql(query: str) -> _SoqlQuery:
+    """
+    Parse a SOQL query into a _SoqlQuery.
+
+    Syntax errors (unterminated strings, missing FROM, unbalanced parentheses)
+    raise ValueError locally instead of costing a login and an API round trip.
+    """
+    return _parse_soql_tokens(_tokenize_soql(query.strip().rstrip(";")))
+
+
+def _describe_field_names(describe: Dict[str, Any], scope: str = "ALL") -> List[str]:
+    """Queryable field names for star/FIELDS() expansion"""
+    names = []
+    for field in describe.get("fields", []):
+        if field.get("type") in ("address", "location"):
+            continue
+        if scope == "CUSTOM" and not field.get("custom"):
+            continue
+        if scope == "STANDARD" and field.get("custom"):
+            continue
+        names.append(field["name"])
+    return names
+
+
+# Per-field shapes salesforce_describe_object can return
+_DESCRIBE_MODES = ("full", "summary")
+
+
+def _field_matches(name: str, patterns: List[str]) -> bool:
+    """Case-insensitive match of a field name against names or glob patterns"""
+    import fnmatch
+
+    name = name.lower()
+    return any(fnmatch.fnmatchcase(name, pattern.lower()) for pattern in patterns)
+
+
+def _describe_field(field: Dict[str, Any], mode: str, expand: set) -> Dict[str, Any]:
+    """
+    Project one describe field for salesforce_describe_object. picklistValues
+    are only included for fields named in expand, or all of them for "*".
+    """
+    if mode == "summary":
+        entry = {
+            "name": field.get("name"),
+            "type": field.get("type"),
+            "required": field.get("nillable") == False,
+        }
+    else:
+        entry = {
+            "name": field.get("name"),
+            "label": field.get("label"),
+            "type": field.get("type"),
+            "required": field.get("nillable") == False,
+            "createable": field.get("createable"),
+            "updateable": field.get("updateable"),
+            "length": field.get("length"),
+        }
+    if "*" in expand or (field.get("name") or "").lower() in expand:
+        entry["picklistValues"] = field.get("picklistValues", [])
+    return entry
+
+
+def _describe_indexes(describe: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Indexes over a describe payload that let a caller plan writes and joins
+    without reading every field: fields a create must set, external-ID fields
+    usable for upserts, and relationship names with the objects they reach.
+    """
+    fields = describe.get("fields", [])
+    return {
+        "required_for_create": [
+            field["name"]
+            for field in fields
+            if field.get("createable")
+            and field.get("nillable") == False
+            and not field.get("defaultedOnCreate")
+        ],
+        "external_id_fields": [field["name"] for field in fields if field.get("externalId")],
+        "relationships": {
+            field["relationshipName"]: field.get("referenceTo") or []
+            for field in fields
+            if field.get("relationshipName")
+        },
+        "child_relationships": {
+            relationship["relationshipName"]: relationship.get("childSObject")
+            for relationship in describe.get("childRelationships", [])
+            if relationship.get("relationshipName")
+        },
+    }
+
+
+def _expand_star(sf: "Salesforce", parsed: _SoqlQuery) -> bool:
+    """Rewrite SELECT * and FIELDS(ALL|CUSTOM|STANDARD) into explicit field lists"""
+    rewritten = False
+    items: List[Tuple[str, Any]] = []
+    for kind, value in parsed.items:
+        scope = None
+        if kind == "star":
+            scope = "ALL"
+        elif (
+            kind == "expr"
+            and len(value) == 4
+            and value[0][1].upper() == "FIELDS"
+            and value[2][1].upper() in ("ALL", "CUSTOM", "STANDARD")
+        ):
+            scope = value[2][1].upper()
+        if scope is None:
+            if kind == "subquery":
+                rewritten = _expand_star(sf, value) or rewritten
+            items.append((kind, value))
+            continue
+        describe = _describe_cache.get(sf, parsed.object_name)
+        items.extend(("field", name) for name in _describe_field_names(describe, scope))
+        rewritten = True
+    # Keep the field list free of duplicates such as "SELECT Id, *"
+    seen = set()
+    parsed.items = []
+    for kind, value in items:
+        if kind == "field":
+            if value.lower() in seen:
+                continue
+            seen.add(value.lower())
+        parsed.items.append((kind, value))
+    return rewritten
+
+
+def _closest(name: str, candidates: List[str]) -> str:
+    import difflib
+
+    matches = difflib.get_close_matches(name.lower(), [c.lower() for c in candidates], n=3)
+    lookup = {c.lower(): c for c in candidates}
+    return f" Did you mean: {', '.join(lookup[m] for m in matches)}?" if matches else ""
+
+
+def _validate_soql(
+    sf: "Salesforce", parsed: _SoqlQuery, parent: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Check object, field and relationship names against describe metadata that
+    is cached and fresh. Nothing is fetched: anything not cached is left to
+    Salesforce to judge.
+    """
+    if parent is None:
+        global_describe = _describe_cache.peek(sf, fresh_only=True)
+        if global_describe:
+            objects = [o["name"] for o in global_describe.get("sobjects", [])]
+            if parsed.object_name.lower() not in {o.lower() for o in objects}:
+                raise ValueError(
+                    f"Invalid SOQL: sObject type '{parsed.object_name}' is not supported."
+                    + _closest(parsed.object_name, objects)
+                )
+        describe = _describe_cache.peek(sf, parsed.object_name, fresh_only=True)
+    else:
+        relationships = [
+            r for r in parent.get("childRelationships", []) if r.get("relationshipName")
+        ]
+        children = {r["relationshipName"].lower(): r.get("childSObject") for r in relationships}
+        if parsed.object_name.lower() not in children:
+            raise ValueError(
+                f"Invalid SOQL: didn't understand relationship '{parsed.object_name}' in a subquery."
+                + _closest(parsed.object_name, [r["relationshipName"] for r in relationships])
+            )
+        child_object = children[parsed.object_name.lower()]
+        describe = _describe_cache.peek(sf, child_object, fresh_only=True)
+    if not describe:
+        return
+
+    fields = [f["name"] for f in describe.get("fields", [])]
+    field_set = {f.lower() for f in fields}
+    relationships = [
+        f["relationshipName"] for f in describe.get("fields", []) if f.get("relationshipName")
+    ]
+    relationship_set = {r.lower() for r in relationships}
+    for path in parsed.field_paths():
+        head, _, tail = path.partition(".")
+        if tail:
+            if head.lower() not in relationship_set:
+                raise ValueError(
+                    f"Invalid SOQL: didn't understand relationship '{head}' in field path '{path}' on {describe.get('name')}."
+                    + _closest(head, relationships)
+                )
+        elif path.lower() not in field_set:
+            raise ValueError(
+                f"Invalid SOQL: no such column '{path}' on entity '{describe.get('name')}'."
+                + _closest(path, fields)
+            )
+    for subquery in parsed.subqueries:
+        _validate_soql(sf, subquery, parent=describe)
+
+
+def _prepare_soql(sf: "Salesforce", parsed: _SoqlQuery) -> Tuple[str, Dict[str, Any]]:
+    """
+    Expand star selects and validate against cached metadata. The parsed
+    query itself is left untouched so it can be prepared again after a
+    re-login. No LIMIT is added: results are paged by cursor or streamed to
+    an artifact, so max_records and the sink already bound what one call reads.
+
+    Returns:
+        The canonical SOQL text and notes about rewrites applied
+    """
+    parsed = copy.deepcopy(parsed)
+    notes: Dict[str, Any] = {}
+    if _expand_star(sf, parsed):
+        notes["fields_expanded"] = True
+    _validate_soql(sf, parsed)
+    return parsed.render(), notes
+
+
+def _soql_objects(sf: "Salesforce", parsed: _SoqlQuery) -> List[str]:
+    """
+    sObjects a parsed query reads: the root object, child subquery
+    relationships, semi-join objects and parent relationship paths, resolved
+    to object names with describe metadata that is already cached.
+    """
+    objects = {parsed.object_name}
+    objects.update(parsed.semi_join_objects())
+    describe = _describe_cache.peek(sf, parsed.object_name) or {}
+    references = {
+        field["relationshipName"].lower(): field.get("referenceTo") or []
+        for field in describe.get("fields", [])
+        if field.get("relationshipName")
+    }
+    child_objects = {
+        relationship["relationshipName"].lower(): relationship.get("childSObject")
+        for relationship in describe.get("childRelationships", [])
+        if relationship.get("relationshipName")
+    }
+    for path in parsed.field_paths():
+        head, _, tail = path.partition(".")
+        if tail:
+            objects.update(references.get(head.lower()) or [head])
+            if head.endswith("__r"):
+                objects.add(head[:-3] + "__c")
+    for subquery in parsed.subqueries:
+        name = subquery.object_name
+        objects.add(child_objects.get(name.lower()) or name)
+        if name.endswith("__r"):
+            objects.add(name[:-3] + "__c")
+    return sorted(objects)
+
+
+class _NotMirrorable(Exception):
+    """A query the mirror can't answer exactly; it goes to the API instead"""
+
+
+# SQLite column declarations per Salesforce field type; other types are text
+# compared case-insensitively, like SOQL string comparisons
+_MIRROR_COLUMN_TYPES = {
+    "id": "TEXT",
+    "reference": "TEXT",
+    "boolean": "INTEGER",
+    "int": "INTEGER",
+    "long": "INTEGER",
+    "double": "REAL",
+    "currency": "REAL",
+    "percent": "REAL",
+    "date": "TEXT",
+    "datetime": "TEXT",
+    "time": "TEXT",
+}
+# Compound and binary fields have no single column value
+_MIRROR_SKIPPED_TYPES = frozenset(["address", "location", "base64", "complexvalue", "anyType"])
+_MIRROR_NAME_RE = re.compile(r"^[A-Za-z]\w*$")
+# getDeleted needs a window of at least a minute
+_MIRROR_DELETE_CHECK_SECONDS = 60
+# Records modified this long before a sync started are fetched again by the next
+# one, covering clock skew and changes made while a sync was paging
+_MIRROR_WATERMARK_OVERLAP_SECONDS = 60
+# Objects over SF_MIRROR_MAX_RECORDS are counted again at most this often
+_MIRROR_TOO_LARGE_RECHECK_SECONDS = 3600
+
+# Field types the search index covers, like SOSL's ALL FIELDS scope
+_SEARCH_INDEX_TYPES = frozenset(
+    ["string", "textarea", "email", "phone", "url", "picklist", "multipicklist", "combobox"]
+)
+# Search term tokens: quoted phrases, parentheses and bare words
+_SOSL_TERM_RE = re.compile(r'"[^"]*"|[()]|[^\s()"]+')
+# SOSL reserved characters without a meaning in search terms; wildcards, phrase
+# quotes and parentheses are left alone so they keep working
+_SOSL_RESERVED_RE = re.compile(r"([&|!{}\[\]^~:\\'+-])")
+# Field types each SOSL search group covers in the index; other groups go to Salesforce
+_SEARCH_SCOPE_TYPES = {"ALL": None, "EMAIL": ("email",), "PHONE": ("phone",)}
+_SEARCH_SCOPES = ("ALL", "NAME", "EMAIL", "PHONE", "SIDEBAR")
+_SEARCH_FIELD_RE = re.compile(r"^[A-Za-z]\w*(\.[A-Za-z]\w*)*$")
+
+_SOQL_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+_SOQL_STRING_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f"}
+
+
+def _parse_mirror_config(spec: str) -> Dict[str, List[str]]:
+    """Parse "Account:Name,Industry;Contact" into {"Account": ["Name", "Industry"], "Contact": []}"""
+    objects: Dict[str, List[str]] = {}
+    for entry in spec.split(";"):
+        name, _, fields = entry.partition(":")
+        name = name.strip()
+        if _MIRROR_NAME_RE.match(name):
+            objects[name] = [field.strip() for field in fields.split(",") if field.strip()]
+    return objects
+
+
+def _soql_string_value(literal: str) -> str:
+    """Decode a single-quoted SOQL string literal"""
+    return _SOQL_ESCAPE_RE.sub(
+        lambda match: _SOQL_STRING_ESCAPES.get(match.group(1), match.group(1)), literal[1:-1]
+    )
+
+
+def _soql_datetime(stamp: str) -> str:
+    """Turn an API timestamp ("2024-05-01T10:00:00.000+0000") into a SOQL/REST literal"""
+    return f"{stamp[:19]}Z" if stamp else ""
+
+
+def _soql_timestamp(seconds: float) -> str:
+    """SOQL/REST datetime literal for a Unix time"""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+
+
+def _fts_query(search_term: str) -> str:
+    """
+    Translate a SOSL search term into an FTS5 query: words, quoted phrases,
+    trailing * wildcards, AND, OR, AND NOT and parentheses. Anything else
+    raises _NotMirrorable so the search goes to SOSL.
+    """
+    tokens = _SOSL_TERM_RE.findall(search_term)
+    parts: List[str] = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        upper = token.upper()
+        index += 1
+        if upper in ("AND", "OR"):
+            if upper == "AND" and index < len(tokens) and tokens[index].upper() == "NOT":
+                upper, index = "NOT", index + 1
+            parts.append(upper)
+        elif token in ("(", ")"):
+            parts.append(token)
+        elif token.startswith('"'):
+            if any(char in token for char in "*?\\"):
+                raise _NotMirrorable("wildcard in a phrase")
+            parts.append(token)
+        else:
+            word, prefix = (token[:-1], "*") if token.endswith("*") else (token, "")
+            if not word or upper == "NOT" or any(char in word for char in "*?\\"):
+                raise _NotMirrorable(f"unsupported search syntax: {token}")
+            parts.append(f'"{word}"{prefix}')
+    if not parts:
+        raise _NotMirrorable("empty search term")
+    return " ".join(parts)
+
+
+def _mirror_column(columns: Dict[str, Tuple[str, str]], path: str) -> Tuple[str, str]:
+    entry = columns.get(path.lower())
+    if entry is None:
+        raise _NotMirrorable(f"{path} is not mirrored")
+    return entry
+
+
+class _MirrorFilter:
+    """
+    Translate a SOQL WHERE clause into a parameterized SQLite expression.
+
+    Only comparisons SQLite evaluates the way Salesforce does are accepted:
+    =, !=, <, <=, >, >=, LIKE, IN and NOT IN against literals, combined with
+    AND, OR, NOT and parentheses. Comparisons are kept two-valued as in SOQL,
+    where "Industry != 'Energy'" also matches records without an Industry.
+    """
+
+    def __init__(self, tokens: List[Tuple[str, str]], columns: Dict[str, Tuple[str, str]]):
+        self.tokens = tokens
+        self.columns = columns
+        self.pos = 0
+        self.params: List[Any] = []
+
+    def compile(self) -> str:
+        sql = self._or()
+        if self.pos != len(self.tokens):
+            raise _NotMirrorable("unsupported WHERE syntax")
+        return sql
+
+    def _peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self) -> Tuple[Optional[str], Optional[str]]:
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def _or(self) -> str:
+        parts = [self._and()]
+        while self._peek() == ("keyword", "OR"):
+            self.pos += 1
+            parts.append(self._and())
+        return parts[0] if len(parts) == 1 else f"({' OR '.join(parts)})"
+
+    def _and(self) -> str:
+        parts = [self._not()]
+        while self._peek() == ("keyword", "AND"):
+            self.pos += 1
+            parts.append(self._not())
+        return parts[0] if len(parts) == 1 else f"({' AND '.join(parts)})"
+
+    def _not(self) -> str:
+        if self._peek() == ("keyword", "NOT"):
+            self.pos += 1
+            return f"NOT {self._not()}"
+        if self._peek() == ("punct", "("):
+            self.pos += 1
+            inner = self._or()
+            if self._next() != ("punct", ")"):
+                raise _NotMirrorable("unbalanced parentheses")
+            return f"({inner})"
+        return self._comparison()
+
+    def _comparison(self) -> str:
+        kind, path = self._next()
+        if kind != "name":
+            raise _NotMirrorable("unsupported WHERE syntax")
+        column, field_type = _mirror_column(self.columns, path)
+        quoted = f'"{column}"'
+        token = self._next()
+        if token[0] == "op":
+            op = "!=" if token[1] == "<>" else token[1]
+            if self._peek() == ("keyword", "NULL"):
+                self.pos += 1
+                if op not in ("=", "!="):
+                    raise _NotMirrorable("ordering comparison with null")
+                return f"{quoted} IS {'NOT ' if op == '!=' else ''}NULL"
+            self.params.append(self._value(field_type))
+            return f"IFNULL({quoted} {op} ?, {1 if op == '!=' else 0})"
+        if token == ("keyword", "LIKE"):
+            kind, literal = self._next()
+            if kind != "string" or "\\%" in literal or "\\_" in literal:
+                raise _NotMirrorable("unsupported LIKE pattern")
+            self.params.append(_soql_string_value(literal))
+            return f"IFNULL({quoted} LIKE ?, 0)"
+        negate = token == ("keyword", "NOT")
+        if negate:
+            token = self._next()
+        if token != ("keyword", "IN") or self._next() != ("punct", "("):
+            raise _NotMirrorable("unsupported comparison")
+        placeholders = []
+        while True:
+            self.params.append(self._value(field_type))
+            placeholders.append("?")
+            token = self._next()
+            if token == ("punct", ")"):
+                break
+            if token != ("punct", ","):
+                raise _NotMirrorable("unsupported IN list")
+        membership = f"{quoted} {'NOT IN' if negate else 'IN'} ({', '.join(placeholders)})"
+        return f"IFNULL({membership}, {1 if negate else 0})"
+
+    def _value(self, field_type: str) -> Any:
+        kind, text = self._next()
+        if kind == "string":
+            value = _soql_string_value(text)
+            if field_type in ("id", "reference") and len(value) != 18:
+                # Stored IDs are 18 characters; Salesforce also accepts the 15-character
+                # form and rejects malformed IDs, so leave both to the API
+                raise _NotMirrorable("not an 18-character ID")
+            return value
+        if kind == "number":
+            return float(text) if "." in text else int(text)
+        if kind == "keyword" and text in ("TRUE", "FALSE"):
+            return 1 if text == "TRUE" else 0
+        if kind == "datetime":
+            if "T" not in text:
+                return text
+            if text.endswith("Z"):
+                return f"{text[:19]}.000+0000"
+        raise _NotMirrorable("unsupported literal")
+
+
+def _mirror_order(tokens: List[Tuple[str, str]], columns: Dict[str, Tuple[str, str]]) -> str:
+    """Translate ORDER BY items; SQLite already sorts nulls first ascending and last descending"""
+    terms = []
+    for item in _split_top_level(tokens, ("punct", ",")):
+        if not item or item[0][0] != "name":
+            raise _NotMirrorable("unsupported ORDER BY")
+        column, _ = _mirror_column(columns, item[0][1])
+        modifiers = [text for _, text in item[1:]]
+        direction = modifiers.pop(0) if modifiers[:1] in (["ASC"], ["DESC"]) else "ASC"
+        if modifiers == ["NULLS", "FIRST"]:
+            terms.append(f'"{column}" IS NULL DESC')
+        elif modifiers == ["NULLS", "LAST"]:
+            terms.append(f'"{column}" IS NULL ASC')
+        elif modifiers:
+            raise _NotMirrorable("unsupported ORDER BY")
+        terms.append(f'"{column}" {direction}')
+    return ", ".join(terms)
+
+
+class _SObjectMirror:
+    """
+    Local SQLite copy of configured sObjects, one database file per org.
+
+    The first read of an object (or salesforce_sync_mirror) copies it with one
+    SOQL query. Later refreshes only fetch records whose SystemModstamp reached
+    the stored watermark and drop the IDs reported by the getDeleted resource.
+    Queries that select plain mirrored fields and filter and sort in ways SQLite
+    evaluates like Salesforce are answered locally; anything else goes to the API.
+
+    Searchable objects also get an FTS5 table over their text fields, kept in
+    step with the mirror table by triggers, so searches are ranked locally.
+    """
+
+    def __init__(
+        self,
+        objects: Dict[str, List[str]],
+        searchable: Dict[str, List[str]],
+        mirror_dir: str,
+        max_staleness: float,
+        max_records: int,
+    ):
+        self.objects = {name.lower(): (name, fields) for name, fields in objects.items()}
+        for name, fields in searchable.items():
+            mirrored = self.objects.get(name.lower())
+            if mirrored is None:
+                self.objects[name.lower()] = (name, list(fields))
+            elif mirrored[1] and fields:
+                # A field list limits the mirror, so it also needs the indexed fields
+                known = {field.lower() for field in mirrored[1]}
+                extra = [field for field in fields if field.lower() not in known]
+                self.objects[name.lower()] = (mirrored[0], mirrored[1] + extra)
+        self.searchable = {name.lower(): fields for name, fields in searchable.items()}
+        self.mirror_dir = mirror_dir
+        self.max_staleness = max_staleness
+        self.max_records = max_records
+        self._databases: Dict[str, Tuple[Any, threading.RLock]] = {}
+        self._sync_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.served = 0
+        self.fallbacks = 0
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.records_synced = 0
+        self.records_deleted = 0
+        self.searches_served = 0
+        self.search_fallbacks = 0
+        self._fts5: Optional[bool] = None
+
+    def covers(self, object_name: str) -> bool:
+        return object_name.lower() in self.objects
+
+    def indexes(self, object_name: str) -> bool:
+        return object_name.lower() in self.searchable
+
+    def object_names(self) -> List[str]:
+        return sorted(name for name, _ in self.objects.values())
+
+    def query(
+        self,
+        sf: "Salesforce",
+        parsed: "_SoqlQuery",
+        limit: int,
+        output_format: str,
+        budget: Optional[int] = None,
+        output: str = "auto",
+    ) -> Optional[str]:
+        """Answer a parsed query from the mirror, or return None to send it to the API"""
+        if not self.covers(parsed.object_name):
+            return None
+        name = self.objects[parsed.object_name.lower()][0]
+        try:
+            state = self._state(sf, name)
+            columns = state["columns"] if state else self._columns(sf, name)
+            self._compile(name, parsed, columns, limit)
+            state = self.refresh(sf, name)
+            if state is None:
+                raise _NotMirrorable(f"{name} has more than {self.max_records} records")
+            sql, params, selected = self._compile(name, parsed, state["columns"], limit)
+        except (_NotMirrorable, _ApiQuotaExceeded):
+            with self._lock:
+                self.fallbacks += 1
+            return None
+
+        db, db_lock = self._database(sf)
+        with db_lock:
+            rows = db.execute(sql, params).fetchall()
+        if len(rows) > limit:
+            # Paging needs a server-side query locator
+            with self._lock:
+                self.fallbacks += 1
+            return None
+
+        records = []
+        for row in rows:
+            record: Dict[str, Any] = {
+                "attributes": {
+                    "type": name,
+                    "url": f"/services/data/v{sf.sf_version}/sobjects/{name}/{row[0]}",
+                }
+            }
+            for (field, field_type), value in zip(selected, row[1:]):
+                record[field] = bool(value) if field_type == "boolean" and value is not None else value
+            records.append(record)
+
+        response: Dict[str, Any] = {
+            "totalSize": len(records),
+            "done": True,
+            "returned": len(records),
+            "source": "mirror",
+            "mirror_age_seconds": round(time.time() - state["synced_at"], 1),
+        }
+        sink = _ResultSink(
+            "query", output, to_line=lambda record: _clean_record(record, output_format != "records")
+        )
+        try:
+            sink.extend(records)
+        finally:
+            sink.close()
+        if sink.spilled:
+            text = _encode_response(sink.attach(response, "records"))
+        else:
+            shaped, _ = _shape_records(records, output_format)
+            text = _dumps(dict(response, **shaped))
+            if budget is None:
+                budget = _response_budget()
+            if budget > 0 and len(text.encode("utf-8")) > budget:
+                # Truncating needs a next_cursor, which only the API can provide
+                with self._lock:
+                    self.fallbacks += 1
+                return None
+        with self._lock:
+            self.served += 1
+        _telemetry.add("cache_hits")
+        return text
+
+    def refresh(
+        self, sf: "Salesforce", object_name: str, full: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Bring an object's mirror within the staleness bound and return its
+        state, or None when the object is too large to mirror.
+        """
+        name = self.objects[object_name.lower()][0]
+        state = self._state(sf, name)
+        if not full and state is not None and self._is_current(sf, state):
+            return None if state["too_large"] else state
+        with self._lock:
+            sync_lock = self._sync_locks.setdefault(
+                (_org_key(sf), name.lower()), threading.Lock()
+            )
+        # Single-flight: concurrent readers wait for one refresh
+        with sync_lock:
+            state = self._state(sf, name)
+            if full or state is None or not self._is_current(sf, state):
+                columns = self._columns(sf, name)
+                if (
+                    full
+                    or state is None
+                    or state["too_large"]
+                    or state["columns"] != columns
+                    or state.get("search_fields") != self._search_fields(name, columns)
+                ):
+                    state = self._full_sync(sf, name, columns)
+                else:
+                    state = self._incremental_sync(sf, name, state)
+        return None if state["too_large"] else state
+
+    def search(
+        self,
+        sf: "Salesforce",
+        search_term: str,
+        object_name: str,
+        limit: int,
+        fields: Optional[List[str]] = None,
+        search_in: str = "ALL",
+    ) -> Optional[Tuple[List[Tuple[float, Dict[str, Any]]], float]]:
+        """
+        Run a SOSL search term against one object's index.
+
+        Args:
+            fields: Mirrored fields to return (default: the indexed fields)
+            search_in: SOSL search group; ALL, EMAIL and PHONE are supported
+
+        Returns:
+            ([(bm25 rank, record)] best first, index age in seconds), or None
+            when the object can't be searched locally
+        """
+        import sqlite3
+
+        name = self.objects[object_name.lower()][0]
+        try:
+            if search_in not in _SEARCH_SCOPE_TYPES:
+                raise _NotMirrorable(f"IN {search_in} FIELDS is not indexed")
+            fts_query = _fts_query(search_term)
+            state = self.refresh(sf, name)
+            if state is None or not state["search_fields"]:
+                raise _NotMirrorable(f"{name} has no search index")
+            columns = state["columns"]
+            scope_types = _SEARCH_SCOPE_TYPES[search_in]
+            if scope_types:
+                scoped = [
+                    field
+                    for field in state["search_fields"]
+                    if columns[field.lower()][1] in scope_types
+                ]
+                if not scoped:
+                    raise _NotMirrorable(f"{name} has no indexed {search_in.lower()} fields")
+                column_filter = " ".join(f'"{field}"' for field in scoped)
+                fts_query = f"{{{column_filter}}} : ({fts_query})"
+            fields = [
+                _mirror_column(columns, field)[0]
+                for field in (fields or state["search_fields"])
+                if field.lower() != "id"
+            ]
+            fts = self._table(name, prefix="search")
+            selected = ", ".join(f't."{field}"' for field in [columns["id"][0]] + fields)
+            db, db_lock = self._database(sf)
+            with db_lock:
+                rows = db.execute(
+                    f"SELECT bm25({fts}), {selected} "
+                    f"FROM {fts} JOIN {self._table(name)} AS t ON t.rowid = {fts}.rowid "
+                    f"WHERE {fts} MATCH ? ORDER BY bm25({fts}) LIMIT ?",
+                    (fts_query, limit),
+                ).fetchall()
+        except (_NotMirrorable, _ApiQuotaExceeded, sqlite3.OperationalError):
+            # OperationalError: FTS5 rejected the translated term
+            with self._lock:
+                self.search_fallbacks += 1
+            return None
+
+        hits = []
+        for row in rows:
+            record: Dict[str, Any] = {"type": name, "Id": row[1]}
+            record.update(zip(fields, row[2:]))
+            hits.append((row[0], record))
+        with self._lock:
+            self.searches_served += 1
+        _telemetry.add("cache_hits")
+        return hits, round(time.time() - state["synced_at"], 1)
+
+    def mark_stale(self, sf: "Salesforce", object_types: Optional[List[str]]) -> None:
+        """Refresh objects before their next read because a write may have changed them"""
+        names = [
+            self.objects[name.lower()][0]
+            for name in (object_types if object_types is not None else list(self.objects))
+            if self.covers(name)
+        ]
+        if not names or not self._database_exists(sf):
+            return
+        db, db_lock = self._database(sf)
+        with db_lock, db:
+            for name in names:
+                state = self._load_state(db, name)
+                if state is not None:
+                    state["dirty"] = True
+                    self._save_state(db, name, state)
+
+    def discard(self, sf: "Salesforce", object_name: str, record_ids: List[str]) -> None:
+        """
+        Drop records this agent deleted right away; getDeleted only reports
+        them once their minute has passed.
+        """
+        if not record_ids or not self.covers(object_name) or not self._database_exists(sf):
+            return
+        name = self.objects[object_name.lower()][0]
+        db, db_lock = self._database(sf)
+        with db_lock, db:
+            state = self._load_state(db, name)
+            if state is None:
+                return
+            id_column = state["columns"]["id"][0]
+            db.executemany(
+                f'DELETE FROM {self._table(name)} WHERE "{id_column}" = ?',
+                [(record_id,) for record_id in record_ids],
+            )
+
+    def status(self, sf: "Salesforce", object_name: str) -> Dict[str, Any]:
+        state = self._state(sf, object_name)
+        if state is None:
+            return {"synced": False}
+        return {
+            "synced": not state["too_large"],
+            "too_large": state["too_large"],
+            "records": state["records"],
+            "fields": sorted(field for field, _ in state["columns"].values()),
+            "search_fields": state["search_fields"] or [],
+            "watermark": state["watermark"],
+            "synced_seconds_ago": round(time.time() - state["synced_at"], 1),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "objects": self.object_names(),
+                "max_staleness_seconds": self.max_staleness,
+                "served": self.served,
+                "fallbacks": self.fallbacks,
+                "full_syncs": self.full_syncs,
+                "incremental_syncs": self.incremental_syncs,
+                "records_synced": self.records_synced,
+                "records_deleted": self.records_deleted,
+                "search_indexed_objects": sorted(
+                    self.objects[name][0] for name in self.searchable
+                ),
+                "searches_served": self.searches_served,
+                "search_fallbacks": self.search_fallbacks,
+            }
+
+    def _is_current(self, sf: "Salesforce", state: Dict[str, Any]) -> bool:
+        age = time.time() - state["synced_at"]
+        if state["too_large"]:
+            return age <= _MIRROR_TOO_LARGE_RECHECK_SECONDS
+        if state["dirty"]:
+            return False
+        # Near the daily API limit a stale mirror beats spending calls on a refresh
+        return age <= self.max_staleness or _api_usage.level(sf) != "normal"
+
+    def _columns(self, sf: "Salesforce", name: str) -> Dict[str, Tuple[str, str]]:
+        """
+        Mirrored fields of an object: lower-cased name -> (field name, field type).
+        Formula fields are left out because their values can change without
+        SystemModstamp moving.
+        """
+        configured = {field.lower() for field in self.objects[name.lower()][1]}
+        columns: Dict[str, Tuple[str, str]] = {}
+        for field in _describe_cache.get(sf, name).get("fields", []):
+            lower = field["name"].lower()
+            if lower not in ("id", "systemmodstamp") and (
+                field.get("type") in _MIRROR_SKIPPED_TYPES
+                or field.get("calculated")
+                or (configured and lower not in configured)
+            ):
+                continue
+            columns[lower] = (field["name"], field.get("type", "string"))
+        if "id" not in columns or "systemmodstamp" not in columns:
+            raise _NotMirrorable(f"{name} has no SystemModstamp to sync from")
+        return columns
+
+    def _search_fields(self, name: str, columns: Dict[str, Tuple[str, str]]) -> List[str]:
+        """Mirrored text fields the object's search index covers"""
+        if name.lower() not in self.searchable or not self._fts5_available():
+            return []
+        configured = [field.lower() for field in self.searchable[name.lower()]]
+        return [
+            field
+            for lower, (field, field_type) in columns.items()
+            if field_type in _SEARCH_INDEX_TYPES and (not configured or lower in configured)
+        ]
+
+    def _fts5_available(self) -> bool:
+        """Whether this Python's SQLite was built with FTS5"""
+        if self._fts5 is None:
+            import sqlite3
+
+            try:
+                sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+                self._fts5 = True
+            except sqlite3.OperationalError:
+                self._fts5 = False
+        return self._fts5
+
+    def _compile(
+        self, name: str, parsed: "_SoqlQuery", columns: Dict[str, Tuple[str, str]], limit: int
+    ) -> Tuple[str, List[Any], List[Tuple[str, str]]]:
+        """Translate a parsed query into SQLite, raising _NotMirrorable for anything else"""
+        if parsed.alias or any(kind != "field" or "." in value for kind, value in parsed.items):
+            raise _NotMirrorable("only plain fields of the queried object are mirrored")
+        selected = [_mirror_column(columns, path) for _, path in parsed.items]
+        where, order, params = "", "", []
+        row_limit, offset = limit + 1, 0
+        for clause in parsed.clauses:
+            keyword = clause[0][1]
+            if keyword == "WHERE":
+                compiler = _MirrorFilter(clause[1:], columns)
+                where = f" WHERE {compiler.compile()}"
+                params = compiler.params
+            elif keyword == "ORDER" and clause[1:2] == [("keyword", "BY")]:
+                order = f" ORDER BY {_mirror_order(clause[2:], columns)}"
+            elif keyword in ("LIMIT", "OFFSET") and len(clause) == 2 and clause[1][0] == "number":
+                if keyword == "LIMIT":
+                    row_limit = min(row_limit, int(clause[1][1]))
+                else:
+                    offset = int(clause[1][1])
+            else:
+                raise _NotMirrorable(f"{keyword} is not supported by the mirror")
+        field_list = ", ".join(f'"{field}"' for field, _ in selected)
+        sql = (
+            f'SELECT "{columns["id"][0]}", {field_list} FROM {self._table(name)}'
+            f"{where}{order} LIMIT {row_limit} OFFSET {offset}"
+        )
+        return sql, params, selected
 
-        # Validate that we have required credentials
-        if not sf_username:
-            raise Exception(
-                "SF_USERNAME not found in connection 'salesforce_creds'. Please set credentials using setup_connection.sh"
-            )
+    def _full_sync(
+        self, sf: "Salesforce", name: str, columns: Dict[str, Tuple[str, str]]
+    ) -> Dict[str, Any]:
+        started = time.time()
+        # Changes and deletions from shortly before the copy started are
+        # replayed by the next incremental sync
+        since = _soql_timestamp(started - _MIRROR_WATERMARK_OVERLAP_SECONDS)
+        state: Dict[str, Any] = {
+            "columns": columns,
+            "search_fields": self._search_fields(name, columns),
+            "records": sf.query(f"SELECT COUNT() FROM {name}")["totalSize"],
+            "too_large": False,
+            "dirty": False,
+            "watermark": since,
+            "deleted_since": since,
+            "deleted_checked_at": started,
+            "synced_at": started,
+        }
+        db, db_lock = self._database(sf)
+        table, staging = self._table(name), self._table(name, "__staging")
+        fts, fts_staging = self._table(name, prefix="search"), self._table(
+            name, "__staging", prefix="search"
+        )
+        if state["records"] > self.max_records:
+            state["too_large"] = True
+            with db_lock, db:
+                db.execute(f"DROP TABLE IF EXISTS {table}")
+                db.execute(f"DROP TABLE IF EXISTS {fts}")
+                self._save_state(db, name, state)
+            return state
 
-        if not sf_password:
-            raise Exception(
-                "SF_PASSWORD not found in connection 'salesforce_creds'. Please set credentials using setup_connection.sh"
-            )
-
-        # Try different authentication methods based on available credentials
-        if sf_session_id and sf_instance:
-            # Session ID method
-            # Session ID method
-            sf = Salesforce(instance=sf_instance, session_id=sf_session_id)
-        elif sf_username and sf_password and sf_security_token:
-            # Username/Password/Security Token method
-            sf = Salesforce(
-                username=sf_username,
-                password=sf_password,
-                security_token=sf_security_token,
-                domain=sf_domain,  # 'test' for sandbox, 'login' for production
-            )
-        elif sf_username and sf_password and sf_consumer_key and sf_consumer_secret:
-            # Connected App method
-            sf = Salesforce(
-                username=sf_username,
-                password=sf_password,
-                consumer_key=sf_consumer_key,
-                consumer_secret=sf_consumer_secret,
-                domain=sf_domain,
-            )
-        else:
-            raise ValueError(
-                "Missing required Salesforce credentials. Please configure the salesforce_creds connection or set appropriate environment variables."
+        with db_lock, db:
+            db.execute(f"DROP TABLE IF EXISTS {staging}")
+            db.execute(f"DROP TABLE IF EXISTS {fts_staging}")
+            db.execute(self._create_table_sql(staging, columns))
+        # Readers keep using the previous copy until the new one is complete
+        received = self._copy_records(sf, name, columns, staging, "")
+        search_fields = ", ".join(f'"{field}"' for field in state["search_fields"])
+        if search_fields:
+            with db_lock, db:
+                db.execute(
+                    f"CREATE VIRTUAL TABLE {fts_staging} USING fts5({search_fields}, "
+                    "tokenize='unicode61 remove_diacritics 2')"
+                )
+                db.execute(
+                    f"INSERT INTO {fts_staging} (rowid, {search_fields}) "
+                    f"SELECT rowid, {search_fields} FROM {staging}"
+                )
+        with db_lock, db:
+            db.execute(f"DROP TABLE IF EXISTS {table}")
+            db.execute(f"DROP TABLE IF EXISTS {fts}")
+            db.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+            if search_fields:
+                db.execute(f"ALTER TABLE {fts_staging} RENAME TO {fts}")
+                self._create_search_triggers(db, name, state["search_fields"])
+            state["records"] = received
+            self._save_state(db, name, state)
+        with self._lock:
+            self.full_syncs += 1
+            self.records_synced += received
+        return state
+
+    def _incremental_sync(
+        self, sf: "Salesforce", name: str, state: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        started = time.time()
+        columns = state["columns"]
+        table = self._table(name)
+        stamp_field = columns["systemmodstamp"][0]
+        # >= so records modified in the same second as the watermark aren't missed
+        received = self._copy_records(
+            sf, name, columns, table, f" WHERE {stamp_field} >= {state['watermark']}"
+        )
+
+        deleted_ids: List[str] = []
+        deleted_since = state["deleted_since"]
+        deleted_checked_at = state["deleted_checked_at"]
+        if started - deleted_checked_at >= _MIRROR_DELETE_CHECK_SECONDS:
+            end = _soql_timestamp(started)
+            try:
+                deleted = _sf_request(
+                    sf,
+                    "GET",
+                    f"sobjects/{name}/deleted/",
+                    params={"start": deleted_since, "end": end},
+                ).json()
+            except Exception as e:
+                if "INVALID_REPLICATION_DATE" not in str(e):
+                    raise
+                # The window is older than Salesforce keeps deletions for
+                return self._full_sync(sf, name, columns)
+            earliest = _soql_datetime(deleted.get("earliestDateAvailable") or "")
+            if earliest and earliest > deleted_since:
+                # Deletions older than the recycle bin window can't be replayed
+                return self._full_sync(sf, name, columns)
+            deleted_ids = [entry["id"] for entry in deleted.get("deletedRecords", [])]
+            deleted_since = _soql_datetime(deleted.get("latestDateCovered") or "") or end
+            deleted_checked_at = started
+
+        db, db_lock = self._database(sf)
+        with db_lock, db:
+            if deleted_ids:
+                id_column = columns["id"][0]
+                db.executemany(
+                    f'DELETE FROM {table} WHERE "{id_column}" = ?', [(i,) for i in deleted_ids]
+                )
+            state = dict(
+                state,
+                records=db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0],
+                watermark=max(
+                    state["watermark"],
+                    _soql_timestamp(started - _MIRROR_WATERMARK_OVERLAP_SECONDS),
+                ),
+                deleted_since=deleted_since,
+                deleted_checked_at=deleted_checked_at,
+                synced_at=started,
+                dirty=False,
             )
+            self._save_state(db, name, state)
+        with self._lock:
+            self.incremental_syncs += 1
+            self.records_synced += received
+            self.records_deleted += len(deleted_ids)
+        return state
 
-        return sf
-    except Exception as e:
-        raise Exception(f"Failed to connect to Salesforce: {str(e)}")
+    def _copy_records(
+        self,
+        sf: "Salesforce",
+        name: str,
+        columns: Dict[str, Tuple[str, str]],
+        table: str,
+        where: str,
+    ) -> int:
+        """Upsert the records a query returns, one API batch at a time"""
+        fields = [field for field, _ in columns.values()]
+        quoted = ", ".join(f'"{field}"' for field in fields)
+        placeholders = ", ".join("?" for _ in fields)
+        insert = f"INSERT OR REPLACE INTO {table} ({quoted}) VALUES ({placeholders})"
+        db, db_lock = self._database(sf)
+        received = 0
+        for batch in _iter_query_batches(sf, f"SELECT {', '.join(fields)} FROM {name}{where}"):
+            rows = [
+                [int(value) if isinstance(value, bool) else value for value in map(record.get, fields)]
+                for record in batch
+            ]
+            with db_lock, db:
+                db.executemany(insert, rows)
+            received += len(batch)
+        return received
+
+    def _create_table_sql(self, table: str, columns: Dict[str, Tuple[str, str]]) -> str:
+        definitions = []
+        for lower, (field, field_type) in columns.items():
+            declared = _MIRROR_COLUMN_TYPES.get(field_type, "TEXT COLLATE NOCASE")
+            if lower == "id":
+                declared += " PRIMARY KEY"
+            definitions.append(f'"{field}" {declared}')
+        return f"CREATE TABLE {table} ({', '.join(definitions)})"
+
+    def _create_search_triggers(self, db: Any, name: str, fields: List[str]) -> None:
+        """
+        Keep the search index in step with the mirror table. Upserts replace
+        rows, which fires the delete trigger because recursive_triggers is on.
+        """
+        table, fts = self._table(name), self._table(name, prefix="search")
+        quoted = ", ".join(f'"{field}"' for field in fields)
+        values = ", ".join(f'new."{field}"' for field in fields)
+        db.execute(
+            f'CREATE TRIGGER "search_{name.lower()}_insert" AFTER INSERT ON {table} '
+            f"BEGIN INSERT INTO {fts} (rowid, {quoted}) VALUES (new.rowid, {values}); END"
+        )
+        db.execute(
+            f'CREATE TRIGGER "search_{name.lower()}_delete" AFTER DELETE ON {table} '
+            f"BEGIN DELETE FROM {fts} WHERE rowid = old.rowid; END"
+        )
+
+    def _table(self, name: str, suffix: str = "", prefix: str = "sobject") -> str:
+        return f'"{prefix}_{name.lower()}{suffix}"'
+
+    def _database_path(self, sf: "Salesforce") -> str:
+        return os.path.join(self.mirror_dir, f"{_org_key(sf)[:32]}.sqlite3")
+
+    def _database_exists(self, sf: "Salesforce") -> bool:
+        with self._lock:
+            if _org_key(sf) in self._databases:
+                return True
+        return os.path.exists(self._database_path(sf))
+
+    def _database(self, sf: "Salesforce") -> Tuple[Any, threading.RLock]:
+        import sqlite3
+
+        org_key = _org_key(sf)
+        with self._lock:
+            entry = self._databases.get(org_key)
+            if entry is None:
+                os.makedirs(self.mirror_dir, exist_ok=True)
+                db = sqlite3.connect(self._database_path(sf), check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.execute("PRAGMA recursive_triggers=ON")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS mirror_objects (name TEXT PRIMARY KEY, state TEXT)"
+                )
+                db.commit()
+                entry = self._databases[org_key] = (db, threading.RLock())
+        return entry
+
+    def _state(self, sf: "Salesforce", name: str) -> Optional[Dict[str, Any]]:
+        if not self._database_exists(sf):
+            return None
+        db, db_lock = self._database(sf)
+        with db_lock:
+            return self._load_state(db, name)
+
+    def _load_state(self, db: Any, name: str) -> Optional[Dict[str, Any]]:
+        row = db.execute(
+            "SELECT state FROM mirror_objects WHERE name = ?", (name.lower(),)
+        ).fetchone()
+        if row is None:
+            return None
+        state = json.loads(row[0])
+        state["columns"] = {lower: tuple(entry) for lower, entry in state["columns"].items()}
+        state.setdefault("search_fields", None)
+        return state
+
+    def _save_state(self, db: Any, name: str, state: Dict[str, Any]) -> None:
+        db.execute(
+            "INSERT OR REPLACE INTO mirror_objects (name, state) VALUES (?, ?)",
+            (name.lower(), json.dumps(state)),
+        )
+
+
+_mirror = _SObjectMirror(
+    _parse_mirror_config(MIRROR_OBJECTS),
+    _parse_mirror_config(SEARCH_INDEX_OBJECTS),
+    MIRROR_DIR,
+    MIRROR_MAX_STALENESS_SECONDS,
+    MIRROR_MAX_RECORDS,
+)
+
+
+def _batch_query_pages(sf: "Salesforce", queries: List[str]) -> List[Tuple[Any, Optional[Exception]]]:
+    """
+    Fetch the first result page of several queries through composite batch
+    requests, spending one API call per 25 queries instead of one per query.
+
+    Returns:
+        (page, error) per query, in input order
+    """
+    outcomes: List[Tuple[Any, Optional[Exception]]] = []
+    for chunk in _chunks(queries, _COMPOSITE_BATCH_MAX_SUBREQUESTS):
+        body = {
+            "haltOnError": False,
+            "batchRequests": [
+                {"method": "GET", "url": f"v{sf.sf_version}/query/?q={quote(query)}"}
+                for query in chunk
+            ],
+        }
+        response = _sf_request(sf, "POST", "composite/batch", json=body)
+        for result in response.json().get("results", []):
+            if result.get("statusCode", 500) >= 400:
+                errors = result.get("result") or [{}]
+                message = "; ".join(
+                    f"{error.get('errorCode', 'ERROR')}: {error.get('message', '')}"
+                    for error in errors
+                )
+                outcomes.append((None, Exception(message)))
+            else:
+                outcomes.append((result.get("result"), None))
+    return outcomes
+
+
+def _run_soql(
+    sf: "Salesforce",
+    soql: str,
+    limit: int,
+    output_format: str,
+    notes: Optional[Dict[str, Any]] = None,
+    cursor: str = "",
+    budget: Optional[int] = None,
+    first_page: Optional[Dict[str, Any]] = None,
+    output: str = "auto",
+) -> str:
+    """Fetch one page of query results and encode it as a salesforce_query response"""
+    flatten = output_format != "records"
+    sink = _ResultSink("query", output, to_line=lambda record: _clean_record(record, flatten))
+    try:
+        result, cursor_at = _query_page(sf, soql, limit, cursor, first_page, sink)
+    finally:
+        sink.close()
+    result.update(notes or {})
+    if sink.spilled:
+        return _encode_response(result)
+    shaped, list_key = _shape_records(result.pop("records"), output_format)
+    response = dict(result, **shaped)
+    return _encode_response(response, list_key=list_key, continuation=cursor_at, budget=budget)
+
+
+def _soql_response(
+    sf: "Salesforce",
+    parsed: _SoqlQuery,
+    limit: int,
+    output_format: str,
+    budget: Optional[int] = None,
+    output: str = "auto",
+) -> str:
+    """Answer a parsed query from the mirror, or prepare it and run it through the result cache"""
+    mirrored = _mirror.query(sf, parsed, limit, output_format, budget, output)
+    if mirrored is not None:
+        return mirrored
+    soql, notes = _prepare_soql(sf, parsed)
+    return _cached_read(
+        sf,
+        "salesforce_query",
+        (soql, limit, output_format, budget, output),
+        _soql_objects(sf, parsed),
+        lambda: _run_soql(sf, soql, limit, output_format, notes, budget=budget, output=output),
+    )
 
 
 @tool(
@@ -88,38 +4379,322 @@ def get_salesforce_connection():
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
-def salesforce_query(query: str) -> str:
+@_instrumented
+def salesforce_query(
+    query: str,
+    max_records: int = 0,
+    cursor: str = "",
+    output_format: str = "records",
+    output: str = "auto",
+) -> str:
     """
     Execute a SOQL query against Salesforce and return results.
 
+    Result batches are followed automatically up to max_records. When more
+    records remain, the response has done=false and a next_cursor token; call
+    this tool again with that cursor to get the next page.
+
+    Results larger than SF_RESULT_ARTIFACT_THRESHOLD_BYTES are streamed to a
+    JSON Lines file instead; the response then has an "artifact" with the
+    file path, record count and a few sample records in place of "records".
+
     Args:
         query: SOQL query string (e.g., "SELECT Id, Name FROM Account LIMIT 10")
+        max_records: Maximum number of records to return (default: SF_QUERY_MAX_RECORDS, 2000)
+        cursor: next_cursor value from a previous result to continue that query.
+            When set, the query argument is ignored.
+        output_format: "records" (default), "flat" (relationship fields as dotted
+            keys such as "Account.Name") or "columnar" (one "fields" header plus
+            value "rows", the most compact layout for many records)
+        output: "auto" (default), "inline" (always return records, truncated to the
+            response size budget with a next_cursor) or "file" (always write a
+            JSON Lines file; "flat" and "columnar" write flat records)
 
     Returns:
         JSON string containing query results
     """
     try:
-        sf = get_salesforce_connection()
+        limit = max_records if max_records > 0 else QUERY_MAX_RECORDS
+        if output not in _OUTPUT_MODES:
+            raise ValueError(f"Unknown output '{output}'. Use 'auto', 'inline' or 'file'.")
+        if cursor:
+            # Continuations depend on server-side query locators; never cache them
+            return _with_salesforce(
+                lambda sf: _run_soql(sf, "", limit, output_format, cursor=cursor, output=output)
+            )
 
-        # Fix common SOQL syntax issues
-        # Replace double quotes with single quotes for string literals in WHERE clauses
-        import re
+        # Syntax errors surface here, before any login or API call
+        parsed = _parse_soql(query)
+        return _with_salesforce(
+            lambda sf: _soql_response(sf, parsed, limit, output_format, output=output)
+        )
+    except Exception as e:
+        return _error_response(e)
 
-        # Pattern to find WHERE clauses with double-quoted values
-        fixed_query = re.sub(r'(\s*=\s*)"([^"]+)"', r"\1'\2'", query)
 
-        result = sf.query(fixed_query)
+def _multi_query_batched(
+    sf: "Salesforce", parsed: Dict[str, Any], limit: int, output_format: str, budget: int
+) -> List[Tuple[Any, Optional[Exception]]]:
+    """
+    salesforce_multi_query when API usage is high: cached results are reused
+    and the remaining queries share composite batch calls.
 
-        # Format the response for better readability
-        response = {
-            "totalSize": result.get("totalSize", 0),
-            "done": result.get("done", True),
-            "records": result.get("records", []),
-        }
+    Returns:
+        ((result, elapsed_ms), error) per query, in the order of parsed
+    """
+    started = time.perf_counter()
+    outcomes: Dict[str, Tuple[Any, Optional[Exception]]] = {}
+    pending: Dict[str, Tuple[str, Dict[str, Any], tuple]] = {}
+    for name, query in parsed.items():
+        if isinstance(query, Exception):
+            outcomes[name] = (None, query)
+            continue
+        try:
+            soql, notes = _prepare_soql(sf, query)
+        except Exception as e:
+            outcomes[name] = (None, e)
+            continue
+        request = (soql, limit, output_format, budget)
+        cached = _result_cache.get(sf, "salesforce_query", request)
+        if cached is not None:
+            outcomes[name] = ((json.loads(cached), 0.0), None)
+        else:
+            pending[name] = (soql, notes, request)
+
+    names = list(pending)
+    pages = _batch_query_pages(sf, [pending[name][0] for name in names])
+    for name, (page, error) in zip(names, pages):
+        if error is not None:
+            outcomes[name] = (None, error)
+            continue
+        soql, notes, request = pending[name]
+        try:
+            value = _run_soql(
+                sf, soql, limit, output_format, notes, budget=budget, first_page=page
+            )
+        except Exception as e:
+            outcomes[name] = (None, e)
+            continue
+        _result_cache.put(
+            sf, "salesforce_query", request, _soql_objects(sf, parsed[name]), value
+        )
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        outcomes[name] = ((json.loads(value), elapsed_ms), None)
+    return [outcomes[name] for name in parsed]
+
+
+@tool(
+    name="salesforce_multi_query",
+    description="Run several named SOQL queries concurrently and return all results together",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_multi_query(
+    queries: str, max_records: int = 0, output_format: str = "records"
+) -> str:
+    """
+    Run independent SOQL queries at the same time, e.g. the parts of a
+    dashboard-style answer, instead of one salesforce_query call per query.
+    Queries are given as a JSON object mapping a name to each query, e.g.
+
+        {"by_stage": "SELECT StageName, COUNT(Id) FROM Opportunity GROUP BY StageName",
+         "new_leads": "SELECT Id, Name FROM Lead WHERE CreatedDate = TODAY"}
+
+    Args:
+        queries: JSON object mapping a name to each SOQL query, or a JSON array of queries named q1, q2, ...
+        max_records: Maximum number of records per query (default SF_QUERY_MAX_RECORDS shared across the queries)
+        output_format: "records", "flat" or "columnar", as for salesforce_query
+
+    Returns:
+        JSON string with a "results" object holding, per name, the same result
+        salesforce_query returns plus elapsed_ms, or an "error"
+    """
+    try:
+        named = json.loads(queries)
+        if isinstance(named, list):
+            named = {f"q{index}": query for index, query in enumerate(named, start=1)}
+        if not isinstance(named, dict) or not named:
+            raise ValueError("queries must be a non-empty JSON object or array of SOQL strings")
+        limit = max_records if max_records > 0 else max(1, QUERY_MAX_RECORDS // len(named))
+        budget = _response_budget()
+        # Each query gets an equal share of the response budget
+        share = budget // len(named) if budget > 0 else 0
+
+        parsed: Dict[str, Any] = {}
+        for name, query in named.items():
+            try:
+                parsed[name] = _parse_soql(str(query))
+            except ValueError as e:
+                parsed[name] = e
+
+        def run_all(sf):
+            def run_one(name):
+                started = time.perf_counter()
+                if isinstance(parsed[name], Exception):
+                    raise parsed[name]
+                result = _with_retries(
+                    lambda: _soql_response(sf, parsed[name], limit, output_format, budget=share),
+                    _org_key(sf),
+                )
+                return json.loads(result), round((time.perf_counter() - started) * 1000, 1)
 
-        return json.dumps(response, indent=2, default=str)
+            names = list(parsed)
+            if _api_usage.level(sf) != "normal" and len(names) > 1:
+                outcomes = _multi_query_batched(sf, parsed, limit, output_format, share)
+            else:
+                outcomes = _map_concurrently(run_one, names, MULTI_QUERY_PARALLELISM)
+            for _, error in outcomes:
+                if error is not None and _is_invalid_session(error):
+                    # Let _with_salesforce log in again and rerun the batch
+                    raise error
+            results = {}
+            for name, (outcome, error) in zip(names, outcomes):
+                if error is not None:
+                    results[name] = _error_payload(error)
+                else:
+                    result, elapsed_ms = outcome
+                    results[name] = dict(result, elapsed_ms=elapsed_ms)
+            return results
+
+        started = time.perf_counter()
+        results = _with_salesforce(run_all)
+        return _encode_response(
+            {
+                "results": results,
+                "succeeded": sum(1 for result in results.values() if "error" not in result),
+                "failed": sum(1 for result in results.values() if "error" in result),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+        )
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
+
+
+def _sosl_escape(search_term: str) -> str:
+    """Escape SOSL reserved characters that would otherwise break or change a search"""
+    return _SOSL_RESERVED_RE.sub(r"\\\1", search_term)
+
+
+def _search_targets(
+    object_types: str, returning: str, limit: int
+) -> List[Tuple[str, List[str], int]]:
+    """
+    Parse the objects a search returns into (object, fields, limit) entries.
+
+    Args:
+        object_types: Comma-separated object types
+        returning: JSON object mapping object types to a field list (array or
+            comma-separated) or to {"fields": ..., "limit": n}
+        limit: Records per object unless "limit" overrides it
+    """
+    targets: Dict[str, Tuple[str, List[str], int]] = {}
+    for name in object_types.split(","):
+        if name.strip():
+            targets[name.strip().lower()] = (name.strip(), [], limit)
+    spec = json.loads(returning) if returning.strip() else {}
+    if not isinstance(spec, dict):
+        raise ValueError('returning must be a JSON object, e.g. {"Account": ["Name", "Website"]}')
+    for name, entry in spec.items():
+        object_limit = limit
+        if isinstance(entry, dict):
+            object_limit = int(entry.get("limit", limit))
+            entry = entry.get("fields", [])
+        fields = entry.split(",") if isinstance(entry, str) else list(entry or [])
+        fields = [str(field).strip() for field in fields if str(field).strip()]
+        targets[name.strip().lower()] = (name.strip(), fields, object_limit)
+
+    invalid = [name for name, _, _ in targets.values() if not _MIRROR_NAME_RE.match(name)]
+    invalid += [
+        field
+        for _, fields, _ in targets.values()
+        for field in fields
+        if not _SEARCH_FIELD_RE.match(field)
+    ]
+    if invalid:
+        raise ValueError(f"Invalid object type or field: {', '.join(invalid)}")
+    return [
+        (name, fields, max(1, min(object_limit, 2000)))
+        for name, fields, object_limit in targets.values()
+    ]
+
+
+def _parameterized_search(
+    sf: "Salesforce",
+    search_term: str,
+    targets: List[Tuple[str, List[str], int]],
+    search_in: str,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """
+    Run a search through the parameterizedSearch resource, returning only the
+    requested fields and records per object. Without targets every searchable
+    object is searched, up to limit records each.
+    """
+    body: Dict[str, Any] = {"q": _sosl_escape(search_term), "in": search_in, "fields": ["Id"]}
+    if targets:
+        body["sobjects"] = [
+            {
+                "name": name,
+                "fields": ["Id"] + [field for field in fields if field.lower() != "id"],
+                "limit": object_limit,
+            }
+            for name, fields, object_limit in targets
+        ]
+        body["overallLimit"] = min(sum(object_limit for _, _, object_limit in targets), 2000)
+    else:
+        body["defaultLimit"] = limit
+    result = _sf_request(sf, "POST", "parameterizedSearch/", json=body).json() or {}
+    return [
+        dict({"type": record.get("attributes", {}).get("type")}, **_clean_record(record))
+        for record in result.get("searchRecords", [])
+    ]
+
+
+def _scoped_search(
+    sf: "Salesforce",
+    search_term: str,
+    targets: List[Tuple[str, List[str], int]],
+    search_in: str,
+    limit: int,
+) -> Dict[str, Any]:
+    """Search indexed objects locally and the rest with one parameterizedSearch call"""
+    hits: List[Tuple[float, Dict[str, Any]]] = []
+    ages: List[float] = []
+    remaining: List[Tuple[str, List[str], int]] = []
+    for name, fields, object_limit in targets:
+        found = None
+        if _mirror.indexes(name):
+            found = _mirror.search(sf, search_term, name, object_limit, fields, search_in)
+        if found is None:
+            remaining.append((name, fields, object_limit))
+        else:
+            hits.extend(found[0])
+            ages.append(found[1])
+    # bm25 ranks are negative; lower is a better match
+    records = [record for _, record in sorted(hits, key=lambda hit: hit[0])]
+    searched_live = bool(remaining) or not targets
+    if searched_live:
+        records.extend(_parameterized_search(sf, search_term, remaining, search_in, limit))
+
+    response: Dict[str, Any] = {
+        "searchRecords": records,
+        "source": "+".join(
+            source for source, used in (("index", ages), ("sosl", searched_live)) if used
+        ),
+    }
+    if ages:
+        response["index_age_seconds"] = max(ages)
+    return response
+
+
+def _search_scope(search_in: str) -> str:
+    scope = (search_in or "ALL").strip().upper()
+    if scope not in _SEARCH_SCOPES:
+        raise ValueError(f"search_in must be one of {', '.join(_SEARCH_SCOPES)}")
+    return scope
 
 
 @tool(
@@ -130,26 +4705,130 @@ def salesforce_query(query: str) -> str:
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
-def salesforce_search(search_term: str) -> str:
+@_instrumented
+def salesforce_search(
+    search_term: str,
+    object_types: str = "",
+    returning: str = "",
+    limit: int = 25,
+    search_in: str = "ALL",
+    output: str = "auto",
+) -> str:
     """
     Execute a SOSL search against Salesforce.
 
+    Objects in SF_SEARCH_INDEX_OBJECTS are searched in a local full-text index
+    instead, returning ranked records with their indexed fields. returning
+    maps object types to a field list or to fields plus a limit, e.g.
+
+        {"Account": ["Name", "Website"], "Contact": {"fields": ["Name", "Email"], "limit": 5}}
+
+    Args:
+        search_term: Search term to find across Salesforce objects. Words, "quoted phrases",
+            * and ? wildcards and AND/OR/AND NOT work; other special characters are escaped.
+        object_types: Comma-separated object types to search (e.g., 'Account,Contact').
+            Leave empty to search every searchable object.
+        returning: JSON object with the fields (and optionally a limit) to return per
+            object type. Objects listed here are searched too. Without it, records
+            carry only their Id (or their indexed fields).
+        limit: Maximum records per object (default: 25)
+        search_in: Fields to search: ALL, NAME, EMAIL, PHONE or SIDEBAR (default: ALL)
+        output: "auto" (default; results over SF_RESULT_ARTIFACT_THRESHOLD_BYTES go to a
+            JSON Lines file), "inline" or "file", as for salesforce_query
+
+    Returns:
+        JSON string with "searchRecords" (each record has its "type") or an
+        "artifact" file summary, and the "source" of the results: index, sosl
+        or index+sosl
+    """
+    try:
+        scope = _search_scope(search_in)
+        limit = max(1, min(limit, 2000))
+        targets = _search_targets(object_types, returning, limit)
+        sink = _ResultSink("search", output, to_line=lambda record: record)
+        response = _with_salesforce(
+            lambda sf: _scoped_search(sf, search_term, targets, scope, limit)
+        )
+        try:
+            sink.extend(response.pop("searchRecords"))
+        finally:
+            sink.close()
+        return _encode_response(
+            sink.attach(response, "searchRecords"), list_key="searchRecords"
+        )
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_multi_search",
+    description="Run several Salesforce searches at the same time",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_multi_search(
+    search_terms: str,
+    object_types: str = "",
+    returning: str = "",
+    limit: int = 10,
+    search_in: str = "ALL",
+) -> str:
+    """
+    Run several searches concurrently, e.g. to match a list of company names
+    or email addresses, instead of one salesforce_search call per term.
+
     Args:
-        search_term: Search term to find across Salesforce objects
+        search_terms: JSON array of search terms (e.g., '["Acme", "Globex", "Initech"]')
+        object_types: Comma-separated object types to search, as for salesforce_search
+        returning: JSON object with the fields (and optionally a limit) to return per
+            object type, as for salesforce_search
+        limit: Maximum records per object and term (default: 10)
+        search_in: Fields to search: ALL, NAME, EMAIL, PHONE or SIDEBAR (default: ALL)
 
     Returns:
-        JSON string containing search results
+        JSON string with a "results" object holding, per term, the same result
+        salesforce_search returns, or an "error"
     """
     try:
-        sf = get_salesforce_connection()
-        result = sf.search(f"FIND {{{search_term}}}")
+        terms = json.loads(search_terms)
+        if not isinstance(terms, list) or not terms:
+            raise ValueError("search_terms must be a non-empty JSON array of strings")
+        terms = list(dict.fromkeys(str(term) for term in terms))
+        scope = _search_scope(search_in)
+        limit = max(1, min(limit, 2000))
+        targets = _search_targets(object_types, returning, limit)
 
-        if result is None:
-            return json.dumps({"message": "No results found"}, indent=2)
+        def run_all(sf):
+            outcomes = _map_concurrently(
+                lambda term: _with_retries(
+                    lambda: _scoped_search(sf, term, targets, scope, limit), _org_key(sf)
+                ),
+                terms,
+                MULTI_QUERY_PARALLELISM,
+            )
+            for _, error in outcomes:
+                if error is not None and _is_invalid_session(error):
+                    # Let _with_salesforce log in again and rerun the batch
+                    raise error
+            return {
+                term: _error_payload(error) if error is not None else outcome
+                for term, (outcome, error) in zip(terms, outcomes)
+            }
 
-        return json.dumps(result, indent=2, default=str)
+        results = _with_salesforce(run_all)
+        return _encode_response(
+            {
+                "results": results,
+                "succeeded": sum(1 for result in results.values() if "error" not in result),
+                "failed": sum(1 for result in results.values() if "error" in result),
+            },
+            list_key="results",
+        )
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
 
 
 @tool(
@@ -160,6 +4839,7 @@ def salesforce_search(search_term: str) -> str:
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
+@_instrumented
 def salesforce_create_record(object_type: str, record_data: str) -> str:
     """
     Create a new record in Salesforce.
@@ -172,18 +4852,19 @@ def salesforce_create_record(object_type: str, record_data: str) -> str:
         JSON string with creation result including new record ID
     """
     try:
-        sf = get_salesforce_connection()
-
         # Parse the record data
         data = json.loads(record_data)
 
-        # Get the object and create the record
-        sobject = getattr(sf, object_type)
-        result = sobject.create(data)
+        def create(sf):
+            # Get the object and create the record
+            with _sending_writes():
+                return getattr(sf, object_type).create(data)
+
+        result = _with_salesforce(_writing([object_type], create), idempotent=False)
 
-        return json.dumps(result, indent=2, default=str)
+        return _encode_response(result)
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
 
 
 @tool(
@@ -194,6 +4875,7 @@ def salesforce_create_record(object_type: str, record_data: str) -> str:
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
+@_instrumented
 def salesforce_update_record(object_type: str, record_id: str, record_data: str) -> str:
     """
     Update an existing record in Salesforce.
@@ -207,80 +4889,554 @@ def salesforce_update_record(object_type: str, record_id: str, record_data: str)
         JSON string with update result
     """
     try:
-        sf = get_salesforce_connection()
-
         # Parse the record data
         data = json.loads(record_data)
 
-        # Get the object and update the record
-        sobject = getattr(sf, object_type)
-        result = sobject.update(record_id, data)
+        def update(sf):
+            # Get the object and update the record
+            with _sending_writes():
+                return getattr(sf, object_type).update(record_id, data)
+
+        result = _with_salesforce(_writing([object_type], update))
+
+        return _encode_response({"success": True, "status_code": result})
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_delete_record",
+    description="Delete records from Salesforce",
+    permission=ToolPermission.READ_WRITE,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_delete_record(object_type: str, record_id: str) -> str:
+    """
+    Delete a record from Salesforce.
+
+    Args:
+        object_type: Salesforce object type (e.g., 'Account', 'Contact', 'Lead')
+        record_id: Salesforce record ID to delete
+
+    Returns:
+        JSON string with deletion result
+    """
+    try:
+        def delete(sf):
+            # Get the object and delete the record
+            with _sending_writes():
+                status = getattr(sf, object_type).delete(record_id)
+            _mirror.discard(sf, object_type, [record_id])
+            return status
+
+        result = _with_salesforce(_writing([object_type], delete), idempotent=False)
+
+        return _encode_response({"success": True, "status_code": result})
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_update_records",
+    description="Update many Salesforce records of one object type in a single call",
+    permission=ToolPermission.READ_WRITE,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_update_records(
+    object_type: str, records_data: str, all_or_none: bool = False, parallelism: int = 0
+) -> str:
+    """
+    Update multiple records using the sObject Collections API (200 records per request).
+
+    Args:
+        object_type: Salesforce object type (e.g., 'Account', 'Contact', 'Opportunity')
+        records_data: JSON array of records, each with an "Id" and the fields to update
+        all_or_none: Roll back every record of a 200-record request if any of them fails
+        parallelism: Number of requests to run concurrently (default: SF_COLLECTIONS_PARALLELISM)
+
+    Returns:
+        JSON string with a success flag and errors for each record
+    """
+    try:
+        # Parse the records data
+        data = json.loads(records_data)
+        if not isinstance(data, list) or not all(
+            isinstance(record, dict) and record.get("Id") for record in data
+        ):
+            raise ValueError('records_data must be a JSON array of records that each have an "Id"')
+
+        result = _with_salesforce(
+            _writing(
+                [object_type],
+                lambda sf: _write_collection(
+                    sf, object_type, "update", data, all_or_none, parallelism
+                ),
+            )
+        )
+
+        return _encode_response(result, list_key="results")
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_delete_records",
+    description="Delete many Salesforce records in a single call",
+    permission=ToolPermission.READ_WRITE,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_delete_records(
+    object_type: str, record_ids: str, all_or_none: bool = False, parallelism: int = 0
+) -> str:
+    """
+    Delete multiple records using the sObject Collections API (200 records per request).
+
+    Args:
+        object_type: Salesforce object type of the records (e.g., 'Account', 'Contact', 'Lead')
+        record_ids: JSON array or comma-separated list of record IDs to delete
+        all_or_none: Roll back every deletion of a 200-record request if any of them fails
+        parallelism: Number of requests to run concurrently (default: SF_COLLECTIONS_PARALLELISM)
+
+    Returns:
+        JSON string with a success flag and errors for each record
+    """
+    try:
+        ids = _parse_id_list(record_ids)
+        if not ids:
+            raise ValueError("record_ids must contain at least one record ID")
+
+        def delete(sf):
+            result = _write_collection(sf, object_type, "delete", ids, all_or_none, parallelism)
+            _mirror.discard(
+                sf, object_type, [item["id"] for item in result["results"] if item["success"]]
+            )
+            return result
+
+        result = _with_salesforce(_writing([object_type], delete), idempotent=False)
+
+        return _encode_response(result, list_key="results")
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_composite",
+    description="Run several dependent Salesforce operations (e.g. create an account, then a contact for it) in one request",
+    permission=ToolPermission.READ_WRITE,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_composite(operations: str, all_or_none: bool = True, use_graph: bool = False) -> str:
+    """
+    Execute an ordered list of operations in a single Composite API request.
+
+    Later operations can use results of earlier ones with references such as
+    "@{NewAccount.id}". Each operation has a "referenceId" naming its result
+    (e.g. "NewAccount"), an "object" type with an optional "id" for an existing
+    record (or a SOQL "query", or a raw REST "url"), an optional "method" (POST,
+    PATCH, GET or DELETE; by default POST for new records, PATCH when an id is
+    given and GET for queries) and an optional "body" with field values, e.g.
+
+        [{"referenceId": "NewAccount", "object": "Account", "body": {"Name": "Acme"}},
+         {"referenceId": "NewContact", "object": "Contact",
+          "body": {"LastName": "Doe", "AccountId": "@{NewAccount.id}"}}]
 
-        return json.dumps({"success": True, "status_code": result}, indent=2)
+    Args:
+        operations: JSON array of operations with referenceId, object, method and body, executed in order
+        all_or_none: Roll back every operation if any one fails (default: true)
+        use_graph: Use the Composite Graph API (also used automatically above 25 operations)
+
+    Returns:
+        JSON string with the status code and body of each operation
+    """
+    try:
+        data = json.loads(operations)
+        if not isinstance(data, list):
+            raise ValueError("operations must be a JSON array")
+
+        result = _with_salesforce(
+            _writing(
+                _composite_objects(data),
+                lambda sf: _run_composite(sf, data, all_or_none, use_graph),
+            ),
+            idempotent=False,
+        )
+
+        return _encode_response(result, list_key="results")
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_get_record",
+    description="Retrieve specific records from Salesforce by ID",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_get_record(object_type: str, record_id: str) -> str:
+    """
+    Retrieve a specific record from Salesforce by ID.
+
+    Args:
+        object_type: Salesforce object type (e.g., 'Account', 'Contact', 'Lead')
+        record_id: Salesforce record ID to retrieve
+
+    Returns:
+        JSON string containing the record data
+    """
+    try:
+        # Get the object and retrieve the record
+        return _with_salesforce(
+            lambda sf: _cached_read(
+                sf,
+                "salesforce_get_record",
+                (object_type.lower(), record_id),
+                [object_type],
+                lambda: _encode_response(
+                    _clean_record(getattr(sf, object_type).get(record_id))
+                ),
+            )
+        )
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
 
 
 @tool(
-    name="salesforce_delete_record",
-    description="Delete records from Salesforce",
-    permission=ToolPermission.READ_WRITE,
+    name="salesforce_get_records",
+    description="Retrieve many Salesforce records of one object type by ID in a single call",
+    permission=ToolPermission.READ_ONLY,
     expected_credentials=[
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
-def salesforce_delete_record(object_type: str, record_id: str) -> str:
+@_instrumented
+def salesforce_get_records(object_type: str, record_ids: str, fields: str = "") -> str:
     """
-    Delete a record from Salesforce.
+    Retrieve multiple records by ID using the sObject Collections API.
 
     Args:
         object_type: Salesforce object type (e.g., 'Account', 'Contact', 'Lead')
-        record_id: Salesforce record ID to delete
+        record_ids: JSON array or comma-separated list of record IDs
+        fields: Comma-separated field names to return (e.g., "Id,Name,Email").
+            Leave empty to return all fields.
 
     Returns:
-        JSON string with deletion result
+        JSON string with records keyed by ID; missing IDs are marked not_found
     """
     try:
-        sf = get_salesforce_connection()
+        ids = _parse_id_list(record_ids)
+        if not ids:
+            raise ValueError("record_ids must contain at least one record ID")
+        field_list = _parse_field_list(fields)
 
-        # Get the object and delete the record
-        sobject = getattr(sf, object_type)
-        result = sobject.delete(record_id)
+        result = _with_salesforce(
+            lambda sf: _retrieve_records(sf, object_type, ids, field_list)
+        )
 
-        return json.dumps({"success": True, "status_code": result}, indent=2)
+        return _encode_response(result, list_key="records")
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
+
+
+_RECORD_ID_RE = re.compile(r"^[A-Za-z0-9]{15}(?:[A-Za-z0-9]{3})?$")
+_RELATED_SPEC_KEYS = frozenset(["fields", "where", "order_by", "limit"])
+
+
+def _parse_related_spec(relationships: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse salesforce_get_related_records' relationship spec: comma-separated
+    relationship names, or a JSON object mapping each name to a field list or
+    to {"fields", "where", "order_by", "limit"}.
+    """
+    text = relationships.strip()
+    if not text.startswith("{"):
+        return {name: {} for name in _parse_field_list(text)}
+    spec: Dict[str, Dict[str, Any]] = {}
+    for name, options in json.loads(text).items():
+        if isinstance(options, (str, list)):
+            options = {"fields": options}
+        elif options is None:
+            options = {}
+        if not isinstance(options, dict):
+            raise ValueError(f"Relationship '{name}' must map to a field list or an object")
+        unknown = set(options) - _RELATED_SPEC_KEYS
+        if unknown:
+            raise ValueError(
+                f"Unknown option(s) {', '.join(sorted(unknown))} for relationship '{name}'. "
+                f"Use {', '.join(sorted(_RELATED_SPEC_KEYS))}."
+            )
+        fields = options.get("fields") or []
+        if isinstance(fields, str):
+            fields = _parse_field_list(fields)
+        spec[name] = dict(options, fields=[str(field).strip() for field in fields if str(field).strip()])
+    return spec
+
+
+def _name_field(describe: Dict[str, Any]) -> Optional[str]:
+    """The field Salesforce shows as a record's name (Name, CaseNumber, Subject...)"""
+    fields = describe.get("fields", [])
+    named = next((field["name"] for field in fields if field.get("nameField")), None)
+    if named:
+        return named
+    return "Name" if any(field.get("name") == "Name" for field in fields) else None
+
+
+def _default_related_fields(sf: "Salesforce", object_types: List[str]) -> List[str]:
+    """Id and name field of a related object; polymorphic lookups get Id and Name"""
+    if len(object_types) != 1:
+        return ["Id", "Name"]
+    name = _name_field(_describe_cache.get(sf, object_types[0]))
+    return ["Id", name] if name else ["Id"]
+
+
+def _compile_related_queries(
+    sf: "Salesforce",
+    describe: Dict[str, Any],
+    record_id: str,
+    root_fields: List[str],
+    spec: Dict[str, Dict[str, Any]],
+    limit: int,
+) -> Tuple[List[str], Dict[str, int], List[str]]:
+    """
+    Compile a relationship spec into SOQL on the root record: parent lookups
+    as relationship paths, child relationships as subqueries. Everything goes
+    into one query unless that would pass the SOQL limits on subqueries,
+    parent relationships or length; then the rest is spread over further
+    queries that select Id plus their share of relationships.
+
+    Returns:
+        The queries, the record cap per child relationship name and the
+        sObjects involved
+    """
+    object_name = describe["name"]
+    parents = {
+        field["relationshipName"].lower(): field
+        for field in describe.get("fields", [])
+        if field.get("relationshipName")
+    }
+    children = {
+        relationship["relationshipName"].lower(): relationship
+        for relationship in describe.get("childRelationships", [])
+        if relationship.get("relationshipName")
+    }
+    objects = [object_name]
+    # (kind, select item) for every requested relationship
+    items: List[Tuple[str, str]] = []
+    child_limits: Dict[str, int] = {}
+    for name, options in spec.items():
+        key = name.lower()
+        if key in parents:
+            field = parents[key]
+            if set(options) - {"fields"}:
+                raise ValueError(
+                    f"'{field['relationshipName']}' is a parent lookup; only fields can be set for it"
+                )
+            targets = field.get("referenceTo") or []
+            objects.extend(targets)
+            fields = options.get("fields") or _default_related_fields(sf, targets)
+            items.extend(("parent", f"{field['relationshipName']}.{f}") for f in fields)
+        elif key in children:
+            relationship = children[key]
+            child_object = relationship.get("childSObject")
+            objects.append(child_object)
+            fields = options.get("fields") or _default_related_fields(sf, [child_object])
+            cap = int(options.get("limit") or limit)
+            if cap <= 0:
+                raise ValueError(f"limit for '{name}' must be a positive number")
+            child_limits[relationship["relationshipName"]] = cap
+            subquery = f"SELECT {', '.join(fields)} FROM {relationship['relationshipName']}"
+            if options.get("where"):
+                subquery += f" WHERE {options['where']}"
+            if options.get("order_by"):
+                subquery += f" ORDER BY {options['order_by']}"
+            # One extra row tells whether more records exist than were asked for
+            items.append(("child", f"({subquery} LIMIT {cap + 1})"))
+        else:
+            known = [f["relationshipName"] for f in parents.values()] + [
+                r["relationshipName"] for r in children.values()
+            ]
+            raise ValueError(
+                f"'{name}' is not a relationship on {object_name}." + _closest(name, known)
+            )
+
+    where = f" FROM {object_name} WHERE Id = '{record_id}'"
+    groups: List[List[str]] = [list(dict.fromkeys(["Id"] + root_fields))]
+    counts = {"parent": 0, "child": 0}
+    caps = {"parent": _SOQL_MAX_PARENT_RELATIONSHIPS, "child": _SOQL_MAX_CHILD_SUBQUERIES}
+    length = len("SELECT " + ", ".join(groups[0]) + where)
+    relationships_in_group = set()
+    for kind, item in items:
+        relationship = item.lstrip("(").split(".")[0] if kind == "parent" else item
+        new_relationship = relationship not in relationships_in_group
+        full = (new_relationship and counts[kind] >= caps[kind]) or length + len(item) + 2 > _SOQL_MAX_LENGTH
+        if full and len(groups[-1]) > 1:
+            groups.append(["Id"])
+            counts = {"parent": 0, "child": 0}
+            length = len("SELECT Id" + where)
+            relationships_in_group = set()
+            new_relationship = True
+        groups[-1].append(item)
+        length += len(item) + 2
+        if new_relationship:
+            relationships_in_group.add(relationship)
+            counts[kind] += 1
+
+    queries = [f"SELECT {', '.join(group)}{where}" for group in groups]
+    for query in queries:
+        _validate_soql(sf, _parse_soql(query))
+    return queries, child_limits, list(dict.fromkeys(objects))
+
+
+def _fetch_related_records(
+    sf: "Salesforce", queries: List[str], child_limits: Dict[str, int]
+) -> Optional[Dict[str, Any]]:
+    """
+    Run the compiled queries (several at once through a composite batch
+    request), merge their rows into one record and page through child
+    subqueries until each has its cap plus one record or is exhausted.
+
+    Returns:
+        The hydrated record, or None when the root record doesn't exist
+    """
+    if len(queries) == 1:
+        outcomes = [(sf.query(queries[0]), None)]
+    else:
+        outcomes = _batch_query_pages(sf, queries)
+    merged: Dict[str, Any] = {}
+    for page, error in outcomes:
+        if error is not None:
+            raise error
+        rows = page.get("records", [])
+        if not rows:
+            return None
+        for key, value in rows[0].items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                # A parent lookup whose fields were split across queries
+                merged[key].update(value)
+            else:
+                merged[key] = value
+
+    lookup = {name.lower(): name for name in child_limits}
+    for key in list(merged):
+        name = lookup.get(key.lower())
+        if name is None:
+            continue
+        result = merged[key] or {"records": [], "done": True}
+        records = list(result.get("records", []))
+        cap = child_limits[name]
+        if not result.get("done", True) and result.get("nextRecordsUrl") and len(records) <= cap:
+            for page, _ in _iter_query_pages(sf, next_url=result["nextRecordsUrl"]):
+                records.extend(page.get("records", []))
+                if len(records) > cap:
+                    break
+        merged[key] = {
+            "returned": min(len(records), cap),
+            "done": len(records) <= cap,
+            "records": records[:cap],
+        }
+    return merged
 
 
 @tool(
-    name="salesforce_get_record",
-    description="Retrieve specific records from Salesforce by ID",
+    name="salesforce_get_related_records",
+    description="Retrieve a record with its parent lookups and child related lists in a single call",
     permission=ToolPermission.READ_ONLY,
     expected_credentials=[
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
-def salesforce_get_record(object_type: str, record_id: str) -> str:
+@_instrumented
+def salesforce_get_related_records(
+    object_type: str,
+    record_id: str,
+    relationships: str,
+    fields: str = "",
+    limit: int = 0,
+) -> str:
     """
-    Retrieve a specific record from Salesforce by ID.
+    Retrieve a record together with related records in one call.
+
+    Relationship names are resolved with describe metadata and compiled into a
+    single SOQL query: parent lookups (e.g. 'Owner', 'Account') become
+    relationship fields and child relationships (e.g. 'Contacts', 'Cases')
+    become subqueries. Requests past the SOQL relationship limits are split
+    into several queries sent in one composite request. Child subqueries are
+    paged through, so each related list holds up to its limit. A JSON
+    relationship spec maps each name to a field list or to fields, where,
+    order_by and limit, e.g.
+
+        {"Contacts": ["Name", "Email"],
+         "Opportunities": {"fields": ["Name", "Amount"], "where": "IsClosed = false",
+                           "order_by": "CloseDate"}}
 
     Args:
-        object_type: Salesforce object type (e.g., 'Account', 'Contact', 'Lead')
-        record_id: Salesforce record ID to retrieve
+        object_type: Salesforce object type of the root record (e.g., 'Account')
+        record_id: ID of the root record
+        relationships: Comma-separated relationship names (e.g., "Owner,Contacts,Cases"),
+            or a JSON object with fields, where, order_by and limit per relationship.
+            Without fields, related records come back with Id and their name field.
+        fields: Comma-separated fields of the root record (default: all fields)
+        limit: Maximum records per child relationship (default: SF_RELATED_RECORDS_LIMIT, 50)
 
     Returns:
-        JSON string containing the record data
+        JSON string with the record, its parent lookups nested under their
+        relationship names and each child relationship as returned, done (false
+        when more records exist than the limit) and records
     """
     try:
-        sf = get_salesforce_connection()
+        if not _RECORD_ID_RE.match(record_id.strip()):
+            raise ValueError(f"'{record_id}' is not a valid Salesforce record ID")
+        record_id = record_id.strip()
+        spec = _parse_related_spec(relationships)
+        if not spec:
+            raise ValueError("relationships must name at least one relationship")
+        cap = limit if limit > 0 else RELATED_RECORDS_LIMIT
+        root_fields = _parse_field_list(fields)
 
-        # Get the object and retrieve the record
-        sobject = getattr(sf, object_type)
-        result = sobject.get(record_id)
+        def fetch(sf: "Salesforce") -> str:
+            describe = _describe_cache.get(sf, object_type)
+            queries, child_limits, objects = _compile_related_queries(
+                sf,
+                describe,
+                record_id,
+                root_fields or _describe_field_names(describe),
+                spec,
+                cap,
+            )
+
+            def produce() -> str:
+                record = _fetch_related_records(sf, queries, child_limits)
+                if record is None:
+                    raise ValueError(f"No {describe['name']} record with Id '{record_id}'")
+                return _encode_response(
+                    {
+                        "object_type": describe["name"],
+                        "record": _clean_record(record),
+                        "queries": len(queries),
+                    }
+                )
+
+            return _cached_read(
+                sf, "salesforce_get_related_records", tuple(queries), objects, produce
+            )
 
-        return json.dumps(result, indent=2, default=str)
+        return _with_salesforce(fetch)
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
 
 
 @tool(
@@ -291,22 +5447,50 @@ def salesforce_get_record(object_type: str, record_id: str) -> str:
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
-def salesforce_describe_object(object_type: str) -> str:
+@_instrumented
+def salesforce_describe_object(
+    object_type: str,
+    fields: str = "",
+    field_types: str = "",
+    mode: str = "full",
+    picklists: str = "",
+) -> str:
     """
     Get metadata description for a Salesforce object.
 
     Args:
         object_type: Salesforce object type (e.g., 'Account', 'Contact', 'Lead')
+        fields: Optional comma-separated field names or glob patterns, matched
+            case-insensitively (e.g., 'Name,Billing*,*__c'); empty returns all fields
+        field_types: Optional comma-separated field types to keep (e.g., 'reference,picklist')
+        mode: "full" (default) for every field property, or "summary" for only
+            name, type and required
+        picklists: Optional comma-separated fields whose picklistValues to include,
+            or '*' for all. Empty includes them all in full mode and none in summary mode
 
     Returns:
-        JSON string containing object metadata including fields and their properties
+        JSON string containing object metadata, the selected fields and indexes of
+        required-for-create fields, external-ID fields and relationships
     """
     try:
-        sf = get_salesforce_connection()
+        mode = (mode or "full").strip().lower()
+        if mode not in _DESCRIBE_MODES:
+            raise ValueError(f"mode must be one of {', '.join(_DESCRIBE_MODES)}, got '{mode}'")
+        patterns = _parse_field_list(fields)
+        types = {name.lower() for name in _parse_field_list(field_types)}
+        expand = {name.lower() for name in _parse_field_list(picklists)}
+        if not picklists.strip() and mode == "full":
+            expand = {"*"}
 
         # Get the object and describe it
-        sobject = getattr(sf, object_type)
-        result = sobject.describe()
+        result = _with_salesforce(lambda sf: _describe_cache.get(sf, object_type))
+        all_fields = result.get("fields", [])
+        selected = [
+            field
+            for field in all_fields
+            if (not types or (field.get("type") or "").lower() in types)
+            and (not patterns or _field_matches(field.get("name") or "", patterns))
+        ]
 
         # Extract key information for better readability
         description = {
@@ -319,24 +5503,16 @@ def salesforce_describe_object(object_type: str) -> str:
             "deletable": result.get("deletable"),
             "queryable": result.get("queryable"),
             "searchable": result.get("searchable"),
-            "fields": [
-                {
-                    "name": field.get("name"),
-                    "label": field.get("label"),
-                    "type": field.get("type"),
-                    "required": field.get("nillable") == False,
-                    "createable": field.get("createable"),
-                    "updateable": field.get("updateable"),
-                    "length": field.get("length"),
-                    "picklistValues": field.get("picklistValues", []),
-                }
-                for field in result.get("fields", [])
-            ],
+            "field_count": len(all_fields),
+            "fields": [_describe_field(field, mode, expand) for field in selected],
         }
+        if patterns or types:
+            description["fields_matched"] = len(selected)
+        description.update(_describe_indexes(result))
 
-        return json.dumps(description, indent=2, default=str)
+        return _encode_response(description, list_key="fields")
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
 
 
 @tool(
@@ -347,18 +5523,23 @@ def salesforce_describe_object(object_type: str) -> str:
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
-def salesforce_list_objects() -> str:
+@_instrumented
+def salesforce_list_objects(output: str = "auto") -> str:
     """
     List all available Salesforce objects in the org.
 
+    Args:
+        output: "auto" (default; lists over SF_RESULT_ARTIFACT_THRESHOLD_BYTES go to a
+            JSON Lines file), "inline" or "file", as for salesforce_query
+
     Returns:
-        JSON string containing list of Salesforce objects with their labels
+        JSON string containing list of Salesforce objects with their labels,
+        or an "artifact" file summary
     """
     try:
-        sf = get_salesforce_connection()
-
+        sink = _ResultSink("objects", output, to_line=lambda record: record)
         # Get org description
-        result = sf.describe()
+        result = _with_salesforce(lambda sf: _describe_cache.get(sf))
 
         # Extract object information
         objects = [
@@ -376,10 +5557,71 @@ def salesforce_list_objects() -> str:
             }
             for obj in result.get("sobjects", [])
         ]
+        try:
+            sink.extend(objects)
+        finally:
+            sink.close()
+
+        return _encode_response(sink.attach({}, "objects"), list_key="objects")
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_bulk_export",
+    description="Export large SOQL query results to a local CSV, JSONL or Parquet file using Bulk API 2.0",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_bulk_export(
+    query: str = "",
+    output_format: str = "csv",
+    job_id: str = "",
+    include_deleted: bool = False,
+    wait_seconds: int = 300,
+    sample_size: int = 5,
+) -> str:
+    """
+    Export the results of a SOQL query to a local file with a Bulk API 2.0 query job.
+
+    Only a summary is returned (row count, file path, columns and a few sample
+    rows), so millions of rows can be extracted without passing them through
+    the conversation.
+
+    Args:
+        query: SOQL query string (e.g., "SELECT Id, Name, Industry FROM Account")
+        output_format: "csv" (default), "jsonl", "jsonl.gz" (gzip-compressed JSON Lines)
+            or "parquet" (requires pyarrow)
+        job_id: ID of a previously submitted export job to resume instead of submitting the query again
+        include_deleted: Include deleted and archived records (queryAll)
+        wait_seconds: Maximum seconds to wait for the job to finish (default: 300)
+        sample_size: Number of rows to include in the response (default: 5)
+
+    Returns:
+        JSON string with the export summary, or the job state if it is still running
+    """
+    try:
+        if not query and not job_id:
+            raise ValueError("Provide a query to export or the job_id of a previous export")
+
+        result = _with_salesforce(
+            lambda sf: _bulk_export(
+                sf,
+                query,
+                job_id,
+                output_format,
+                include_deleted,
+                max(0, wait_seconds),
+                sample_size,
+            )
+        )
 
-        return json.dumps({"objects": objects}, indent=2, default=str)
+        return _encode_response(result, list_key="sample")
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
 
 
 @tool(
@@ -390,6 +5632,7 @@ def salesforce_list_objects() -> str:
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
+@_instrumented
 def salesforce_upsert_record(
     object_type: str, external_id_field: str, external_id_value: str, record_data: str
 ) -> str:
@@ -406,18 +5649,21 @@ def salesforce_upsert_record(
         JSON string with upsert result
     """
     try:
-        sf = get_salesforce_connection()
-
         # Parse the record data
         data = json.loads(record_data)
 
-        # Get the object and upsert the record
-        sobject = getattr(sf, object_type)
-        result = sobject.upsert(f"{external_id_field}/{external_id_value}", data)
+        def upsert(sf):
+            # Get the object and upsert the record
+            with _sending_writes():
+                return getattr(sf, object_type).upsert(
+                    f"{external_id_field}/{external_id_value}", data
+                )
+
+        result = _with_salesforce(_writing([object_type], upsert))
 
-        return json.dumps(result, indent=2, default=str)
+        return _encode_response(result)
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
 
 
 @tool(
@@ -428,33 +5674,116 @@ def salesforce_upsert_record(
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
+@_instrumented
 def salesforce_bulk_create(
-    object_type: str, records_data: str, batch_size: int = 10000
+    object_type: str, records_data: str, batch_size: int = 10000, wait_seconds: int = 0
 ) -> str:
     """
-    Create multiple records in Salesforce using Bulk API.
+    Create multiple records in Salesforce using Bulk API 2.0.
+
+    Records are split into jobs of batch_size records that are uploaded in
+    parallel. The tool returns a job_handle as soon as the data is uploaded;
+    use salesforce_bulk_job_status to follow progress and
+    salesforce_bulk_job_results to get successful or failed rows.
 
     Args:
         object_type: Salesforce object type (e.g., 'Account', 'Contact', 'Lead')
         records_data: JSON string containing array of record data
-        batch_size: Number of records per batch (default: 10000)
+        batch_size: Number of records per Bulk API job (default: 10000)
+        wait_seconds: Optionally wait up to this many seconds for the jobs to finish (default: 0)
 
     Returns:
-        JSON string with bulk creation results
+        JSON string with the job handle and the state of each job
     """
     try:
-        sf = get_salesforce_connection()
-
         # Parse the records data
         data = json.loads(records_data)
+        if not isinstance(data, list):
+            raise ValueError("records_data must be a JSON array of records")
+
+        result = _with_salesforce(
+            _writing(
+                [object_type],
+                lambda sf: _bulk_ingest(sf, object_type, data, "insert", batch_size),
+            ),
+            idempotent=False,
+        )
+        if wait_seconds > 0 and result["job_handle"]:
+            # Polling is read-only and retried on its own: a failed status check
+            # must never upload the records again
+            try:
+                result["status"] = _with_salesforce(
+                    lambda sf: _wait_for_bulk_jobs(sf, result["job_handle"], wait_seconds)
+                )
+            except Exception as e:
+                result["status_error"] = _error_payload(e)
+
+        return _encode_response(result)
+    except Exception as e:
+        return _error_response(e)
 
-        # Get the object and bulk create
-        sobject = getattr(sf.bulk, object_type)
-        result = sobject.insert(data, batch_size=batch_size)
 
-        return json.dumps(result, indent=2, default=str)
+@tool(
+    name="salesforce_bulk_job_status",
+    description="Check the progress of Bulk API jobs started by salesforce_bulk_create",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_bulk_job_status(job_handle: str, wait_seconds: int = 0) -> str:
+    """
+    Get the state and record counts of Bulk API 2.0 ingest jobs.
+
+    Args:
+        job_handle: job_handle returned by salesforce_bulk_create (comma-separated job IDs)
+        wait_seconds: Optionally wait up to this many seconds for the jobs to finish (default: 0)
+
+    Returns:
+        JSON string with the state, processed and failed counts of each job
+    """
+    try:
+        result = _with_salesforce(
+            lambda sf: _wait_for_bulk_jobs(sf, job_handle, max(0, wait_seconds))
+        )
+
+        return _encode_response(result)
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_bulk_job_results",
+    description="Download successful, failed or unprocessed rows of finished Bulk API jobs",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_bulk_job_results(
+    job_handle: str, result_type: str = "failed", sample_size: int = 10
+) -> str:
+    """
+    Download the result rows of Bulk API 2.0 ingest jobs to a local CSV file.
+
+    Args:
+        job_handle: job_handle returned by salesforce_bulk_create (comma-separated job IDs)
+        result_type: "failed" (default), "successful" or "unprocessed"
+        sample_size: Number of rows to include in the response (default: 10)
+
+    Returns:
+        JSON string with the row count, the local file path and sample rows
+    """
+    try:
+        result = _with_salesforce(
+            lambda sf: _download_bulk_results(sf, job_handle, result_type, sample_size)
+        )
+
+        return _encode_response(result, list_key="sample")
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
 
 
 @tool(
@@ -465,6 +5794,7 @@ def salesforce_bulk_create(
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
+@_instrumented
 def salesforce_get_recent_records(object_type: str, limit: int = 10) -> str:
     """
     Get recently created records for a specific object type.
@@ -477,15 +5807,28 @@ def salesforce_get_recent_records(object_type: str, limit: int = 10) -> str:
         JSON string containing recent records
     """
     try:
-        sf = get_salesforce_connection()
-
         # Query for recent records
         query = f"SELECT Id, Name, CreatedDate FROM {object_type} ORDER BY CreatedDate DESC LIMIT {limit}"
-        result = sf.query(query)
 
-        return json.dumps(result, indent=2, default=str)
+        def recent_records(sf):
+            result = sf.query(query)
+            response = {
+                "totalSize": result.get("totalSize", 0),
+                "records": [_clean_record(r) for r in result.get("records", [])],
+            }
+            return _encode_response(response, list_key="records")
+
+        return _with_salesforce(
+            lambda sf: _cached_read(
+                sf,
+                "salesforce_get_recent_records",
+                (object_type.lower(), limit),
+                [object_type],
+                lambda: recent_records(sf),
+            )
+        )
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
 
 
 @tool(
@@ -496,6 +5839,7 @@ def salesforce_get_recent_records(object_type: str, limit: int = 10) -> str:
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
+@_instrumented
 def salesforce_get_user_info() -> str:
     """
     Get information about the current Salesforce user.
@@ -504,65 +5848,339 @@ def salesforce_get_user_info() -> str:
         JSON string containing current user information
     """
     try:
-        sf = get_salesforce_connection()
-
-        # Query for current user info
-        query = "SELECT Id, Name, Email, Username, Profile.Name, UserRole.Name FROM User WHERE Id = :userId"
-        # Since we can't use bind variables directly, we'll get the user ID from the session
-        user_query = f"SELECT Id, Name, Email, Username, Profile.Name, UserRole.Name FROM User WHERE Username = '{sf.session_id}' OR Id = '{sf.session_id}'"
-
-        # Alternative approach - get current user info
-        result = sf.query(
-            "SELECT Id, Name, Email, Username, Profile.Name, UserRole.Name FROM User WHERE Id = UserInfo.getUserId()"
-        )
-
-        if result["totalSize"] == 0:
-            # Fallback to getting any user info we can
+        def query_user_info(sf):
+            # Get current user info
             result = sf.query(
-                "SELECT Id, Name, Email, Username, Profile.Name, UserRole.Name FROM User LIMIT 1"
+                "SELECT Id, Name, Email, Username, Profile.Name, UserRole.Name FROM User WHERE Id = UserInfo.getUserId()"
             )
 
-        return json.dumps(result, indent=2, default=str)
+            if result["totalSize"] == 0:
+                # Fallback to getting any user info we can
+                result = sf.query(
+                    "SELECT Id, Name, Email, Username, Profile.Name, UserRole.Name FROM User LIMIT 1"
+                )
+            return result
+
+        result = _with_salesforce(query_user_info)
+
+        response = {
+            "totalSize": result.get("totalSize", 0),
+            "records": [_clean_record(r) for r in result.get("records", [])],
+        }
+        return _encode_response(response)
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
+
+
+def _estimated_record_counts(sf: "Salesforce", object_types: List[str]) -> Dict[str, int]:
+    """
+    Approximate record counts from /limits/recordCount in one API call.
+    Objects the org has no statistics for are left out.
+    """
+    response = _sf_request(
+        sf, "GET", "limits/recordCount", params={"sObjects": ",".join(object_types)}
+    )
+    found = {
+        entry["name"].lower(): entry.get("count", 0)
+        for entry in response.json().get("sObjects", [])
+        if entry.get("name")
+    }
+    return {name: found[name.lower()] for name in object_types if name.lower() in found}
 
 
 @tool(
     name="salesforce_get_record_count",
-    description="Get count of records for a specific object type with optional filtering",
+    description="Get count of records for one or more object types with optional filtering",
     permission=ToolPermission.READ_ONLY,
     expected_credentials=[
         ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
     ],
 )
-def salesforce_get_record_count(object_type: str, where_clause: str = "") -> str:
+@_instrumented
+def salesforce_get_record_count(
+    object_type: str, where_clause: str = "", exact: bool = False
+) -> str:
     """
     Get the count of records for a specific object type with optional filtering.
 
+    Unfiltered counts come from the org's record count statistics, one API call
+    for any number of objects, instead of a full COUNT() scan. Those counts are
+    estimates that Salesforce refreshes periodically; the response marks each
+    count with "exact".
+
     Args:
-        object_type: Salesforce object type (e.g., 'Account', 'Contact', 'Lead')
-        where_clause: Optional WHERE clause for filtering (e.g., "CreatedDate = TODAY")
+        object_type: Salesforce object type (e.g., 'Account', 'Contact', 'Lead'), or
+            several separated by commas (e.g., 'Account,Contact,Lead')
+        where_clause: Optional WHERE clause for filtering (e.g., "CreatedDate = TODAY").
+            Filtered counts are always exact.
+        exact: Run SELECT COUNT() even for unfiltered counts
 
     Returns:
         JSON string containing record count
     """
     try:
-        sf = get_salesforce_connection()
+        object_types = list(
+            dict.fromkeys(name.strip() for name in object_type.split(",") if name.strip())
+        )
+        if not object_types:
+            raise ValueError("object_type is required")
+        queries = {}
+        for name in object_types:
+            # Build the query
+            query = f"SELECT COUNT() FROM {name}"
+            if where_clause:
+                query += f" WHERE {where_clause}"
+            queries[name] = _parse_soql(query)
+
+        def exact_count(sf, name):
+            _validate_soql(sf, queries[name])
+            return sf.query(queries[name].render()).get("totalSize", 0)
+
+        def record_counts(sf):
+            counts: Dict[str, Any] = {}
+            if not where_clause and not exact:
+                for name, count in _estimated_record_counts(sf, object_types).items():
+                    counts[name] = {"count": count, "exact": False, "source": "recordCount"}
+            # Objects without statistics (e.g. new or empty ones) get a real count
+            missing = [name for name in object_types if name not in counts]
+            outcomes = _map_concurrently(
+                lambda name: exact_count(sf, name), missing, MULTI_QUERY_PARALLELISM
+            )
+            for name, (count, error) in zip(missing, outcomes):
+                if error is not None:
+                    if len(object_types) == 1 or _is_invalid_session(error):
+                        raise error
+                    counts[name] = _error_payload(error)
+                else:
+                    counts[name] = {"count": count, "exact": True, "source": "query"}
+
+            if len(object_types) == 1:
+                return _encode_response(
+                    dict(
+                        {"object_type": object_types[0]},
+                        **counts[object_types[0]],
+                        where_clause=where_clause or "None",
+                    )
+                )
+            return _encode_response(
+                {
+                    "counts": {name: counts[name] for name in object_types},
+                    "where_clause": where_clause or "None",
+                }
+            )
+
+        def cached_counts(sf):
+            return _cached_read(
+                sf,
+                "salesforce_get_record_count",
+                (tuple(parsed.render() for parsed in queries.values()), exact),
+                sorted({o for parsed in queries.values() for o in _soql_objects(sf, parsed)}),
+                lambda: record_counts(sf),
+            )
+
+        return _with_salesforce(cached_counts)
+    except Exception as e:
+        return _error_response(e)
 
-        # Build the query
-        query = f"SELECT COUNT() FROM {object_type}"
-        if where_clause:
-            query += f" WHERE {where_clause}"
 
-        result = sf.query(query)
+@tool(
+    name="salesforce_get_cache_stats",
+    description="Get hit/miss statistics for the Salesforce tool caches",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_get_cache_stats() -> str:
+    """
+    Get statistics for the caches used by the Salesforce tools.
 
-        return json.dumps(
+    Returns:
+        JSON string containing hit/miss counters and sizes for each cache
+    """
+    try:
+        return _encode_response(
             {
-                "object_type": object_type,
-                "count": result.get("totalSize", 0),
-                "where_clause": where_clause or "None",
-            },
-            indent=2,
+                "describe_cache": _describe_cache.stats(),
+                "result_cache": _result_cache.stats(),
+                "mirror": _mirror.stats(),
+                "api_usage": _api_usage.stats(),
+                "circuit_breaker": _circuit_breaker.stats(),
+            }
+        )
+    except Exception as e:
+        return _error_response(e)
+
+
+_API_LIMIT_NAMES = (
+    "DailyApiRequests",
+    "DailyBulkApiBatches",
+    "DailyBulkV2QueryJobs",
+    "DailyBulkV2QueryFileStorageMB",
+    "DailyAsyncApexExecutions",
+)
+
+
+@tool(
+    name="salesforce_get_api_limits",
+    description="Get the org's API usage and remaining daily quota",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_get_api_limits(refresh: bool = False, all_limits: bool = False) -> str:
+    """
+    Get API consumption for the connected org.
+
+    Usage is tracked from the Sforce-Limit-Info header of every API response,
+    so by default this costs no API call once any other tool has run.
+
+    Args:
+        refresh: Fetch the org's /limits resource for current values of the daily
+            API, Bulk API and async Apex limits (one API call)
+        all_limits: With refresh, return every limit the org reports
+
+    Returns:
+        JSON string with api_usage (used, limit, remaining, percent_used and
+        throttling level) and, when refreshed, the org limits
+    """
+    try:
+
+        def api_limits(sf):
+            response: Dict[str, Any] = {}
+            if refresh or _api_usage.usage(sf) is None:
+                # The response's own Sforce-Limit-Info header refreshes api_usage
+                limits = _sf_request(sf, "GET", "limits/").json()
+                response["limits"] = (
+                    limits
+                    if all_limits
+                    else {name: limits[name] for name in _API_LIMIT_NAMES if name in limits}
+                )
+            response["api_usage"] = _api_usage.usage(sf)
+            response["thresholds"] = {
+                "throttle_percent": API_USAGE_THROTTLE_PERCENT,
+                "shed_percent": API_USAGE_SHED_PERCENT,
+            }
+            return _encode_response(response)
+
+        return _with_salesforce(api_limits)
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_get_metrics",
+    description="Get latency, payload size and API call metrics for the Salesforce tools",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_get_metrics(output_format: str = "summary", reset: bool = False) -> str:
+    """
+    Get per-tool metrics collected since the process started (or the last reset).
+
+    Args:
+        output_format: "summary" (default) for call and error counts, counters and
+            p50/p95 latency per phase (total, auth, network, serialization), or
+            "otlp" for the raw cumulative histograms in OpenTelemetry JSON form
+        reset: Clear the collected metrics after reading them
+
+    Returns:
+        JSON string containing the metrics
+    """
+    try:
+        if output_format == "otlp":
+            result = _telemetry.otlp_metrics()
+        else:
+            result = {"tools": _telemetry.snapshot()}
+        if reset:
+            _telemetry.reset()
+        return _encode_response(result)
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_invalidate_metadata_cache",
+    description="Clear cached object metadata so the next describe fetches it from Salesforce",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_invalidate_metadata_cache(object_type: str = "") -> str:
+    """
+    Clear cached describe metadata for the connected org.
+
+    Args:
+        object_type: Salesforce object type to clear (e.g., 'Account'). Leave empty
+            to clear all cached metadata for the org, including the object list.
+
+    Returns:
+        JSON string with the number of cached entries removed
+    """
+    try:
+        removed = _with_salesforce(
+            lambda sf: _describe_cache.invalidate(sf, object_type or None)
         )
+        return _encode_response(
+            {"object_type": object_type or "ALL", "entries_removed": removed}
+        )
+    except Exception as e:
+        return _error_response(e)
+
+
+@tool(
+    name="salesforce_sync_mirror",
+    description="Refresh the local mirror of frequently queried objects and show its state",
+    permission=ToolPermission.READ_ONLY,
+    expected_credentials=[
+        ExpectedCredentials(app_id="salesforce_creds", type=ConnectionType.KEY_VALUE)
+    ],
+)
+@_instrumented
+def salesforce_sync_mirror(object_type: str = "", full: bool = False) -> str:
+    """
+    Refresh the local mirror that answers simple queries on the objects in
+    SF_MIRROR_OBJECTS without API calls.
+
+    Mirrors are also refreshed automatically when a query finds them older than
+    SF_MIRROR_MAX_STALENESS_SECONDS; use this to load them ahead of time or to check them.
+
+    Args:
+        object_type: Comma-separated mirrored object types to refresh (e.g., 'Account').
+            Leave empty for all mirrored objects.
+        full: Copy the objects again instead of fetching only changed and deleted records
+
+    Returns:
+        JSON string with each object's record count, fields, watermark and age
+    """
+    try:
+        names = [name.strip() for name in object_type.split(",") if name.strip()]
+        names = names or _mirror.object_names()
+        if not names:
+            raise ValueError(
+                "No objects are mirrored. Set SF_MIRROR_OBJECTS, e.g. 'Account:Name,Industry;Contact'."
+            )
+        unknown = [name for name in names if not _mirror.covers(name)]
+        if unknown:
+            raise ValueError(
+                f"Not mirrored: {', '.join(unknown)}. Mirrored objects: {', '.join(_mirror.object_names()) or 'none'}"
+            )
+
+        def sync(sf):
+            objects = {}
+            for name in names:
+                _mirror.refresh(sf, name, full=full)
+                objects[name] = _mirror.status(sf, name)
+            return objects
+
+        return _encode_response({"objects": _with_salesforce(sync)})
     except Exception as e:
-        return json.dumps({"error": str(e)}, indent=2)
+        return _error_response(e)
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "salesforce_agent", "tools"))
+
+import salesforce_tools  # noqa: E402
+
+
+def _describe(name, fields, child_relationships=()):
+    """Minimal describe payload: fields as (name, type) or (name, type, relationship)"""
+    return {
+        "name": name,
+        "fields": [
+            {"name": field[0], "type": field[1], "relationshipName": field[2] if len(field) > 2 else None}
+            for field in fields
+        ],
+        "childRelationships": [
+            {"relationshipName": relationship, "childSObject": child}
+            for relationship, child in child_relationships
+        ],
+    }
+
+
+DESCRIBES = {
+    "": {"sobjects": [{"name": name} for name in ("Account", "Contact", "Event", "Opportunity")]},
+    "account": _describe(
+        "Account",
+        [
+            ("Id", "id"),
+            ("Name", "string"),
+            ("Industry", "picklist"),
+            ("NumberOfEmployees", "int"),
+            ("OwnerId", "reference", "Owner"),
+            ("CreatedDate", "datetime"),
+        ],
+        [("Contacts", "Contact"), ("Opportunities", "Opportunity")],
+    ),
+    "contact": _describe(
+        "Contact",
+        [("Id", "id"), ("LastName", "string"), ("Email", "email"), ("AccountId", "reference", "Account")],
+    ),
+    "event": _describe(
+        "Event",
+        [("Id", "id"), ("Subject", "string"), ("WhatId", "reference", "What")],
+    ),
+}
+
+
+@pytest.fixture
+def describes(monkeypatch):
+    """Serve DESCRIBES from the describe cache without any API call"""
+
+    def peek(sf, object_name=None, fresh_only=False):
+        return DESCRIBES.get((object_name or "").lower())
+
+    def get(sf, object_name=None):
+        return DESCRIBES[(object_name or "").lower()]
+
+    monkeypatch.setattr(salesforce_tools._describe_cache, "peek", peek)
+    monkeypatch.setattr(salesforce_tools._describe_cache, "get", get)
+    return DESCRIBES
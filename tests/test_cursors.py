@@ -0,0 +1,127 @@
+import base64
+import json
+import re
+
+import pytest
+
+import salesforce_tools
+from salesforce_tools import _decode_cursor, _encode_cursor, _query_page
+
+LOCATOR = "/services/data/v59.0/query/01gFAKE"
+
+
+class FakeSalesforce:
+    """Serves one query's records in batches with query locators, recording every call"""
+
+    def __init__(self, total, instance="fake.my.salesforce.com"):
+        self.sf_instance = instance
+        self.records = [{"attributes": {"type": "Account"}, "Id": f"001{n:015d}"} for n in range(total)]
+        self.calls = []
+
+    def query(self, query, headers=None):
+        self.calls.append(("query", query, headers))
+        return self._page(0, headers)
+
+    def query_more(self, url, identifier_is_url=False, headers=None):
+        self.calls.append(("query_more", url, headers))
+        return self._page(int(re.match(r".*-(\d+)$", url).group(1)), headers)
+
+    def _page(self, offset, headers):
+        options = re.search(r"batchSize=(\d+)", (headers or {}).get("Sforce-Query-Options", ""))
+        size = int(options.group(1)) if options else 2000
+        page = {
+            "totalSize": len(self.records),
+            "done": offset + size >= len(self.records),
+            "records": self.records[offset : offset + size],
+        }
+        if not page["done"]:
+            page["nextRecordsUrl"] = f"{LOCATOR}-{offset + size}"
+        return page
+
+
+def _read_all(sf, max_records):
+    """Page through the whole result the way an agent would, returning the IDs"""
+    ids, cursor = [], ""
+    while True:
+        result, _ = _query_page(sf, "SELECT Id FROM Account", max_records, cursor)
+        ids += [record["Id"] for record in result["records"]]
+        assert result["totalSize"] == len(sf.records)
+        if result["done"]:
+            return ids
+        cursor = result["next_cursor"]
+
+
+def test_cursor_round_trip():
+    sf = FakeSalesforce(0)
+    state = {"url": f"{LOCATOR}-200"}
+    assert _decode_cursor(sf, _encode_cursor(sf, state)) == state
+    state = {"tail": "abc", "skip": 3}
+    assert _decode_cursor(sf, _encode_cursor(sf, state)) == state
+
+
+def _unsigned(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+
+@pytest.mark.parametrize(
+    "make_cursor",
+    [
+        lambda sf: _unsigned({}),
+        lambda sf: _unsigned({"query": "SELECT Id FROM User"}),
+        lambda sf: _unsigned({"url": f"{LOCATOR}-0"}) + "." + _encode_cursor(sf, {"url": "/x"}).split(".")[1],
+        lambda sf: _encode_cursor(sf, {"url": f"{LOCATOR}-0"}) + "x",
+        lambda sf: _encode_cursor(FakeSalesforce(0, "other.my.salesforce.com"), {"url": f"{LOCATOR}-0"}),
+        lambda sf: _encode_cursor(sf, {}),
+        lambda sf: _encode_cursor(sf, {"query": "SELECT Id FROM Account"}),
+        lambda sf: _encode_cursor(sf, {"url": "https://example.com/services/data/v59.0/query/x-1"}),
+        lambda sf: _encode_cursor(sf, {"tail": "abc", "skip": -1}),
+        lambda sf: "not a cursor",
+        lambda sf: "",
+    ],
+)
+def test_invalid_cursors_are_rejected(make_cursor):
+    sf = FakeSalesforce(0)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(sf, make_cursor(sf))
+
+
+@pytest.mark.parametrize("max_records, batch_size", [(10, 200), (150, 200), (300, 300), (5000, 2000)])
+def test_batches_are_sized_to_max_records(max_records, batch_size):
+    sf = FakeSalesforce(3000)
+    _query_page(sf, "SELECT Id FROM Account", max_records)
+    assert sf.calls[0][2] == {"Sforce-Query-Options": f"batchSize={batch_size}"}
+
+
+@pytest.mark.parametrize("total, max_records", [(450, 100), (1000, 250), (3000, 2000)])
+def test_paging_resumes_from_the_locator(total, max_records):
+    sf = FakeSalesforce(total)
+    ids = _read_all(sf, max_records)
+    assert ids == [record["Id"] for record in sf.records]
+    # The query runs once; every later call reads one batch through the locator
+    assert [call[0] for call in sf.calls].count("query") == 1
+    assert len(sf.calls) == -(-total // max_records)
+
+
+def test_single_batch_result_resumes_from_memory():
+    sf = FakeSalesforce(120)
+    ids = _read_all(sf, 50)
+    assert ids == [record["Id"] for record in sf.records]
+    assert [call[0] for call in sf.calls] == ["query"]
+
+
+def test_expired_kept_page(monkeypatch):
+    sf = FakeSalesforce(120)
+    result, _ = _query_page(sf, "SELECT Id FROM Account", 50)
+    monkeypatch.setattr(salesforce_tools._query_tails, "_entries", type(salesforce_tools._query_tails._entries)())
+    with pytest.raises(ValueError, match="expired"):
+        _query_page(sf, "", 50, result["next_cursor"])
+
+
+@pytest.mark.parametrize("total, index", [(120, 30), (450, 30), (450, 230)])
+def test_cursor_at_resumes_at_any_collected_record(total, index):
+    sf = FakeSalesforce(total)
+    result, cursor_at = _query_page(sf, "SELECT Id FROM Account", 300)
+    resumed, _ = _query_page(sf, "", 10, cursor_at(index))
+    assert [record["Id"] for record in resumed["records"]] == [
+        record["Id"] for record in sf.records[index : index + 10]
+    ]
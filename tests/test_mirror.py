@@ -0,0 +1,146 @@
+import sqlite3
+
+import pytest
+
+from salesforce_tools import (
+    _MIRROR_COLUMN_TYPES,
+    _MirrorFilter,
+    _NotMirrorable,
+    _fts_query,
+    _parse_soql,
+)
+
+FIELDS = [
+    ("Id", "id"),
+    ("Name", "string"),
+    ("Industry", "picklist"),
+    ("NumberOfEmployees", "int"),
+    ("IsActive", "boolean"),
+    ("CreatedDate", "datetime"),
+    ("CloseDate", "date"),
+    ("OwnerId", "reference"),
+]
+COLUMNS = {name.lower(): (name, field_type) for name, field_type in FIELDS}
+# Stored the way the mirror stores API values: booleans as 0/1, datetimes as returned
+ROWS = [
+    ("001000000000001AAA", "Acme", "Energy", 100, 1, "2024-01-15T08:00:00.000+0000", "2024-03-01", "005000000000001AAA"),
+    ("001000000000002AAA", "Globex", None, None, 0, "2024-06-01T12:30:00.000+0000", "2024-07-15", None),
+    ("001000000000003AAA", "initech", "Technology", 50, 1, "2023-12-31T23:59:59.000+0000", None, "005000000000002AAA"),
+    ("001000000000004AAA", "Umbrella", "Energy", 5000, 0, "2024-06-01T12:30:00.000+0000", "2025-01-01", "005000000000001AAA"),
+]
+
+
+@pytest.fixture(scope="module")
+def db():
+    connection = sqlite3.connect(":memory:")
+    definitions = []
+    for name, field_type in FIELDS:
+        declared = _MIRROR_COLUMN_TYPES.get(field_type, "TEXT COLLATE NOCASE")
+        definitions.append(f'"{name}" {declared}{" PRIMARY KEY" if name == "Id" else ""}')
+    connection.execute(f"CREATE TABLE account ({', '.join(definitions)})")
+    connection.executemany(f"INSERT INTO account VALUES ({', '.join('?' * len(FIELDS))})", ROWS)
+    yield connection
+    connection.close()
+
+
+def _where(condition):
+    return _parse_soql(f"SELECT Id FROM Account WHERE {condition}").clause("WHERE")[1:]
+
+
+@pytest.mark.parametrize(
+    "condition, expected",
+    [
+        ("Industry = 'energy'", [1, 4]),
+        # Two-valued like SOQL: records without an Industry match !=
+        ("Industry != 'Energy'", [2, 3]),
+        ("Industry <> 'Energy'", [2, 3]),
+        ("Industry = null", [2]),
+        ("Industry != null", [1, 3, 4]),
+        ("NumberOfEmployees > 60", [1, 4]),
+        ("NOT NumberOfEmployees > 60", [2, 3]),
+        ("Name LIKE 'a%'", [1]),
+        ("Name LIKE '%EX'", [2]),
+        ("Industry IN ('Energy', 'Retail')", [1, 4]),
+        ("Industry NOT IN ('Energy')", [2, 3]),
+        ("IsActive = true", [1, 3]),
+        ("IsActive = false", [2, 4]),
+        ("CreatedDate > 2024-06-01T00:00:00Z", [2, 4]),
+        ("CreatedDate >= 2024-01-01T00:00:00Z AND CreatedDate < 2024-06-01T12:30:00Z", [1]),
+        ("CloseDate < 2024-07-15", [1]),
+        ("CloseDate <= 2024-07-15", [1, 2]),
+        ("OwnerId = '005000000000001AAA'", [1, 4]),
+        ("Id IN ('001000000000002AAA', '001000000000003AAA')", [2, 3]),
+        ("(Industry = 'Energy' OR NumberOfEmployees < 100) AND IsActive = true", [1, 3]),
+        ("NOT (Industry = 'Energy' OR Industry = 'Technology')", [2]),
+    ],
+)
+def test_filter_matches_soql_semantics(db, condition, expected):
+    compiler = _MirrorFilter(_where(condition), COLUMNS)
+    sql = f'SELECT "Id" FROM account WHERE {compiler.compile()} ORDER BY "Id"'
+    ids = [row[0] for row in db.execute(sql, compiler.params)]
+    assert ids == [ROWS[number - 1][0] for number in expected]
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        # 15-character IDs match on Salesforce but not against stored 18-character ones
+        "OwnerId = '005000000000001'",
+        "Industry INCLUDES ('Energy')",
+        "Name LIKE 'a\\%'",
+        "CreatedDate = LAST_N_DAYS:30",
+        "CreatedDate > 2024-01-01T00:00:00+05:00",
+        "NumberOfEmployees > null",
+        "Rating = 'Hot'",
+        "Id IN (SELECT AccountId FROM Contact)",
+    ],
+)
+def test_filter_leaves_other_conditions_to_the_api(condition):
+    with pytest.raises(_NotMirrorable):
+        _MirrorFilter(_where(condition), COLUMNS).compile()
+
+
+@pytest.mark.parametrize(
+    "term, expected",
+    [
+        ("acme", '"acme"'),
+        ("acme corp", '"acme" "corp"'),
+        ("acm*", '"acm"*'),
+        ('"acme corp" OR globex', '"acme corp" OR "globex"'),
+        ("acme and not globex", '"acme" NOT "globex"'),
+        ("(acme OR globex) AND energy", '( "acme" OR "globex" ) AND "energy"'),
+    ],
+)
+def test_fts_query(term, expected):
+    assert _fts_query(term) == expected
+
+
+@pytest.mark.parametrize("term", ["ac?e", "a*b", '"acme*"', "NOT acme", "", "   "])
+def test_fts_query_leaves_other_syntax_to_sosl(term):
+    with pytest.raises(_NotMirrorable):
+        _fts_query(term)
+
+
+def test_fts_query_runs_in_fts5():
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute("CREATE VIRTUAL TABLE search USING fts5(name, industry)")
+    except sqlite3.OperationalError:
+        pytest.skip("SQLite was built without FTS5")
+    connection.executemany(
+        "INSERT INTO search (rowid, name, industry) VALUES (?, ?, ?)",
+        [(1, "Acme Corp", "Energy"), (2, "Globex", None), (3, "Acme Labs", "Technology")],
+    )
+
+    def matches(term):
+        rows = connection.execute(
+            "SELECT rowid FROM search WHERE search MATCH ? ORDER BY rowid", (_fts_query(term),)
+        )
+        return [row[0] for row in rows]
+
+    assert matches("acme") == [1, 3]
+    assert matches('"acme corp"') == [1]
+    assert matches("glob*") == [2]
+    assert matches("acme AND NOT energy") == [3]
+    assert matches("(globex OR labs) AND NOT energy") == [2, 3]
+    connection.close()
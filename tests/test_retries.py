@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+
+from salesforce_tools import _note_applied_write, _sending_writes, _tracking_writes
+
+ACCEPTED = SimpleNamespace(status_code=201)
+REJECTED = SimpleNamespace(status_code=503)
+
+
+def test_only_marked_requests_count_as_writes():
+    with _tracking_writes() as writes:
+        # e.g. a Collections retrieve or parameterizedSearch POST
+        _note_applied_write(ACCEPTED)
+        with _sending_writes():
+            _note_applied_write(REJECTED)
+            _note_applied_write(ACCEPTED)
+        _note_applied_write(ACCEPTED)
+    assert writes == [1]
+
+
+def test_writes_add_up_in_enclosing_attempts():
+    with _tracking_writes() as outer:
+        with _tracking_writes() as inner, _sending_writes():
+            _note_applied_write(ACCEPTED)
+        assert inner == [1]
+    assert outer == [1]
@@ -0,0 +1,147 @@
+import pytest
+
+from salesforce_tools import _parse_soql, _prepare_soql, _tokenize_soql, _validate_soql
+
+
+@pytest.mark.parametrize(
+    "query, rendered",
+    [
+        ("select id, name from account", "SELECT id, name FROM account"),
+        (
+            "SELECT Id FROM Account WHERE Name = \"Acme\"",
+            "SELECT Id FROM Account WHERE Name = 'Acme'",
+        ),
+        (
+            "SELECT Id FROM Contact WHERE LastName = 'O\\'Brien' ORDER BY LastName DESC NULLS LAST LIMIT 5 OFFSET 10",
+            "SELECT Id FROM Contact WHERE LastName = 'O\\'Brien' ORDER BY LastName DESC NULLS LAST LIMIT 5 OFFSET 10",
+        ),
+        (
+            "SELECT Industry, COUNT(Id) total FROM Account GROUP BY Industry HAVING COUNT(Id)>1",
+            "SELECT Industry, COUNT(Id) total FROM Account GROUP BY Industry HAVING COUNT(Id) > 1",
+        ),
+        (
+            "SELECT Id, (SELECT LastName FROM Contacts WHERE Email LIKE '%@example.com') FROM Account",
+            "SELECT Id, (SELECT LastName FROM Contacts WHERE Email LIKE '%@example.com') FROM Account",
+        ),
+        ("SELECT Id FROM Account FOR VIEW;", "SELECT Id FROM Account FOR VIEW"),
+    ],
+)
+def test_render_is_canonical_and_stable(query, rendered):
+    assert _parse_soql(query).render() == rendered
+    assert _parse_soql(rendered).render() == rendered
+
+
+@pytest.mark.parametrize(
+    "literal, kind",
+    [
+        ("2024-05-01", "datetime"),
+        ("2024-05-01T10:00:00Z", "datetime"),
+        ("2024-05-01T10:00:00.000+05:30", "datetime"),
+        ("LAST_N_DAYS:30", "name"),
+        ("THIS_QUARTER", "name"),
+        ("-1.5", "number"),
+        ("USD5000", "currency"),
+    ],
+)
+def test_date_and_number_literals(literal, kind):
+    tokens = _tokenize_soql(f"SELECT Id FROM Opportunity WHERE CloseDate > {literal}")
+    assert tokens[-1] == (kind, literal)
+    query = _parse_soql(f"SELECT Id FROM Opportunity WHERE CloseDate > {literal}")
+    assert query.render().endswith(f"CloseDate > {literal}")
+    assert query.field_paths() == ["Id", "CloseDate"]
+
+
+def test_typeof_is_one_select_item():
+    query = _parse_soql(
+        "SELECT TYPEOF What WHEN Account THEN Phone, NumberOfEmployees "
+        "WHEN Opportunity THEN Amount, CloseDate ELSE Name END, Subject FROM Event"
+    )
+    assert [kind for kind, _ in query.items] == ["expr", "field"]
+    assert query.field_paths() == ["Subject"]
+    assert query.render() == (
+        "SELECT TYPEOF What WHEN Account THEN Phone, NumberOfEmployees "
+        "WHEN Opportunity THEN Amount, CloseDate ELSE Name END, Subject FROM Event"
+    )
+
+
+def test_semi_joins_read_another_object():
+    query = _parse_soql(
+        "SELECT Id FROM Account WHERE Id IN (SELECT AccountId FROM Contact WHERE Email != null) "
+        "AND Name NOT IN ('a', 'b')"
+    )
+    assert query.semi_join_objects() == ["Contact"]
+    # AccountId and Email belong to Contact, so only Account's own fields are checked
+    assert query.field_paths() == ["Id", "Id", "Name"]
+
+
+def test_object_alias_is_stripped_from_paths():
+    query = _parse_soql("SELECT a.Name, a.Owner.Name FROM Account a WHERE a.Industry = 'Tech'")
+    assert query.alias == "a"
+    assert query.field_paths() == ["Name", "Owner.Name", "Industry"]
+
+
+def test_aggregate_aliases_are_not_fields():
+    query = _parse_soql("SELECT Industry ind, COUNT(Id) total FROM Account GROUP BY Industry ORDER BY total")
+    assert query.field_paths() == ["Industry", "Id", "Industry"]
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ("SELECT Id FROM Account WHERE Name = 'Acme", "unterminated string literal"),
+        ("SELECT Id Account", "missing FROM clause"),
+        ("SELECT FROM Account", "no fields selected"),
+        ("SELECT Id, FROM Account", "empty field in select list"),
+        ("SELECT Id FROM Account WHERE (Name = 'a'", "unbalanced parentheses"),
+        ("UPDATE Account SET Name = 'a'", "must start with SELECT"),
+    ],
+)
+def test_syntax_errors(query, message):
+    with pytest.raises(ValueError, match=message):
+        _parse_soql(query)
+
+
+def test_validation_accepts_known_names(describes):
+    _validate_soql(
+        None,
+        _parse_soql(
+            "SELECT a.Name, Owner.Name, (SELECT LastName, Account.Name FROM Contacts) "
+            "FROM Account a WHERE Industry = 'Tech' AND Id IN (SELECT AccountId FROM Contact)"
+        ),
+    )
+    _validate_soql(
+        None,
+        _parse_soql(
+            "SELECT TYPEOF What WHEN Account THEN Phone, NumberOfEmployees ELSE Name END FROM Event"
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ("SELECT Id FROM Acount", r"sObject type 'Acount' is not supported\. Did you mean: Account"),
+        ("SELECT Id, Nmae FROM Account", r"no such column 'Nmae' on entity 'Account'\. Did you mean: Name\?"),
+        ("SELECT Id FROM Account WHERE Industri = 'Tech'", r"no such column 'Industri'"),
+        ("SELECT Ownr.Name FROM Account", r"relationship 'Ownr' in field path 'Ownr\.Name'"),
+        ("SELECT (SELECT Id FROM Contact) FROM Account", r"relationship 'Contact' in a subquery\. Did you mean: Contacts\?"),
+        ("SELECT (SELECT Emial FROM Contacts) FROM Account", r"no such column 'Emial' on entity 'Contact'"),
+    ],
+)
+def test_validation_rejects_unknown_names(describes, query, message):
+    with pytest.raises(ValueError, match=message):
+        _validate_soql(None, _parse_soql(query))
+
+
+def test_validation_leaves_uncached_objects_to_salesforce(describes):
+    describes[""]["sobjects"].append({"name": "Lead"})
+    try:
+        _validate_soql(None, _parse_soql("SELECT Anything FROM Lead"))
+    finally:
+        describes[""]["sobjects"].pop()
+
+
+def test_prepare_expands_star_without_adding_a_limit(describes):
+    soql, notes = _prepare_soql(None, _parse_soql("SELECT * FROM Contact"))
+    assert soql == "SELECT Id, LastName, Email, AccountId FROM Contact"
+    assert notes == {"fields_expanded": True}